@@ -107,7 +107,7 @@ def create_app(config_name=None):
                 "https://tcz-web.pages.dev",  # Cloudflare Pages
             ],
             "supports_credentials": True,
-            "allow_headers": ["Content-Type", "Authorization"],
+            "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
             "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
         },
         r"/auth/*": {
@@ -124,6 +124,26 @@ def create_app(config_name=None):
 
     # Import models for Flask-Migrate
     from app import models
+
+    # Keep the per-member booking counters in step with reservation writes
+    from app.services.booking_counter_service import register_counter_maintenance
+    register_counter_maintenance()
+
+    # Let the booking lock refuse sessions holding uncommitted writes
+    from app.services.reservation.creation_service import register_booking_lock_guard
+    register_booking_lock_guard()
+
+    # Drop cached availability snapshots once the write changing them commits
+    from app.services.availability_cache_service import register_snapshot_invalidation
+    register_snapshot_invalidation()
+
+    # Stream slot changes once the write making them commits
+    from app.services.availability_stream_service import register_slot_change_publishing
+    register_slot_change_publishing()
+
+    # Have the outbox worker deliver the side effects of committed writes
+    from app.services.outbox_service import register_worker_wakeup
+    register_worker_wakeup()
     
     # Configure Flask-Login
     login_manager.login_view = 'auth.login'
@@ -214,6 +214,33 @@ def reset_payment_status_command(confirm, force):
         click.echo(f'✗ Failed to reset payment status: {str(e)}')
 
 
+@click.command('process-outbox')
+@with_appcontext
+def process_outbox_command():
+    """Deliver pending outbox events (emails, push notifications, audit log).
+
+    The web processes deliver them in a background thread; this command is
+    for running without that worker or draining after an outage.
+    """
+    from app.models import OutboxEvent
+    from app.services.idempotency_service import IdempotencyService
+    from app.services.outbox_service import OutboxService
+
+    handled = 0
+    while True:
+        claimed = OutboxService.process_pending()
+        handled += claimed
+        if not claimed:
+            break
+    OutboxService.prune()
+    IdempotencyService.prune()
+
+    failed = OutboxEvent.query.filter_by(status='failed').count()
+    click.echo(f'✓ Processed {handled} outbox events.')
+    if failed:
+        click.echo(f'  {failed} events failed permanently (see last_error).')
+
+
 def init_app(app):
     """Register CLI commands with the Flask app."""
     app.cli.add_command(create_admin_command)
@@ -221,3 +248,4 @@ def init_app(app):
     app.cli.add_command(test_email_command)
     app.cli.add_command(delete_reservations_command)
     app.cli.add_command(reset_payment_status_command)
+    app.cli.add_command(process_outbox_command)
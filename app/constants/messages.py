@@ -18,6 +18,8 @@ class ErrorMessages:
     )
     RESERVATION_NOT_FOUND = "Buchung nicht gefunden"
     RESERVATION_ALREADY_BOOKED = "Dieser Platz ist bereits für diese Zeit gebucht"
+    COURT_NOT_FOUND = "Platz nicht gefunden"
+    BOOKING_BUSY = "Gerade werden sehr viele Buchungen verarbeitet. Bitte versuche es erneut."
 
     # Cancellation errors
     CANCELLATION_STARTED = "Diese Buchung kann nicht mehr storniert werden (Spielzeit bereits begonnen)"
@@ -36,6 +38,12 @@ class ErrorMessages:
     SYSTEM_ERROR = "Ein Systemfehler ist aufgetreten."
     FALLBACK_ACTIVE = "System verwendet vereinfachte Zeitlogik aufgrund technischer Probleme"
 
+    # Waitlist errors
+    WAITLIST_SLOT_FREE = "Dieser Platz ist frei und kann direkt gebucht werden"
+    WAITLIST_ALREADY_WAITING = "Du stehst bereits auf der Warteliste für diesen Platz"
+    WAITLIST_LIMIT = "Du kannst höchstens auf {limit} Wartelisten gleichzeitig stehen"
+    WAITLIST_ENTRY_NOT_FOUND = "Wartelisteneintrag nicht gefunden"
+
     # Block errors
     BLOCK_NO_COURTS_SPECIFIED = "At least one court must be specified"
 
@@ -8,6 +8,7 @@ from app.decorators.auth import (
     block_owner_or_admin_required
 )
 from app.decorators.timezone import with_berlin_timezone
+from app.decorators.idempotency import idempotent
 
 __all__ = [
     'login_required_json',
@@ -15,5 +16,6 @@ __all__ = [
     'member_or_admin_required',
     'teamster_or_admin_required',
     'block_owner_or_admin_required',
-    'with_berlin_timezone'
+    'with_berlin_timezone',
+    'idempotent'
 ]
@@ -0,0 +1,57 @@
+"""Idempotency-Key support for write endpoints."""
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request
+from flask_login import current_user
+
+from app.services.idempotency_service import (
+    BEGIN_IN_PROGRESS,
+    BEGIN_MISMATCH,
+    BEGIN_REPLAY,
+    IdempotencyService,
+    request_fingerprint
+)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def idempotent(f):
+    """
+    Decorator replaying the stored response of a request retried with the same Idempotency-Key.
+
+    Requests without the header run as usual. Apply below the authentication
+    decorator: keys are scoped to the current member, method and path.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER} darf höchstens {MAX_KEY_LENGTH} Zeichen lang sein'}), 400
+
+        scope = (current_user.id, request.method, request.path, key)
+        outcome, stored = IdempotencyService.begin(scope, request_fingerprint(request.get_data()))
+        if outcome == BEGIN_MISMATCH:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER} wurde bereits für eine andere Anfrage verwendet'}), 422
+        if outcome == BEGIN_IN_PROGRESS:
+            return jsonify({'error': 'Diese Anfrage wird noch bearbeitet. Bitte versuche es gleich erneut.'}), 409
+        if outcome == BEGIN_REPLAY:
+            response = current_app.response_class(stored.body, status=stored.status_code, mimetype=stored.mimetype)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            IdempotencyService.release(scope)
+            raise
+
+        if 200 <= response.status_code < 300:
+            IdempotencyService.complete(scope, response.status_code, response.get_data(), response.mimetype)
+        else:
+            IdempotencyService.release(scope)
+        return response
+
+    return decorated_function
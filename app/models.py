@@ -187,7 +187,7 @@ class Member(db.Model, UserMixin):
 
     def has_active_device_tokens(self):
         """Check if member has at least one active device token for push notifications."""
-        return self.device_tokens.filter_by(is_active=True).count() > 0
+        return db.session.query(self.device_tokens.filter_by(is_active=True).exists()).scalar()
 
     def __repr__(self):
         return f'<Member {self.name} ({self.email})>'
@@ -637,6 +637,175 @@ class SystemSetting(db.Model):
         return f'<SystemSetting {self.key}={self.value}>'
 
 
+class AvailabilityVersion(db.Model):
+    """Change version of the court availability on a single date.
+
+    Bumped on every reservation or block write affecting the date; used to
+    build ETags for the availability API.
+    """
+
+    __tablename__ = 'availability_version'
+
+    date = db.Column(db.Date, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AvailabilityVersion {self.date} v{self.version}>'
+
+
+class AvailabilityChange(db.Model):
+    """One entry of the court slot change log.
+
+    Written by the reservation and block write paths for every slot they
+    touch; the ascending ID is the cursor of the availability changes feed.
+    """
+
+    __tablename__ = 'availability_change'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    date = db.Column(db.Date, nullable=False)
+    court_id = db.Column(db.Integer, db.ForeignKey('court.id', ondelete='CASCADE'), nullable=False)
+    hour = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<AvailabilityChange {self.id} {self.date} court={self.court_id} {self.hour}:00>'
+
+
+class MemberBookingCounter(db.Model):
+    """Denormalized count of a member's active booking sessions.
+
+    Maintained with every reservation write (see booking_counter_service).
+    The counts are only current between computed_at and valid_until, the end
+    of the earliest counted booking; outside that window (or without a row)
+    they are recomputed from the reservations.
+    """
+
+    __tablename__ = 'member_booking_counter'
+
+    member_id = db.Column(db.String(36), db.ForeignKey('member.id', ondelete='CASCADE'), primary_key=True)
+    regular_count = db.Column(db.Integer, nullable=False, default=0)
+    short_notice_count = db.Column(db.Integer, nullable=False, default=0)
+    valid_until = db.Column(db.DateTime, nullable=True)  # Berlin time; None = nothing counted
+    computed_at = db.Column(db.DateTime, nullable=False)  # Berlin time
+
+    def __repr__(self):
+        return f'<MemberBookingCounter {self.member_id} regular={self.regular_count} short_notice={self.short_notice_count}>'
+
+
+class WaitlistEntry(db.Model):
+    """WaitlistEntry model for a member waiting for a taken court slot.
+
+    Entries are served first come, first served: when the slot is freed by a
+    cancellation or a block removal, the oldest waiting member who may book
+    it is booked automatically.
+    """
+
+    __tablename__ = 'waitlist_entry'
+    __table_args__ = (
+        db.Index('idx_waitlist_slot', 'date', 'court_id', 'start_time', 'status'),
+        db.Index('idx_waitlist_member', 'member_id', 'status'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    court_id = db.Column(db.Integer, db.ForeignKey('court.id', ondelete='CASCADE'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    start_time = db.Column(db.Time, nullable=False)
+    member_id = db.Column(db.String(36), db.ForeignKey('member.id', ondelete='CASCADE'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='waiting')  # 'waiting', 'promoted', 'cancelled'
+    reservation_id = db.Column(db.Integer, db.ForeignKey('reservation.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    promoted_at = db.Column(db.DateTime, nullable=True)
+
+    court = db.relationship('Court')
+    member = db.relationship('Member', backref=db.backref('waitlist_entries', lazy='dynamic', cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        return f'<WaitlistEntry {self.status} Court {self.court_id} on {self.date} at {self.start_time}>'
+
+    def to_dict(self):
+        """Convert waitlist entry to dictionary for API responses."""
+        return {
+            'id': self.id,
+            'court_id': self.court_id,
+            'court_number': self.court.number if self.court else None,
+            'date': self.date.isoformat(),
+            'start_time': self.start_time.strftime('%H:%M'),
+            'status': self.status,
+            'reservation_id': self.reservation_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class OutboxEvent(db.Model):
+    """Side effect of a committed write (email, push, audit), delivered by the outbox worker."""
+
+    __tablename__ = 'outbox_event'
+    __table_args__ = (
+        db.Index('idx_outbox_event_due', 'status', 'available_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'done', 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Not processed before this time (retry backoff, or lease of a claimed event)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<OutboxEvent {self.id} {self.event_type} {self.status}>'
+
+
+class NotificationDigestItem(db.Model):
+    """Reservation change waiting to be sent to a member in their next notification digest."""
+
+    __tablename__ = 'notification_digest_item'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # The pending 'notification_digest' outbox event that will deliver it
+    event_id = db.Column(db.Integer, db.ForeignKey('outbox_event.id', ondelete='CASCADE'), nullable=False, index=True)
+    member_id = db.Column(db.String(36), db.ForeignKey('member.id', ondelete='CASCADE'), nullable=False, index=True)
+    reservation_id = db.Column(db.Integer, db.ForeignKey('reservation.id', ondelete='CASCADE'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # 'suspended', 'cancelled', 'restored'
+    reason = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<NotificationDigestItem {self.id} {self.kind} {self.reservation_id} for {self.member_id}>'
+
+
+class IdempotencyKey(db.Model):
+    """Response stored for a request sent with an Idempotency-Key header."""
+
+    __tablename__ = 'idempotency_key'
+    __table_args__ = (
+        db.Index('uq_idempotency_key_scope', 'member_id', 'method', 'path', 'key', unique=True),
+        db.Index('idx_idempotency_key_expires', 'expires_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    member_id = db.Column(db.String(36), db.ForeignKey('member.id', ondelete='CASCADE'), nullable=False)
+    method = db.Column(db.String(10), nullable=False)
+    path = db.Column(db.String(255), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    # Digest of the request body the key was first used with
+    fingerprint = db.Column(db.String(64), nullable=False)
+    # Response; status_code is None while the first request is running
+    status_code = db.Column(db.Integer, nullable=True)
+    body = db.Column(db.LargeBinary, nullable=True)
+    mimetype = db.Column(db.String(100), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.method} {self.path} {self.key} for {self.member_id}>'
+
+
 class FeatureFlag(db.Model):
     """FeatureFlag model for controlling feature visibility by role."""
 
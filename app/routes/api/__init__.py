@@ -6,29 +6,48 @@ All routes return JSON and use Bearer token authentication.
 """
 import logging
 
-from flask import Blueprint, jsonify, request
+from datetime import timedelta
+
+from flask import Blueprint, current_app, jsonify, request
 from flask_login import current_user
 from sqlalchemy.orm import joinedload
 
 from app import db
-from app.models import Reservation, Member
+from app.models import Court, Reservation, Member
 from app.services.reservation_service import ReservationService
 
 logger = logging.getLogger(__name__)
 from app.services.validation_service import ValidationService
 from app.decorators.auth import jwt_or_session_required
+from app.decorators.idempotency import idempotent
+from app.constants.messages import ErrorMessages
+from app.utils.error_handling import log_error_with_context
 from app.utils.validators import (
     ValidationError,
     validate_date_format,
     validate_time_format,
     validate_integer,
-    validate_uuid
+    validate_uuid,
+    validate_choice
 )
 
 # Create the main API blueprint
 bp = Blueprint('api', __name__, url_prefix='/api')
 
 
+def _validate_court_ids(court_ids):
+    """
+    Check that all court IDs exist, with one query.
+
+    Raises:
+        ValidationError: If any of the courts does not exist
+    """
+    court_ids = set(court_ids)
+    known = {court_id for (court_id,) in db.session.query(Court.id).filter(Court.id.in_(court_ids))}
+    if court_ids - known:
+        raise ValidationError(ErrorMessages.COURT_NOT_FOUND)
+
+
 def _auto_add_favourite(booked_by_id, booked_for_id):
     """
     Auto-add booked_for member to booked_by member's favourites.
@@ -113,11 +132,13 @@ def list_reservations():
     regular_active = [r for r in my_active if not r.is_short_notice]
     short_notice_active = [r for r in my_active if r.is_short_notice]
 
+    cancellation_eligibility = ValidationService.get_cancellation_eligibility_batch(
+        reservations, current_user.id, current_time
+    )
+
     def add_cancellation_info(r):
         data = r.to_dict()
-        data['can_cancel'] = ValidationService.get_cancellation_eligibility(
-            r, current_user.id, current_time
-        )
+        data['can_cancel'] = cancellation_eligibility[r.id]
         return data
 
     return jsonify({
@@ -135,6 +156,7 @@ def list_reservations():
 
 @bp.route('/reservations/', methods=['POST'])
 @jwt_or_session_required
+@idempotent
 def create_reservation():
     """Create a new reservation."""
     try:
@@ -192,8 +214,154 @@ def create_reservation():
         return jsonify({'error': 'Ein Fehler ist aufgetreten'}), 500
 
 
+@bp.route('/reservations/batch', methods=['POST'])
+@jwt_or_session_required
+def create_reservations_batch():
+    """Create reservations for several slots in one transaction.
+
+    JSON body:
+        slots: List of {court_id, date, start_time}
+        booked_for_id: Member to book for (default: current user)
+        mode: 'all_or_nothing' (default) or 'best_effort'
+        repeat_weeks: Book the slots weekly for this many weeks (teamsters
+                      and administrators only, default: 1)
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'JSON body required'}), 400
+
+        max_slots = current_app.config.get('BOOKING_BATCH_MAX_SLOTS', 20)
+        try:
+            mode = validate_choice(data.get('mode', 'all_or_nothing'), ['all_or_nothing', 'best_effort'], 'mode')
+            repeat_weeks = validate_integer(data.get('repeat_weeks', 1), 'repeat_weeks', min_value=1, max_value=max_slots)
+            booked_for_id = validate_uuid(
+                data.get('booked_for_id', current_user.id),
+                'booked_for_id'
+            )
+            raw_slots = data.get('slots')
+            if not isinstance(raw_slots, list) or not raw_slots:
+                raise ValidationError('slots ist erforderlich')
+            slots = [
+                (
+                    validate_integer(slot.get('court_id'), 'court_id', min_value=1),
+                    validate_date_format(slot.get('date'), 'date'),
+                    validate_time_format(slot.get('start_time'), 'start_time')
+                )
+                for slot in raw_slots if isinstance(slot, dict)
+            ]
+            if len(slots) != len(raw_slots):
+                raise ValidationError('slots muss eine Liste von Objekten sein')
+            _validate_court_ids(slot[0] for slot in slots)
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if repeat_weeks > 1 and not current_user.is_teamster_or_admin():
+            return jsonify({'error': 'Du hast keine Berechtigung für diese Aktion'}), 403
+
+        slots = [
+            (court_id, slot_date + timedelta(weeks=week), start_time)
+            for week in range(repeat_weeks)
+            for court_id, slot_date, start_time in slots
+        ]
+        if len(slots) > max_slots:
+            return jsonify({'error': f'Es können höchstens {max_slots} Buchungen auf einmal erstellt werden'}), 400
+
+        # Auto-add booked_for member to favourites if booking for someone else
+        if booked_for_id != current_user.id:
+            _auto_add_favourite(current_user.id, booked_for_id)
+
+        reservations, failures, error = ReservationService.create_reservations(
+            slots, booked_for_id, current_user.id, atomic=(mode == 'all_or_nothing')
+        )
+        if error:
+            return jsonify({'error': error}), 400
+
+        failed = [
+            {
+                'court_id': slots[index][0],
+                'date': slots[index][1].isoformat(),
+                'start_time': slots[index][2].strftime('%H:%M'),
+                'error': failure
+            }
+            for index, failure in failures
+        ]
+        if not reservations:
+            return jsonify({'error': failed[0]['error'], 'failed': failed}), 400
+
+        return jsonify({
+            'message': f'{len(reservations)} Buchungen erfolgreich erstellt!',
+            'reservations': [reservation.to_dict() for reservation in reservations],
+            'failed': failed
+        }), 201
+
+    except Exception as e:
+        log_error_with_context(e, {'booked_by_id': current_user.id}, "create_reservations_batch")
+        return jsonify({'error': 'Ein Fehler ist aufgetreten'}), 500
+
+
+@bp.route('/reservations/check', methods=['POST'])
+@jwt_or_session_required
+def check_reservations():
+    """Check which of several possible bookings would succeed, without booking.
+
+    JSON body:
+        candidates: List of {court_id, date, start_time, booked_for_id}
+                    (booked_for_id defaults to the current user)
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'JSON body required'}), 400
+
+        max_candidates = current_app.config.get('BOOKING_CHECK_MAX_CANDIDATES', 100)
+        try:
+            raw_candidates = data.get('candidates')
+            if not isinstance(raw_candidates, list) or not raw_candidates:
+                raise ValidationError('candidates ist erforderlich')
+            candidates = [
+                (
+                    validate_integer(candidate.get('court_id'), 'court_id', min_value=1),
+                    validate_date_format(candidate.get('date'), 'date'),
+                    validate_time_format(candidate.get('start_time'), 'start_time'),
+                    validate_uuid(candidate.get('booked_for_id', current_user.id), 'booked_for_id')
+                )
+                for candidate in raw_candidates if isinstance(candidate, dict)
+            ]
+            if len(candidates) != len(raw_candidates):
+                raise ValidationError('candidates muss eine Liste von Objekten sein')
+            _validate_court_ids(candidate[0] for candidate in candidates)
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if len(candidates) > max_candidates:
+            return jsonify({'error': f'Es können höchstens {max_candidates} Buchungen auf einmal geprüft werden'}), 400
+
+        outcomes = ValidationService.validate_booking_candidates(candidates, current_user.id)
+
+        return jsonify({
+            'results': [
+                {
+                    'court_id': court_id,
+                    'date': candidate_date.isoformat(),
+                    'start_time': start_time.strftime('%H:%M'),
+                    'booked_for_id': booked_for_id,
+                    'can_book': can_book,
+                    'error': error or None
+                }
+                for (court_id, candidate_date, start_time, booked_for_id), (can_book, error)
+                in zip(candidates, outcomes)
+            ]
+        }), 200
+
+    except Exception as e:
+        log_error_with_context(e, {'booked_by_id': current_user.id}, "check_reservations")
+        return jsonify({'error': 'Ein Fehler ist aufgetreten'}), 500
+
+
 @bp.route('/reservations/<int:id>', methods=['DELETE'])
 @jwt_or_session_required
+@idempotent
 def delete_reservation(id):
     """Cancel a reservation."""
     try:
@@ -220,18 +388,15 @@ def reservation_status():
     """Get reservation status and limits for current user."""
     from app.utils.timezone_utils import get_current_berlin_time
     from app.services.settings_service import SettingsService
+    from app.services.booking_counter_service import BookingCounterService
 
     current_time = get_current_berlin_time()
 
-    active_regular = ReservationService.get_member_active_booking_sessions(
-        current_user.id, include_short_notice=False, current_time=current_time
-    )
-    active_short_notice = ReservationService.get_member_active_short_notice_bookings(
-        current_user.id, current_time=current_time
-    )
-    all_active = ReservationService.get_member_active_booking_sessions(
-        current_user.id, include_short_notice=True, current_time=current_time
-    )
+    counts = BookingCounterService.get_counts(current_user.id, current_time, cached=True)
+    active_regular = counts['regular']
+    active_short_notice = counts['short_notice']
+    max_regular = current_app.config.get('MAX_ACTIVE_RESERVATIONS', 2)
+    max_short_notice = current_app.config.get('MAX_SHORT_NOTICE_BOOKINGS', 1)
 
     # Get payment deadline info for users with unpaid fees
     payment_info = None
@@ -249,22 +414,22 @@ def reservation_status():
         'user_id': current_user.id,
         'limits': {
             'regular_reservations': {
-                'limit': 2,
-                'current': len(active_regular),
-                'available': 2 - len(active_regular),
-                'can_book': len(active_regular) < 2
+                'limit': max_regular,
+                'current': active_regular,
+                'available': max(max_regular - active_regular, 0),
+                'can_book': active_regular < max_regular
             },
             'short_notice_bookings': {
-                'limit': 1,
-                'current': len(active_short_notice),
-                'available': 1 - len(active_short_notice),
-                'can_book': len(active_short_notice) < 1
+                'limit': max_short_notice,
+                'current': active_short_notice,
+                'available': max(max_short_notice - active_short_notice, 0),
+                'can_book': active_short_notice < max_short_notice
             }
         },
         'active_reservations': {
-            'total': len(all_active),
-            'regular': len(active_regular),
-            'short_notice': len(active_short_notice)
+            'total': active_regular + active_short_notice,
+            'regular': active_regular,
+            'short_notice': active_short_notice
         }
     }
 
@@ -352,3 +517,4 @@ def unregister_device_token(token):
 from . import members
 from . import admin
 from . import courts
+from . import waitlist
@@ -14,6 +14,10 @@ from flask_login import current_user
 from app import db
 from app.models import Block, Court, BlockReason, ReasonAuditLog
 from app.services.block_service import BlockService
+from app.services.waitlist_service import WaitlistService
+from app.services.availability_cache_service import AvailabilityCacheService
+from app.services.availability_stream_service import AvailabilityStreamService, block_slots
+from app.services.outbox_service import OutboxService
 from app.services.settings_service import SettingsService
 from app.decorators.auth import session_or_jwt_admin_required, session_or_jwt_teamster_or_admin_required
 from app.constants.messages import ErrorMessages, SuccessMessages
@@ -238,6 +242,8 @@ def update_batch(batch_id):
                 return jsonify({'error': 'Du kannst nur deine eigenen Sperrungen bearbeiten'}), 403
 
         existing_court_ids = [block.court_id for block in existing_blocks]
+        old_dates = {block.date for block in existing_blocks}
+        old_slots = block_slots(*existing_blocks)
         courts_to_keep = set(existing_court_ids) & set(new_court_ids)
         courts_to_delete = set(existing_court_ids) - set(new_court_ids)
         courts_to_add = set(new_court_ids) - set(existing_court_ids)
@@ -287,7 +293,16 @@ def update_batch(batch_id):
             else:
                 BlockService.cancel_conflicting_reservations(new_block)
 
+        new_slots = {
+            (new_date, court_id, hour)
+            for court_id in new_court_ids
+            for hour in range(new_start_time.hour, new_end_time.hour)
+        }
+        AvailabilityCacheService.invalidate(new_date, *old_dates)
+        AvailabilityStreamService.publish_slot_changes(old_slots | new_slots)
+        WaitlistService.enqueue_freed_slots(old_slots - new_slots)
         db.session.commit()
+        OutboxService.dispatch()
 
         # Get court numbers and reason name for batch-level audit log
         reason = BlockReason.query.get(new_reason_id)
@@ -340,6 +355,53 @@ def delete_batch(batch_id):
         return jsonify({'error': str(e)}), 500
 
 
+# ----- Reservation Routes (Admin Only) -----
+
+@bp.route('/admin/reservations/cancel', methods=['POST'])
+@session_or_jwt_admin_required
+def cancel_reservations_bulk():
+    """Cancel all active reservations in a date range, optionally limited to courts and hours."""
+    from flask import current_app
+    from app.services.reservation_service import ReservationService
+    from app.utils.validators import (
+        ValidationError, validate_date_format, validate_time_format, validate_integer, validate_string_length
+    )
+
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'JSON body required'}), 400
+
+    try:
+        date_from = validate_date_format(data.get('date_from'), 'date_from')
+        date_to = validate_date_format(data.get('date_to'), 'date_to') if data.get('date_to') else date_from
+        court_ids = [validate_integer(court_id, 'court_ids', min_value=1) for court_id in data.get('court_ids') or []]
+        start_time = validate_time_format(data['start_time'], 'start_time') if data.get('start_time') else None
+        end_time = validate_time_format(data['end_time'], 'end_time') if data.get('end_time') else None
+        reason = validate_string_length(data.get('reason'), 'reason', min_length=1, max_length=255)
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    max_days = current_app.config.get('BULK_CANCEL_MAX_DAYS', 31)
+    if date_to < date_from:
+        return jsonify({'error': 'date_to darf nicht vor date_from liegen'}), 400
+    if (date_to - date_from).days >= max_days:
+        return jsonify({'error': f'Es können höchstens {max_days} Tage auf einmal storniert werden'}), 400
+    if start_time and end_time and end_time <= start_time:
+        return jsonify({'error': 'end_time muss nach start_time liegen'}), 400
+
+    cancelled, error = ReservationService.cancel_reservations_bulk(
+        date_from, date_to, reason, current_user.id,
+        court_ids=court_ids, start_time=start_time, end_time=end_time
+    )
+    if error:
+        return jsonify({'error': error}), 500
+
+    return jsonify({
+        'message': f'{cancelled} Buchungen storniert',
+        'cancelled': cancelled
+    })
+
+
 # ----- Settings Routes (Admin Only) -----
 
 @bp.route('/admin/settings/payment-deadline', methods=['GET'])
@@ -808,6 +870,24 @@ def get_changelog():
     return jsonify({'success': True, 'entries': entries})
 
 
+# ----- Push Delivery Routes (Admin Only) -----
+
+@bp.route('/admin/push/stats', methods=['GET'])
+@session_or_jwt_admin_required
+def get_push_stats():
+    """Get push delivery counters of this process and the device token totals."""
+    from app.models import DeviceToken
+    from app.services.push_notification_service import PushNotificationService
+
+    active_tokens = DeviceToken.query.filter_by(is_active=True).count()
+    inactive_tokens = DeviceToken.query.filter_by(is_active=False).count()
+
+    return jsonify({
+        'delivery': PushNotificationService.get_delivery_stats(),
+        'device_tokens': {'active': active_tokens, 'inactive': inactive_tokens}
+    })
+
+
 # ----- Payment Confirmation Routes (Admin Only) -----
 
 @bp.route('/admin/members/pending-confirmations', methods=['GET'])
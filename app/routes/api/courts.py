@@ -4,16 +4,20 @@ API Courts Module
 Court availability for authenticated users (web and mobile).
 """
 
-from datetime import date, time, timedelta
-from flask import request, jsonify, current_app
+import hashlib
+import json
+from datetime import date, timedelta
+from time import monotonic
+from flask import Response, request, jsonify, current_app
 from flask_login import current_user, login_user
+from flask_limiter.util import get_remote_address
 import jwt
-from sqlalchemy.orm import joinedload
 
-from app.models import Court, Reservation, Block, Member
-from app.services.reservation_service import ReservationService
-from app.services.block_service import BlockService
-from app.services.validation_service import ValidationService
+from app.models import Member
+from app.services.availability_cache_service import availability_etag
+from app.services.availability_change_service import AvailabilityChangeService
+from app.services.availability_service import AvailabilityService, CompactAvailabilityEncoder
+from app.services.availability_stream_service import AvailabilityStreamService
 from app.decorators.auth import jwt_or_session_required
 from app import limiter
 from . import bp
@@ -52,170 +56,33 @@ def _handle_jwt_auth():
         pass
 
 
-def _build_day_availability(courts, reservation_map, block_map, suspended_map, current_time):
-    """Build sparse availability data for a single day.
+# Cached by the client, but always revalidated with If-None-Match
+REVALIDATE_CACHE_CONTROL = 'private, max-age=0, must-revalidate'
 
-    Args:
-        courts: List of Court objects
-        reservation_map: Dict of (court_id, hour) -> Reservation for this date
-        block_map: Dict of (court_id, hour) -> Block for this date
-        suspended_map: Dict of (court_id, hour) -> suspended Reservation for this date
-        current_time: Current Berlin time
 
-    Returns:
-        List of court data dicts with occupied slots
-    """
-    courts_data = []
-    for court in courts:
-        court_data = {
-            'court_id': court.id,
-            'court_number': court.number,
-            'occupied': []
-        }
+# Accept header value selecting the compact range format
+COMPACT_MIMETYPE = 'application/vnd.availability.compact+json'
 
-        for hour in range(8, 22):
-            slot_time = time(hour, 0)
-            key = (court.id, hour)
-
-            if key in block_map:
-                blocks_at_slot = block_map[key]
-                # Separate temp and regular blocks
-                temp_blocks = [b for b in blocks_at_slot if b.is_temporary_block]
-                regular_blocks = [b for b in blocks_at_slot if not b.is_temporary_block]
-
-                # Prioritize temp blocks (they suspend/overlay regular blocks)
-                if temp_blocks:
-                    block = temp_blocks[0]
-                    block_details = {
-                        'reason': block.reason_obj.name if block.reason_obj else 'Unbekannt',
-                        'details': block.details if block.details else '',
-                        'block_id': block.id,
-                        'is_temporary': True
-                    }
-
-                    # Include underlying regular block info if exists
-                    if regular_blocks:
-                        underlying = regular_blocks[0]
-                        block_details['underlying_block'] = {
-                            'reason': underlying.reason_obj.name if underlying.reason_obj else 'Unbekannt',
-                            'details': underlying.details if underlying.details else '',
-                            'block_id': underlying.id
-                        }
-
-                    # Include suspended reservation info
-                    if key in suspended_map and current_user.is_authenticated:
-                        suspended_res = suspended_map[key]
-                        block_details['suspended_reservation'] = {
-                            'booked_for': f"{suspended_res.booked_for.firstname} {suspended_res.booked_for.lastname}",
-                            'booked_for_id': suspended_res.booked_for_id,
-                            'booked_for_has_profile_picture': suspended_res.booked_for.has_profile_picture,
-                            'booked_for_profile_picture_version': suspended_res.booked_for.profile_picture_version,
-                            'booked_by_id': suspended_res.booked_by_id,
-                            'reservation_id': suspended_res.id,
-                            'is_short_notice': suspended_res.is_short_notice,
-                            'can_cancel': ValidationService.get_cancellation_eligibility(
-                                suspended_res, current_user.id, current_time
-                            )
-                        }
-
-                    court_data['occupied'].append({
-                        'time': slot_time.strftime('%H:%M'),
-                        'status': 'blocked_temporary',
-                        'details': block_details
-                    })
-                else:
-                    # No temp block, show regular block
-                    block = regular_blocks[0] if regular_blocks else blocks_at_slot[0]
-                    block_details = {
-                        'reason': block.reason_obj.name if block.reason_obj else 'Unbekannt',
-                        'details': block.details if block.details else '',
-                        'block_id': block.id,
-                        'is_temporary': False
-                    }
-
-                    court_data['occupied'].append({
-                        'time': slot_time.strftime('%H:%M'),
-                        'status': 'blocked',
-                        'details': block_details
-                    })
-            elif key in reservation_map:
-                reservation = reservation_map[key]
-                slot_data = {
-                    'time': slot_time.strftime('%H:%M'),
-                    'status': 'short_notice' if reservation.is_short_notice else 'reserved',
-                    'details': None
-                }
-
-                if current_user.is_authenticated:
-                    slot_data['details'] = {
-                        'booked_for': f"{reservation.booked_for.firstname} {reservation.booked_for.lastname}",
-                        'booked_for_id': reservation.booked_for_id,
-                        'booked_for_has_profile_picture': reservation.booked_for.has_profile_picture,
-                        'booked_for_profile_picture_version': reservation.booked_for.profile_picture_version,
-                        'booked_by': f"{reservation.booked_by.firstname} {reservation.booked_by.lastname}",
-                        'booked_by_id': reservation.booked_by_id,
-                        'booked_by_has_profile_picture': reservation.booked_by.has_profile_picture,
-                        'booked_by_profile_picture_version': reservation.booked_by.profile_picture_version,
-                        'reservation_id': reservation.id,
-                        'is_short_notice': reservation.is_short_notice,
-                        'can_cancel': ValidationService.get_cancellation_eligibility(
-                            reservation, current_user.id, current_time
-                        )
-                    }
-                else:
-                    slot_data['status'] = 'reserved'
-                    slot_data['details'] = None
-
-                court_data['occupied'].append(slot_data)
-
-        courts_data.append(court_data)
-
-    return courts_data
-
-
-def _build_lookup_maps(query_date, reservations, blocks, suspended_reservations, current_time):
-    """Build O(1) lookup maps for reservations, blocks, and suspended reservations.
-
-    Args:
-        query_date: The date being queried
-        reservations: List of Reservation objects for this date
-        blocks: List of Block objects for this date
-        suspended_reservations: List of suspended Reservation objects for this date
-        current_time: Current Berlin time
-
-    Returns:
-        Tuple of (reservation_map, block_map, suspended_map)
-    """
-    reservation_map = {}
-    is_past_or_current_date = query_date <= current_time.date()
-    for reservation in reservations:
-        if reservation.status == 'active':
-            if is_past_or_current_date:
-                key = (reservation.court_id, reservation.start_time.hour)
-                reservation_map[key] = reservation
-            else:
-                is_active = ReservationService.is_reservation_currently_active(
-                    reservation, current_time
-                )
-                if is_active:
-                    key = (reservation.court_id, reservation.start_time.hour)
-                    reservation_map[key] = reservation
-
-    # Store lists of blocks per slot to handle overlapping temp/regular blocks
-    block_map = {}  # (court_id, hour) -> list of Block objects
-    for block in blocks:
-        for hour in range(block.start_time.hour, block.end_time.hour):
-            key = (block.court_id, hour)
-            if key not in block_map:
-                block_map[key] = []
-            block_map[key].append(block)
-
-    suspended_map = {}
-    for reservation in suspended_reservations:
-        key = (reservation.court_id, reservation.start_time.hour)
-        suspended_map[key] = reservation
-
-    return reservation_map, block_map, suspended_map
+# Public availability holds no member data and may be stored by shared caches
+PUBLIC_CACHE_CONTROL = 'public, max-age={max_age}'
+
+
+def _is_not_modified(etag):
+    """Check whether the request's If-None-Match matches the entity tag."""
+    return etag is not None and request.if_none_match.contains_weak(etag)
+
+
+def _conditional_response(response, etag):
+    """Attach validator headers to an availability response."""
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
+
+
+def _not_modified_response(etag):
+    """Build an empty 304 response for a matching If-None-Match."""
+    return _conditional_response(current_app.response_class(status=304), etag)
 
 
 @bp.route('/courts/availability', methods=['GET'])
@@ -225,6 +92,9 @@ def get_availability():
     Returns only occupied slots (reservations and blocks) to minimize
     bandwidth. Available slots are implied by absence from the response.
 
+    The response carries an ETag derived from the date's change version;
+    a matching If-None-Match is answered with 304 Not Modified.
+
     Query params:
         date: Date in YYYY-MM-DD format (default: today)
     """
@@ -239,24 +109,16 @@ def get_availability():
     _handle_jwt_auth()
 
     current_time = get_current_berlin_time()
-    courts = Court.query.order_by(Court.number).all()
-    reservations = ReservationService.get_reservations_by_date(query_date)
-    blocks = BlockService.get_blocks_by_date(query_date)
-    suspended_reservations = Reservation.query.options(
-        joinedload(Reservation.booked_for)
-    ).filter(
-        Reservation.date == query_date,
-        Reservation.status == 'suspended'
-    ).all()
-
-    reservation_map, block_map, suspended_map = _build_lookup_maps(
-        query_date, reservations, blocks, suspended_reservations, current_time
-    )
-    courts_data = _build_day_availability(
-        courts, reservation_map, block_map, suspended_map, current_time
-    )
+    viewer_id = current_user.id if current_user.is_authenticated else None
 
-    return jsonify({
+    snapshot = AvailabilityService.get_day_snapshot(query_date, current_time)
+    courts_data = snapshot.project(viewer_id, current_time)
+
+    etag = availability_etag(snapshot, viewer_id, current_time.hour, courts_data)
+    if _is_not_modified(etag):
+        return _not_modified_response(etag)
+
+    return _conditional_response(jsonify({
         'date': date_str,
         'current_hour': current_time.hour,
         'courts': courts_data,
@@ -264,7 +126,43 @@ def get_availability():
             'generated_at': current_time.isoformat(),
             'timezone': 'Europe/Berlin'
         }
-    })
+    }), etag)
+
+
+@bp.route('/courts/availability/public', methods=['GET'])
+def get_public_availability():
+    """Get anonymous court availability for a specific date (sparse format).
+
+    Same body as the anonymous view of /courts/availability, without
+    current_hour. Needs no authentication and is publicly cacheable
+    (Cache-Control: public, max-age), so embeds such as the club website
+    can be served by browser and proxy caches. The body is pre-rendered
+    once per date change and shared by all requests.
+
+    Query params:
+        date: Date in YYYY-MM-DD format (default: today)
+    """
+    from app.utils.timezone_utils import get_current_berlin_time
+
+    date_str = request.args.get('date', date.today().isoformat())
+    try:
+        query_date = date.fromisoformat(date_str)
+    except ValueError:
+        return jsonify({'error': 'Ungültiges Datumsformat'}), 400
+
+    body, etag = AvailabilityService.get_public_body(query_date, get_current_berlin_time())
+
+    if _is_not_modified(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+    if etag is not None:
+        response.set_etag(etag)
+    # An explicit max-age also keeps the global no-store header hook away
+    response.headers['Cache-Control'] = PUBLIC_CACHE_CONTROL.format(
+        max_age=current_app.config.get('AVAILABILITY_PUBLIC_MAX_AGE_SECONDS', 30)
+    )
+    return response
 
 
 @bp.route('/courts/availability/range', methods=['GET'])
@@ -274,17 +172,31 @@ def get_availability_range():
 
     Fetches multiple days in a single request for client-side caching.
 
+    Every day carries its own ETag. The whole response has an ETag combining
+    the day tags, and a matching If-None-Match is answered with 304. Clients
+    that pass the day tags they already hold in `known` get only the changed
+    days in full; unchanged days are reported as {"etag": ..., "unchanged": true}.
+
+    With `format=compact` (or an Accept header of COMPACT_MIMETYPE) the days
+    are encoded in the compact columnar format instead: per court one status
+    code array indexed by grid hour, plus rows for slots with details that
+    reference member and block tables shared by the whole range. See
+    CompactAvailabilityEncoder for the layout.
+
     Query params:
         start: Start date in YYYY-MM-DD format (required)
         days: Number of days to fetch, 1-30 (required)
+        known: Comma-separated day ETags held by the client (optional)
+        format: 'sparse' (default) or 'compact' (optional)
 
     Response format:
         {
             "range": {"start": "2026-01-20", "end": "2026-01-26", "days_requested": 7},
             "days": {
-                "2026-01-20": {"current_hour": 10, "courts": [...]},
-                "2026-01-21": {"current_hour": null, "courts": [...]}
+                "2026-01-20": {"current_hour": 10, "courts": [...], "etag": "..."},
+                "2026-01-21": {"etag": "...", "unchanged": true}
             },
+            "changed_days": ["2026-01-20"],
             "metadata": {...}
         }
     """
@@ -308,84 +220,218 @@ def get_availability_range():
     except ValueError:
         return jsonify({'error': 'days muss eine Zahl zwischen 1 und 30 sein'}), 400
 
+    response_format = request.args.get('format')
+    if response_format is None:
+        accepted = request.accept_mimetypes.best_match(['application/json', COMPACT_MIMETYPE])
+        response_format = 'compact' if accepted == COMPACT_MIMETYPE else 'sparse'
+    if response_format not in ('sparse', 'compact'):
+        return jsonify({'error': 'format muss sparse oder compact sein'}), 400
+    encoder = CompactAvailabilityEncoder() if response_format == 'compact' else None
+
     _handle_jwt_auth()
 
     current_time = get_current_berlin_time()
+    viewer_id = current_user.id if current_user.is_authenticated else None
     end_date = start_date + timedelta(days=num_days - 1)
-
-    courts = Court.query.order_by(Court.number).all()
-
-    # Batch fetch all data for the date range
-    reservations = Reservation.query.options(
-        joinedload(Reservation.booked_for),
-        joinedload(Reservation.booked_by),
-        joinedload(Reservation.court)
-    ).filter(
-        Reservation.date.between(start_date, end_date),
-        Reservation.status == 'active'
-    ).all()
-
-    blocks = Block.query.options(
-        joinedload(Block.reason_obj),
-        joinedload(Block.court)
-    ).filter(
-        Block.date.between(start_date, end_date)
-    ).all()
-
-    suspended_reservations = Reservation.query.options(
-        joinedload(Reservation.booked_for)
-    ).filter(
-        Reservation.date.between(start_date, end_date),
-        Reservation.status == 'suspended'
-    ).all()
-
-    # Group data by date
-    reservations_by_date = {}
-    for res in reservations:
-        reservations_by_date.setdefault(res.date, []).append(res)
-
-    blocks_by_date = {}
-    for block in blocks:
-        blocks_by_date.setdefault(block.date, []).append(block)
-
-    suspended_by_date = {}
-    for res in suspended_reservations:
-        suspended_by_date.setdefault(res.date, []).append(res)
-
-    # Build response for each day
-    days_data = {}
-    current_date = start_date
     today = current_time.date()
 
-    while current_date <= end_date:
-        date_reservations = reservations_by_date.get(current_date, [])
-        date_blocks = blocks_by_date.get(current_date, [])
-        date_suspended = suspended_by_date.get(current_date, [])
-
-        reservation_map, block_map, suspended_map = _build_lookup_maps(
-            current_date, date_reservations, date_blocks, date_suspended, current_time
-        )
-        courts_data = _build_day_availability(
-            courts, reservation_map, block_map, suspended_map, current_time
-        )
-
-        days_data[current_date.isoformat()] = {
-            'current_hour': current_time.hour if current_date == today else None,
-            'courts': courts_data
-        }
+    known_tags = set(filter(None, request.args.get('known', '').split(',')))
 
-        current_date += timedelta(days=1)
+    dates = [start_date + timedelta(days=offset) for offset in range(num_days)]
+    snapshots = AvailabilityService.get_day_snapshots(dates, current_time)
 
-    return jsonify({
+    # Build response for each day
+    days_data = {}
+    changed_days = []
+    day_tags = []
+    for current_date in dates:
+        current_hour = current_time.hour if current_date == today else None
+        courts_data = snapshots[current_date].project(viewer_id, current_time)
+        day_tag = availability_etag(snapshots[current_date], viewer_id, current_hour, courts_data)
+        day_tags.append(day_tag)
+
+        if day_tag is not None and day_tag in known_tags:
+            days_data[current_date.isoformat()] = {'etag': day_tag, 'unchanged': True}
+            continue
+
+        changed_days.append(current_date.isoformat())
+        if encoder is not None:
+            days_data[current_date.isoformat()] = dict(
+                encoder.add_day(courts_data), current_hour=current_hour, etag=day_tag
+            )
+        else:
+            days_data[current_date.isoformat()] = {
+                'current_hour': current_hour,
+                'courts': courts_data,
+                'etag': day_tag
+            }
+
+    etag = None
+    if None not in day_tags:
+        # The known set and the format change the body, so they are part of the range tag
+        range_key = '|'.join(day_tags + sorted(known_tags) + [response_format])
+        etag = 'range.' + hashlib.sha1(range_key.encode()).hexdigest()[:20]
+    if _is_not_modified(etag):
+        response = _not_modified_response(etag)
+        response.vary.add('Accept')
+        return response
+
+    body = {
         'range': {
             'start': start_str,
             'end': end_date.isoformat(),
             'days_requested': num_days
         },
         'days': days_data,
+        'changed_days': changed_days,
         'metadata': {
             'generated_at': current_time.isoformat(),
             'timezone': 'Europe/Berlin',
             'cache_hint_seconds': 30
         }
+    }
+    if encoder is not None:
+        body['format'] = 'compact'
+        body.update(encoder.tables())
+
+    response = _conditional_response(jsonify(body), etag)
+    response.vary.add('Accept')
+    return response
+
+
+@bp.route('/courts/availability/changes', methods=['GET'])
+@limiter.limit("120 per minute")
+def get_availability_changes():
+    """Get the slots whose availability changed since a cursor.
+
+    Covers all dates and all worker processes. Each changed slot is reported
+    once with its current state in the sparse format (free slots with status
+    'available'), so clients can patch their local copy of the affected days.
+
+    Without `since`, only the current cursor is returned: fetch availability
+    (e.g. via /courts/availability/range) first, then poll with that cursor.
+
+    Query params:
+        since: Cursor from the previous response (optional)
+
+    Response format:
+        {
+            "cursor": "1234",
+            "changes": [{"date": "2026-01-20", "court_id": 1, "court_number": 1,
+                         "time": "10:00", "status": "reserved", "details": {...}}],
+            "has_more": false
+        }
+
+    An unknown or expired cursor is answered with 410 and the cursor to
+    continue from after reloading.
+    """
+    from app.utils.timezone_utils import get_current_berlin_time
+
+    since = request.args.get('since')
+    if since is None:
+        return jsonify({
+            'cursor': AvailabilityChangeService.get_latest_cursor(),
+            'changes': [],
+            'has_more': False
+        })
+    if not since.isdigit():
+        return jsonify({'error': 'Ungültiger Cursor'}), 400
+
+    _handle_jwt_auth()
+
+    viewer_id = current_user.id if current_user.is_authenticated else None
+    changes, cursor, has_more, error = AvailabilityChangeService.get_changes(
+        int(since), viewer_id, get_current_berlin_time()
+    )
+    if error:
+        return jsonify({'error': error, 'cursor': cursor}), 410
+
+    return jsonify({
+        'cursor': cursor,
+        'changes': changes,
+        'has_more': has_more
+    })
+
+
+def _sse_message(event, data, event_id):
+    """Format a server-sent event."""
+    return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+@bp.route('/courts/availability/stream', methods=['GET'])
+@limiter.limit("30 per minute")
+def stream_availability():
+    """Stream slot-level availability changes as server-sent events.
+
+    Events:
+        ready: First event; data {"replayed": bool}
+        slot:  {"date", "court_id", "court_number", "hour", "time", "status"}
+               with status available/reserved/short_notice/blocked/blocked_temporary
+        reset: The client's cursor could not be replayed; refetch availability
+
+    Every event carries an id (cursor). Reconnecting clients send it back as
+    Last-Event-ID header (or `cursor` query param) to replay missed events.
+    Anonymous viewers see short notice bookings as reserved. Member names are
+    not streamed; clients refetch the day (with If-None-Match) for details.
+
+    Each open stream holds a worker thread for up to
+    AVAILABILITY_STREAM_MAX_SECONDS, so the server must run threaded or
+    async workers (e.g. gunicorn with the gthread or gevent worker class);
+    with sync workers a single stream blocks a whole worker process. Streams
+    are capped per process and per client address, beyond which the request
+    is answered with 503.
+    """
+    _handle_jwt_auth()
+    is_member = current_user.is_authenticated
+
+    last_cursor = request.headers.get('Last-Event-ID') or request.args.get('cursor')
+    broadcaster, start_sequence, replayed = AvailabilityStreamService.subscribe(last_cursor)
+
+    client = get_remote_address()
+    if not broadcaster.open_stream(
+        client,
+        current_app.config.get('AVAILABILITY_STREAM_MAX_CONNECTIONS', 50),
+        current_app.config.get('AVAILABILITY_STREAM_MAX_PER_CLIENT', 3)
+    ):
+        response = jsonify({'error': 'Zu viele offene Verbindungen. Bitte versuche es später erneut.'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(current_app.config.get('AVAILABILITY_STREAM_HEARTBEAT_SECONDS', 15))
+        return response
+
+    heartbeat_seconds = current_app.config.get('AVAILABILITY_STREAM_HEARTBEAT_SECONDS', 15)
+    deadline = monotonic() + current_app.config.get('AVAILABILITY_STREAM_MAX_SECONDS', 300)
+
+    # Runs after the request context is gone: uses only the broadcaster
+    def generate():
+        sequence = start_sequence
+        yield f'retry: {heartbeat_seconds * 1000}\n\n'
+        yield _sse_message('ready', {'replayed': replayed}, broadcaster.cursor(sequence))
+        if last_cursor and not replayed:
+            yield _sse_message('reset', {'reason': 'cursor_expired'}, broadcaster.cursor(sequence))
+
+        while True:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return
+
+            events = broadcaster.wait(sequence, min(heartbeat_seconds, remaining))
+            if not events:
+                yield ': keepalive\n\n'
+                continue
+
+            if events[0][0] > sequence + 1:
+                # This client fell behind the buffer
+                sequence = events[-1][0]
+                yield _sse_message('reset', {'reason': 'events_dropped'}, broadcaster.cursor(sequence))
+                continue
+
+            for sequence, payload in events:
+                if not is_member and payload['status'] == 'short_notice':
+                    payload = dict(payload, status='reserved')
+                yield _sse_message('slot', payload, broadcaster.cursor(sequence))
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'X-Accel-Buffering': 'no'
     })
+    response.call_on_close(lambda: broadcaster.close_stream(client))
+    return response
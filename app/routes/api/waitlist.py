@@ -0,0 +1,68 @@
+"""
+API Waitlist Module
+
+Waitlists for taken court slots (web and mobile).
+"""
+
+from flask import request, jsonify
+from flask_login import current_user
+
+from app.services.waitlist_service import WaitlistService
+from app.decorators.auth import jwt_or_session_required
+from app.utils.validators import (
+    ValidationError,
+    validate_date_format,
+    validate_time_format,
+    validate_integer
+)
+from . import bp
+
+
+@bp.route('/waitlist/', methods=['GET'])
+@jwt_or_session_required
+def list_waitlist_entries():
+    """List the current user's upcoming waitlist entries with queue positions."""
+    entries = WaitlistService.get_member_entries(current_user.id)
+    return jsonify({
+        'entries': [dict(entry.to_dict(), position=position) for entry, position in entries]
+    })
+
+
+@bp.route('/waitlist/', methods=['POST'])
+@jwt_or_session_required
+def join_waitlist():
+    """Join the waitlist of a taken slot.
+
+    The current user is booked automatically if the slot is freed and they
+    are first in line and may book it.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'JSON body required'}), 400
+
+    try:
+        court_id = validate_integer(data.get('court_id'), 'court_id', min_value=1, max_value=6)
+        slot_date = validate_date_format(data.get('date'), 'date')
+        start_time = validate_time_format(data.get('start_time'), 'start_time')
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    entry, error = WaitlistService.join(court_id, slot_date, start_time, current_user.id)
+    if error:
+        return jsonify({'error': error}), 400
+
+    return jsonify({
+        'message': 'Du stehst jetzt auf der Warteliste',
+        'entry': entry.to_dict()
+    }), 201
+
+
+@bp.route('/waitlist/<int:id>', methods=['DELETE'])
+@jwt_or_session_required
+def leave_waitlist(id):
+    """Leave a waitlist."""
+    success, error = WaitlistService.leave(id, current_user.id)
+    if error:
+        return jsonify({'error': error}), 404
+
+    return jsonify({'message': 'Du stehst nicht mehr auf der Warteliste'})
@@ -1,13 +1,11 @@
 """Court and availability routes."""
 from flask import Blueprint, render_template, jsonify, request, current_app
 from flask_login import login_required, current_user
-from datetime import date, time, datetime
+from datetime import date, time
 import logging
-from app import db, limiter
-from app.models import Court, Block
-from app.services.reservation_service import ReservationService
-from app.services.block_service import BlockService
-from app.services.anonymous_filter_service import AnonymousDataFilter
+from app import limiter
+from app.models import Court
+from app.services.availability_service import AvailabilityService
 
 bp = Blueprint('courts', __name__, url_prefix='/courts')
 
@@ -195,88 +193,15 @@ def get_availability():
     from app.utils.timezone_utils import get_current_berlin_time
     current_time = get_current_berlin_time()
     
-    # Get all courts
-    courts = Court.query.order_by(Court.number).all()
-    
-    # Get reservations for the date
-    reservations = ReservationService.get_reservations_by_date(query_date)
-    
-    # Get blocks for the date
-    blocks = BlockService.get_blocks_by_date(query_date)
-    
-    # Build availability grid
-    # Time slots from 08:00 to 22:00 (14 slots: 08:00-09:00, 09:00-10:00, ..., 21:00-22:00)
-    time_slots = []
-    for hour in range(8, 22):
-        time_slots.append(time(hour, 0))
-    
-    grid = []
-    for court in courts:
-        court_data = {
-            'court_id': court.id,
-            'court_number': court.number,
-            'slots': []
-        }
-        
-        for slot_time in time_slots:
-            slot = {
-                'time': slot_time.strftime('%H:%M'),
-                'status': 'available',
-                'details': None
-            }
-            
-            # Check if blocked
-            for block in blocks:
-                if (block.court_id == court.id and
-                    block.start_time <= slot_time < block.end_time):
-                    slot['status'] = 'blocked'
-                    slot['details'] = {
-                        'reason': block.reason_obj.name if block.reason_obj else 'Unbekannt',
-                        'details': block.details if block.details else '',
-                        'block_id': block.id
-                    }
-                    break
-            
-            # Check if reserved (only if not blocked)
-            if slot['status'] == 'available':
-                for reservation in reservations:
-                    if (reservation.court_id == court.id and 
-                        reservation.start_time == slot_time and
-                        reservation.status == 'active'):
-                        
-                        # Use time-based logic to determine if reservation is still active
-                        is_reservation_active = ReservationService.is_reservation_currently_active(reservation, current_time)
-                        
-                        # Only show as reserved if the reservation is still active
-                        if is_reservation_active:
-                            # Set status based on whether it's a short notice booking
-                            slot['status'] = 'short_notice' if reservation.is_short_notice else 'reserved'
-                            slot['details'] = {
-                                'booked_for': f"{reservation.booked_for.firstname} {reservation.booked_for.lastname}",
-                                'booked_for_id': reservation.booked_for_id,
-                                'booked_by': f"{reservation.booked_by.firstname} {reservation.booked_by.lastname}",
-                                'booked_by_id': reservation.booked_by_id,
-                                'reservation_id': reservation.id,
-                                'is_short_notice': reservation.is_short_notice,
-                                'is_active': is_reservation_active,
-                                'booking_status': 'active'
-                            }
-                        else:
-                            # Reservation has ended, slot becomes available
-                            slot['status'] = 'available'
-                        break
-            
-            court_data['slots'].append(slot)
-        
-        grid.append(court_data)
-    
-    # Filter data based on authentication status
-    filtered_grid = AnonymousDataFilter.filter_availability_data(grid, is_authenticated)
+    # Render the grid from the shared per-date snapshot; anonymous viewers
+    # get a view without member data instead of a filtered copy
+    snapshot = AvailabilityService.get_day_snapshot(query_date, current_time)
+    grid = AvailabilityService.build_grid(snapshot, is_authenticated, current_time)
 
     # Pre-compute CSS classes and display content for each slot
     # This eliminates 252 JS function calls per render (84 cells × 3 calls each)
     current_user_id = current_user.id if is_authenticated else None
-    for court_data in filtered_grid:
+    for court_data in grid:
         for slot in court_data['slots']:
             slot_time = time.fromisoformat(slot['time'])
             is_past = _is_slot_in_past(slot_time, query_date, current_time)
@@ -295,7 +220,7 @@ def get_availability():
     # Add metadata about real-time updates
     response_data = {
         'date': date_str,
-        'grid': filtered_grid,
+        'grid': grid,
         'metadata': {
             'generated_at': current_time.isoformat(),
             'uses_realtime_logic': True,
@@ -336,43 +261,24 @@ def get_realtime_availability():
     
     # Get all courts
     courts = Court.query.order_by(Court.number).all()
-    
-    # Get reservations for the date
-    reservations = ReservationService.get_reservations_by_date(query_date)
-    
-    # Calculate availability statistics using active booking session logic
-    total_slots = len(courts) * 14  # 6 courts * 14 time slots (08:00-22:00)
-    active_reservations = 0
-    past_reservations = 0
-    short_notice_active = 0
-    
-    for reservation in reservations:
-        if reservation.status == 'active':
-            is_active = ReservationService.is_reservation_currently_active(reservation, current_time)
-            if is_active:
-                active_reservations += 1
-                if reservation.is_short_notice:
-                    short_notice_active += 1
-            else:
-                past_reservations += 1
-    
-    # Get blocks for the date
-    blocks = BlockService.get_blocks_by_date(query_date)
-    blocked_slots = len(blocks)  # Simplified count
-    
-    available_slots = total_slots - active_reservations - blocked_slots
-    
+
+    # Count slots from the shared per-date snapshot using active booking session logic
+    snapshot = AvailabilityService.get_day_snapshot(query_date, current_time)
+    summary = AvailabilityService.summarize(snapshot, current_time)
+    total_slots = summary['total_slots']
+    available_slots = summary['available_slots']
+
     return jsonify({
         'date': date_str,
         'current_time': current_time.isoformat(),
         'availability_summary': {
             'total_slots': total_slots,
             'available_slots': available_slots,
-            'active_reservations': active_reservations,
-            'past_reservations': past_reservations,
-            'short_notice_active': short_notice_active,
-            'blocked_slots': blocked_slots,
-            'availability_percentage': round((available_slots / total_slots) * 100, 1)
+            'active_reservations': summary['active_reservations'],
+            'past_reservations': summary['past_reservations'],
+            'short_notice_active': summary['short_notice_active'],
+            'blocked_slots': summary['blocked_slots'],
+            'availability_percentage': round((available_slots / total_slots) * 100, 1) if total_slots else 0.0
         },
         'courts': [
             {
@@ -1,4 +1,3 @@
 """Services package for Tennis Club Reservation System."""
 
 from .block_reason_service import BlockReasonService
-from .anonymous_filter_service import AnonymousDataFilter
@@ -0,0 +1,392 @@
+"""Per-date availability snapshot cache for the court grid.
+
+Snapshots hold the member-neutral part of a day's availability (occupied slots,
+member names, block reasons). The per-viewer part - whether the viewer may
+cancel a booking - is overlaid on read from the cached reservation facts, so a
+cache hit needs no database round-trips.
+
+Snapshots are invalidated explicitly by the reservation and block write paths,
+once their transaction commits. Each date carries a generation counter: a
+snapshot built from data read before an invalidation is never stored, even if
+the build finishes afterwards.
+
+Invalidation also bumps the date's persistent change version (shared by all
+worker processes) in the write's own transaction. Snapshots remember the version they were built from, which
+the availability API turns into ETags for conditional requests.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models import AvailabilityVersion, SystemSetting
+from app.services.validation_service import ValidationService
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on cached dates per process (a bit more than a year of days)
+MAX_SNAPSHOTS = 400
+
+# SystemSetting holding a random token that changes whenever all dates change
+EPOCH_SETTING_KEY = 'availability_epoch'
+
+# Session.info key of the dates whose snapshots are dropped when the transaction commits
+_INVALIDATED_DATES_KEY = 'availability_invalidated_dates'
+
+# Scalar reservation data needed to evaluate cancellation and time rules without the ORM
+ReservationFacts = namedtuple('ReservationFacts', [
+    'id', 'date', 'start_time', 'end_time', 'status', 'is_short_notice', 'booked_for_id', 'booked_by_id'
+])
+
+# One occupied slot: member-facing dict (without can_cancel), anonymous dict,
+# and the facts of the reservation (or suspended reservation) shown in the slot
+OccupiedSlot = namedtuple('OccupiedSlot', [
+    'slot', 'anonymous_slot', 'reservation', 'suspended_reservation'
+])
+
+
+def reservation_facts(reservation):
+    """Extract the cancellation- and time-relevant fields of a Reservation."""
+    return ReservationFacts(
+        id=reservation.id,
+        date=reservation.date,
+        start_time=reservation.start_time,
+        end_time=reservation.end_time,
+        status=reservation.status,
+        is_short_notice=reservation.is_short_notice,
+        booked_for_id=reservation.booked_for_id,
+        booked_by_id=reservation.booked_by_id
+    )
+
+
+class AvailabilitySnapshot:
+    """Member-neutral availability of all courts for a single date."""
+
+    def __init__(self, query_date, courts, version=None):
+        """
+        Args:
+            query_date: Date the snapshot describes
+            courts: List of (court_id, court_number, [OccupiedSlot]) tuples
+            version: Change version read before building, or None if unknown
+        """
+        self.date = query_date
+        self.courts = courts
+        self.version = version
+        self.built_at = time.monotonic()
+        # Rendered anonymous response body, filled lazily by the availability engine
+        self.public_body = None
+
+    def project(self, viewer_id, current_time):
+        """
+        Render the sparse courts list for a viewer.
+
+        Slots without viewer-specific data are shared with the snapshot, so the
+        result must be treated as read-only.
+
+        Args:
+            viewer_id: ID of the authenticated member, or None for anonymous viewers
+            current_time: Current Berlin time (for cancellation eligibility)
+
+        Returns:
+            list: Court data dicts with occupied slots
+        """
+        can_cancel = {}
+        if viewer_id is not None:
+            can_cancel = ValidationService.get_cancellation_eligibility_batch(
+                [
+                    entry.reservation or entry.suspended_reservation
+                    for _, _, slots in self.courts
+                    for entry in slots
+                    if entry.reservation or entry.suspended_reservation
+                ],
+                viewer_id,
+                current_time
+            )
+
+        courts_data = []
+        for court_id, court_number, slots in self.courts:
+            occupied = []
+            for entry in slots:
+                if viewer_id is None:
+                    occupied.append(entry.anonymous_slot)
+                elif entry.reservation is not None:
+                    details = dict(entry.slot['details'], can_cancel=can_cancel[entry.reservation.id])
+                    occupied.append(dict(entry.slot, details=details))
+                elif entry.suspended_reservation is not None:
+                    suspended = dict(
+                        entry.slot['details']['suspended_reservation'],
+                        can_cancel=can_cancel[entry.suspended_reservation.id]
+                    )
+                    details = dict(entry.slot['details'], suspended_reservation=suspended)
+                    occupied.append(dict(entry.slot, details=details))
+                else:
+                    occupied.append(entry.slot)
+
+            courts_data.append({
+                'court_id': court_id,
+                'court_number': court_number,
+                'occupied': occupied
+            })
+
+        return courts_data
+
+
+def availability_etag(snapshot, viewer_id, current_hour, courts_data):
+    """
+    Build the entity tag for a viewer's projection of a snapshot.
+
+    The date's change version covers the shared data; the viewer, the current
+    hour and the can_cancel flags cover what differs per viewer and over time.
+    Response metadata such as generated_at is not part of the tag.
+
+    Args:
+        snapshot: AvailabilitySnapshot that was projected
+        viewer_id: ID of the authenticated member, or None for anonymous viewers
+        current_hour: current_hour value of the response (None if not today)
+        courts_data: Result of snapshot.project()
+
+    Returns:
+        str | None: Entity tag (unquoted), or None if the version is unknown
+    """
+    if snapshot.version is None:
+        return None
+
+    flags = []
+    for court in courts_data:
+        for slot in court['occupied']:
+            details = slot['details'] or {}
+            if 'suspended_reservation' in details:
+                details = details['suspended_reservation']
+            if 'can_cancel' in details:
+                flags.append('1' if details['can_cancel'] else '0')
+
+    digest = hashlib.sha1(
+        f"{viewer_id}|{current_hour}|{''.join(flags)}".encode()
+    ).hexdigest()[:12]
+    return f'{snapshot.date.isoformat()}.{snapshot.version}.{digest}'
+
+
+def _record_changes(dates):
+    """
+    Bump the persistent change versions of the given dates in the current transaction.
+
+    One upsert in date order, so concurrent writes creating the same rows
+    wait for each other instead of failing.
+    """
+    table = AvailabilityVersion.__table__
+    now = datetime.utcnow()
+    rows = [{'date': changed_date, 'version': 1, 'updated_at': now} for changed_date in sorted(dates)]
+    if db.engine.dialect.name == 'mysql':
+        statement = mysql.insert(table).values(rows).on_duplicate_key_update(
+            version=table.c.version + 1, updated_at=now
+        )
+    else:
+        statement = sqlite.insert(table).values(rows).on_conflict_do_update(
+            index_elements=[table.c.date], set_={'version': table.c.version + 1, 'updated_at': now}
+        )
+    db.session.execute(statement)
+
+
+class _SnapshotStore:
+    """Process-local snapshot storage for one application instance."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshots = OrderedDict()
+        self.generations = {}
+        self.epoch = 0
+
+
+def _get_store():
+    """Get the snapshot store of the current app, creating it if necessary."""
+    if not has_app_context():
+        return None
+    if not current_app.config.get('AVAILABILITY_CACHE_ENABLED', True):
+        return None
+    store = current_app.extensions.get('availability_cache')
+    if store is None:
+        store = current_app.extensions.setdefault('availability_cache', _SnapshotStore())
+    return store
+
+
+def _drop_snapshots(session):
+    """after_commit listener: drop the snapshots of the dates changed by the transaction."""
+    dates = session.info.pop(_INVALIDATED_DATES_KEY, None)
+    store = _get_store()
+    if not dates or store is None:
+        return
+
+    with store.lock:
+        for changed_date in dates:
+            store.generations[changed_date] = store.generations.get(changed_date, 0) + 1
+            store.snapshots.pop(changed_date, None)
+
+
+def _discard_invalidations(session, *args):
+    """after_rollback listener: nothing was committed."""
+    session.info.pop(_INVALIDATED_DATES_KEY, None)
+
+
+def register_snapshot_invalidation():
+    """Drop the snapshots of the dates a transaction of the application session changed once it commits."""
+    for name, listener in (
+        ('after_commit', _drop_snapshots),
+        ('after_rollback', _discard_invalidations)
+    ):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+
+class AvailabilityCacheService:
+    """Service for caching per-date availability snapshots."""
+
+    @staticmethod
+    def get_snapshot(query_date):
+        """
+        Get the cached snapshot for a date.
+
+        Args:
+            query_date: Date to look up
+
+        Returns:
+            AvailabilitySnapshot | None: Cached snapshot, or None on a miss
+        """
+        store = _get_store()
+        if store is None:
+            return None
+
+        ttl = current_app.config.get('AVAILABILITY_CACHE_TTL_SECONDS', 30)
+        with store.lock:
+            snapshot = store.snapshots.get(query_date)
+            if snapshot is None:
+                return None
+            if time.monotonic() - snapshot.built_at > ttl:
+                del store.snapshots[query_date]
+                return None
+            store.snapshots.move_to_end(query_date)
+            return snapshot
+
+    @staticmethod
+    def get_generation(query_date):
+        """
+        Get the current generation token for a date.
+
+        Must be read BEFORE querying the data a snapshot is built from and
+        passed to store_snapshot() afterwards.
+
+        Args:
+            query_date: Date to look up
+
+        Returns:
+            tuple | None: Opaque generation token
+        """
+        store = _get_store()
+        if store is None:
+            return None
+        with store.lock:
+            return (store.epoch, store.generations.get(query_date, 0))
+
+    @staticmethod
+    def get_versions(dates):
+        """
+        Read the persistent change versions of the given dates.
+
+        Like get_generation(), must be read BEFORE the snapshot data.
+
+        Args:
+            dates: Iterable of dates
+
+        Returns:
+            dict: date -> version string; empty if the versions could not be read
+        """
+        dates = list(dates)
+        try:
+            epoch = SystemSetting.query.filter_by(key=EPOCH_SETTING_KEY).first()
+            rows = db.session.query(AvailabilityVersion.date, AvailabilityVersion.version).filter(
+                AvailabilityVersion.date.in_(dates)
+            ).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to read availability versions: {e}")
+            return {}
+
+        epoch_token = epoch.value if epoch and epoch.value else '0'
+        versions = {row.date: row.version for row in rows}
+        return {day: f'{epoch_token}-{versions.get(day, 0)}' for day in dates}
+
+    @staticmethod
+    def store_snapshot(snapshot, generation):
+        """
+        Store a snapshot unless its date was invalidated while it was built.
+
+        Args:
+            snapshot: AvailabilitySnapshot to store
+            generation: Token from get_generation() taken before the build
+
+        Returns:
+            bool: True if the snapshot was stored
+        """
+        store = _get_store()
+        if store is None or generation is None:
+            return False
+
+        with store.lock:
+            if generation != (store.epoch, store.generations.get(snapshot.date, 0)):
+                logger.debug(f"Discarding stale availability snapshot for {snapshot.date}")
+                return False
+            store.snapshots[snapshot.date] = snapshot
+            store.snapshots.move_to_end(snapshot.date)
+            while len(store.snapshots) > MAX_SNAPSHOTS:
+                store.snapshots.popitem(last=False)
+            return True
+
+    @staticmethod
+    def invalidate(*dates):
+        """
+        Bump the change versions of the given dates and invalidate their snapshots.
+
+        Call in the transaction of a change to reservations or blocks on these
+        dates, before committing it: the versions are written by that
+        transaction (no commit of its own), and this process drops the
+        snapshots once it commits.
+
+        Args:
+            *dates: Dates whose availability changed (None values are ignored)
+        """
+        dates = {changed_date for changed_date in dates if changed_date is not None}
+        if not dates:
+            return
+
+        _record_changes(dates)
+        db.session.info.setdefault(_INVALIDATED_DATES_KEY, set()).update(dates)
+
+    @staticmethod
+    def invalidate_all():
+        """Invalidate every snapshot (e.g. after member names or pictures change)."""
+        try:
+            setting = SystemSetting.query.filter_by(key=EPOCH_SETTING_KEY).first()
+            if setting is None:
+                setting = SystemSetting(key=EPOCH_SETTING_KEY)
+                db.session.add(setting)
+            setting.value = uuid.uuid4().hex[:12]
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Failed to record availability epoch change: {e}")
+
+        store = _get_store()
+        if store is None:
+            return
+
+        with store.lock:
+            store.epoch += 1
+            store.generations.clear()
+            store.snapshots.clear()
@@ -0,0 +1,143 @@
+"""Persistent change log of court slots for the incremental availability feed.
+
+Write paths record every slot they touched (via
+AvailabilityStreamService.publish_slot_changes) in their own transaction.
+The log's ascending IDs serve as cursors: a client holding cursor N asks for
+the slots changed after N and gets their current state, read from the
+availability engine, plus the cursor to use next time.
+
+Unlike the snapshot cache and the event stream, the log lives in the database,
+so it covers writes from all worker processes.
+"""
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app import db
+from app.models import AvailabilityChange
+from app.services.availability_cache_service import AvailabilityCacheService
+
+# Prune expired entries every this many recorded changes
+PRUNE_INTERVAL = 500
+
+
+def _prune(retention_days):
+    """Delete expired entries, always keeping the newest one (it anchors cursors)."""
+    newest_id = db.session.query(db.func.max(AvailabilityChange.id)).scalar()
+    AvailabilityChange.query.filter(
+        AvailabilityChange.created_at < datetime.utcnow() - timedelta(days=retention_days),
+        AvailabilityChange.id < newest_id
+    ).delete(synchronize_session=False)
+
+
+class AvailabilityChangeService:
+    """Service for recording and reading court slot changes."""
+
+    @staticmethod
+    def record_slot_changes(slots):
+        """
+        Append changed slots to the change log in the current transaction.
+
+        Call in the transaction of the write that changed the slots, before
+        committing it (no commit of its own): the entries then exist exactly
+        when the change does.
+
+        Args:
+            slots: Iterable of (date, court_id, hour) tuples
+        """
+        slots = sorted({slot for slot in slots if slot[0] is not None})
+        if not slots:
+            return
+
+        changes = [
+            AvailabilityChange(date=slot_date, court_id=court_id, hour=hour)
+            for slot_date, court_id, hour in slots
+        ]
+        db.session.add_all(changes)
+        db.session.flush()
+        if any(change.id % PRUNE_INTERVAL == 0 for change in changes):
+            _prune(current_app.config.get('AVAILABILITY_CHANGES_RETENTION_DAYS', 30))
+
+    @staticmethod
+    def get_latest_cursor():
+        """
+        Get the cursor of the newest change.
+
+        Returns:
+            str: Cursor ('0' if nothing was recorded yet)
+        """
+        newest_id = db.session.query(db.func.max(AvailabilityChange.id)).scalar()
+        return str(newest_id or 0)
+
+    @staticmethod
+    def get_changes(since_id, viewer_id, current_time, limit=500):
+        """
+        Get the current state of the slots changed after a cursor.
+
+        Entries younger than AVAILABILITY_CHANGES_SETTLE_SECONDS are left for
+        the next call, so an entry committed late by a concurrent write can't
+        be skipped by a cursor that already moved past its ID.
+
+        Args:
+            since_id: Change log ID from a previous response's cursor
+            viewer_id: ID of the authenticated member, or None for anonymous viewers
+            current_time: Current Berlin time
+            limit: Maximum number of log entries to read
+
+        Returns:
+            tuple: (changes, cursor, has_more, error). changes is a list of
+                   slot dicts in the sparse format with date, court_id and
+                   court_number added; free slots have status 'available'.
+                   error is set if the cursor is unknown or expired; the
+                   client must then reload and continue from the returned cursor.
+        """
+        oldest_id, newest_id = db.session.query(
+            db.func.min(AvailabilityChange.id), db.func.max(AvailabilityChange.id)
+        ).one()
+        if since_id > (newest_id or 0) or (oldest_id is not None and since_id < oldest_id - 1):
+            return [], str(newest_id or 0), False, 'Cursor abgelaufen'
+
+        settle = current_app.config.get('AVAILABILITY_CHANGES_SETTLE_SECONDS', 2)
+        rows = db.session.query(
+            AvailabilityChange.id, AvailabilityChange.date,
+            AvailabilityChange.court_id, AvailabilityChange.hour
+        ).filter(
+            AvailabilityChange.id > since_id,
+            AvailabilityChange.created_at <= datetime.utcnow() - timedelta(seconds=settle)
+        ).order_by(AvailabilityChange.id).limit(limit).all()
+
+        if not rows:
+            return [], str(since_id), False, None
+
+        from app.services.availability_service import AvailabilityService
+
+        # Versions are read after the log, so they cover every change in it
+        dates = sorted({row.date for row in rows})
+        versions = AvailabilityCacheService.get_versions(dates)
+        snapshots = AvailabilityService.get_day_snapshots(dates, current_time, versions or None)
+
+        views = {}
+        changes = []
+        for slot_date, court_id, hour in sorted({(row.date, row.court_id, row.hour) for row in rows}):
+            if slot_date not in views:
+                courts_data = snapshots[slot_date].project(viewer_id, current_time)
+                views[slot_date] = (
+                    {court['court_id']: court['court_number'] for court in courts_data},
+                    {
+                        (court['court_id'], slot['time']): slot
+                        for court in courts_data
+                        for slot in court['occupied']
+                    }
+                )
+            court_numbers, occupied = views[slot_date]
+
+            slot_time = f'{hour:02d}:00'
+            slot = occupied.get((court_id, slot_time)) or {
+                'time': slot_time, 'status': 'available', 'details': None
+            }
+            changes.append(dict(
+                slot, date=slot_date.isoformat(), court_id=court_id,
+                court_number=court_numbers.get(court_id)
+            ))
+
+        return changes, str(rows[-1].id), len(rows) == limit, None
@@ -0,0 +1,624 @@
+"""Shared court availability engine.
+
+Computes the availability of all courts once per date and serves every
+consumer from that result: the sparse API format (authenticated and
+anonymous) and its compact columnar encoding, the pre-rendered public body,
+the full web grid and the real-time summary.
+
+A date is built into a member-neutral AvailabilitySnapshot from one batch of
+column queries and kept in the snapshot cache. Viewer-specific output is
+rendered from the snapshot on read as a view: slots are shared with the
+snapshot wherever nothing viewer-specific is added, so callers must treat
+the results as read-only unless documented otherwise.
+"""
+import json
+from datetime import time
+
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models import Block, BlockReason, Court, Member, Reservation
+from app.services.availability_cache_service import (
+    AvailabilityCacheService,
+    AvailabilitySnapshot,
+    OccupiedSlot,
+    reservation_facts
+)
+from app.services.reservation_service import ReservationService
+from app.utils.slot_occupancy import (
+    DayOccupancy,
+    GRID_END_HOUR,
+    GRID_START_HOUR,
+    iter_hours
+)
+from app.utils.timezone_utils import ensure_berlin_timezone
+
+
+def _build_day_snapshot(query_date, courts, occupancy, version=None):
+    """Build the member-neutral availability snapshot for a single day.
+
+    Cancellation eligibility is not part of the snapshot; it is overlaid per
+    viewer by AvailabilitySnapshot.project().
+
+    Args:
+        query_date: The date being built
+        courts: List of (id, number) court rows
+        occupancy: DayOccupancy index of the date, built from _query_availability_rows() rows
+        version: Change version of the date, read before the data
+
+    Returns:
+        AvailabilitySnapshot for the date
+    """
+    courts_data = []
+    for court in courts:
+        occupied = []
+
+        # Only visit occupied slots; free slots are implied by absence
+        for hour in iter_hours(occupancy.occupied_mask(court.id)):
+            slot_time = time(hour, 0).strftime('%H:%M')
+            temp_block, regular_block = occupancy.blocks_at(court.id, hour)
+
+            # Prioritize temp blocks (they suspend/overlay regular blocks)
+            if temp_block:
+                block_details = {
+                    'reason': temp_block.reason_name or 'Unbekannt',
+                    'details': temp_block.details if temp_block.details else '',
+                    'block_id': temp_block.id,
+                    'is_temporary': True
+                }
+
+                # Include underlying regular block info if exists
+                if regular_block:
+                    block_details['underlying_block'] = {
+                        'reason': regular_block.reason_name or 'Unbekannt',
+                        'details': regular_block.details if regular_block.details else '',
+                        'block_id': regular_block.id
+                    }
+
+                anonymous_slot = {
+                    'time': slot_time,
+                    'status': 'blocked_temporary',
+                    'details': block_details
+                }
+
+                # Include suspended reservation info (authenticated viewers only)
+                suspended_facts = None
+                member_details = block_details
+                suspended_res = occupancy.suspended_reservation_at(court.id, hour)
+                if suspended_res:
+                    suspended_facts = reservation_facts(suspended_res)
+                    member_details = dict(block_details, suspended_reservation={
+                        'booked_for': f"{suspended_res.booked_for_firstname} {suspended_res.booked_for_lastname}",
+                        'booked_for_id': suspended_res.booked_for_id,
+                        'booked_for_has_profile_picture': suspended_res.booked_for_has_profile_picture,
+                        'booked_for_profile_picture_version': suspended_res.booked_for_profile_picture_version,
+                        'booked_by_id': suspended_res.booked_by_id,
+                        'reservation_id': suspended_res.id,
+                        'is_short_notice': suspended_res.is_short_notice
+                    })
+
+                occupied.append(OccupiedSlot(
+                    slot=dict(anonymous_slot, details=member_details),
+                    anonymous_slot=anonymous_slot,
+                    reservation=None,
+                    suspended_reservation=suspended_facts
+                ))
+            elif regular_block:
+                slot = {
+                    'time': slot_time,
+                    'status': 'blocked',
+                    'details': {
+                        'reason': regular_block.reason_name or 'Unbekannt',
+                        'details': regular_block.details if regular_block.details else '',
+                        'block_id': regular_block.id,
+                        'is_temporary': False
+                    }
+                }
+                occupied.append(OccupiedSlot(
+                    slot=slot, anonymous_slot=slot, reservation=None, suspended_reservation=None
+                ))
+            else:
+                reservation = occupancy.reservation_at(court.id, hour)
+                slot = {
+                    'time': slot_time,
+                    'status': 'short_notice' if reservation.is_short_notice else 'reserved',
+                    'details': {
+                        'booked_for': f"{reservation.booked_for_firstname} {reservation.booked_for_lastname}",
+                        'booked_for_id': reservation.booked_for_id,
+                        'booked_for_has_profile_picture': reservation.booked_for_has_profile_picture,
+                        'booked_for_profile_picture_version': reservation.booked_for_profile_picture_version,
+                        'booked_by': f"{reservation.booked_by_firstname} {reservation.booked_by_lastname}",
+                        'booked_by_id': reservation.booked_by_id,
+                        'booked_by_has_profile_picture': reservation.booked_by_has_profile_picture,
+                        'booked_by_profile_picture_version': reservation.booked_by_profile_picture_version,
+                        'reservation_id': reservation.id,
+                        'is_short_notice': reservation.is_short_notice
+                    }
+                }
+                occupied.append(OccupiedSlot(
+                    slot=slot,
+                    anonymous_slot={'time': slot_time, 'status': 'reserved', 'details': None},
+                    reservation=reservation_facts(reservation),
+                    suspended_reservation=None
+                ))
+
+        courts_data.append((court.id, court.number, occupied))
+
+    return AvailabilitySnapshot(query_date, courts_data, version)
+
+
+def _build_day_occupancy(query_date, courts, reservations, blocks, suspended_reservations, current_time):
+    """Build the occupancy index for a single day.
+
+    Args:
+        query_date: The date being queried
+        courts: List of (id, number) court rows
+        reservations: Active reservation rows for this date
+        blocks: Block rows for this date
+        suspended_reservations: Suspended reservation rows for this date
+        current_time: Current Berlin time
+
+    Returns:
+        DayOccupancy for the date
+    """
+    if query_date > current_time.date():
+        reservations = [
+            reservation for reservation in reservations
+            if ReservationService.is_reservation_currently_active(reservation, current_time)
+        ]
+
+    return DayOccupancy.build(
+        query_date,
+        [court.id for court in courts],
+        reservations=reservations,
+        blocks=blocks,
+        suspended_reservations=suspended_reservations
+    )
+
+
+def _query_availability_rows(first_date, last_date):
+    """Fetch the availability data of a date range as plain rows.
+
+    Selects only the columns the snapshot builder reads, with member names
+    and picture fields joined in, so no ORM objects are hydrated.
+
+    Args:
+        first_date: First date of the range
+        last_date: Last date of the range (inclusive)
+
+    Returns:
+        Tuple of (courts, reservations, blocks, suspended_reservations) row lists
+    """
+    booked_for = aliased(Member)
+    booked_by = aliased(Member)
+
+    courts = db.session.query(Court.id, Court.number).order_by(Court.number).all()
+
+    reservation_columns = (
+        Reservation.id,
+        Reservation.court_id,
+        Reservation.date,
+        Reservation.start_time,
+        Reservation.end_time,
+        Reservation.status,
+        Reservation.is_short_notice,
+        Reservation.booked_for_id,
+        Reservation.booked_by_id,
+        booked_for.firstname.label('booked_for_firstname'),
+        booked_for.lastname.label('booked_for_lastname'),
+        booked_for.has_profile_picture.label('booked_for_has_profile_picture'),
+        booked_for.profile_picture_version.label('booked_for_profile_picture_version')
+    )
+
+    reservations = db.session.query(
+        *reservation_columns,
+        booked_by.firstname.label('booked_by_firstname'),
+        booked_by.lastname.label('booked_by_lastname'),
+        booked_by.has_profile_picture.label('booked_by_has_profile_picture'),
+        booked_by.profile_picture_version.label('booked_by_profile_picture_version')
+    ).join(
+        booked_for, Reservation.booked_for_id == booked_for.id
+    ).join(
+        booked_by, Reservation.booked_by_id == booked_by.id
+    ).filter(
+        Reservation.date.between(first_date, last_date),
+        Reservation.status == 'active'
+    ).order_by(Reservation.start_time).all()
+
+    blocks = db.session.query(
+        Block.id,
+        Block.court_id,
+        Block.date,
+        Block.start_time,
+        Block.end_time,
+        Block.details,
+        BlockReason.name.label('reason_name'),
+        db.func.coalesce(BlockReason.is_temporary, False).label('is_temporary_block')
+    ).outerjoin(
+        BlockReason, Block.reason_id == BlockReason.id
+    ).filter(
+        Block.date.between(first_date, last_date)
+    ).order_by(Block.start_time, Block.id).all()
+
+    suspended_reservations = db.session.query(*reservation_columns).join(
+        booked_for, Reservation.booked_for_id == booked_for.id
+    ).filter(
+        Reservation.date.between(first_date, last_date),
+        Reservation.status == 'suspended'
+    ).all()
+
+    return courts, reservations, blocks, suspended_reservations
+
+
+def _grid_slot(slot_time, entry, is_authenticated, current_time):
+    """Render one web grid slot from the snapshot entry shown in it (or None)."""
+    if entry is not None:
+        if entry.reservation is None:
+            # Blocks, temporary ones included; suspended reservations stay hidden
+            block = entry.anonymous_slot['details']
+            return {
+                'time': slot_time,
+                'status': 'blocked',
+                'details': {
+                    'reason': block['reason'],
+                    'details': block['details'],
+                    'block_id': block['block_id']
+                }
+            }
+
+        # Reservations that have ended leave the slot available
+        if ReservationService.is_reservation_currently_active(entry.reservation, current_time):
+            if not is_authenticated:
+                return {'time': slot_time, 'status': 'reserved', 'details': None}
+
+            details = entry.slot['details']
+            return {
+                'time': slot_time,
+                'status': entry.slot['status'],
+                'details': {
+                    'booked_for': details['booked_for'],
+                    'booked_for_id': details['booked_for_id'],
+                    'booked_by': details['booked_by'],
+                    'booked_by_id': details['booked_by_id'],
+                    'reservation_id': details['reservation_id'],
+                    'is_short_notice': details['is_short_notice'],
+                    'is_active': True,
+                    'booking_status': 'active'
+                }
+            }
+
+    return {'time': slot_time, 'status': 'available', 'details': None}
+
+
+# Status codes of the compact format; the index is the code
+COMPACT_STATUS_CODES = ('available', 'reserved', 'short_notice', 'blocked', 'blocked_temporary')
+
+# Column names of the compact format's tables and per-day rows
+COMPACT_SCHEMA = {
+    'courts': ['id', 'number'],
+    'members': ['id', 'name', 'has_profile_picture', 'profile_picture_version'],
+    'blocks': ['id', 'reason', 'details', 'is_temporary'],
+    'reservations': ['court', 'hour', 'reservation_id', 'booked_for', 'booked_by', 'can_cancel'],
+    'block_slots': ['court', 'hour', 'block', 'underlying_block'],
+    'suspended': ['court', 'hour', 'reservation_id', 'booked_for', 'booked_by_id', 'can_cancel']
+}
+
+
+class CompactAvailabilityEncoder:
+    """Encodes projected days into the compact columnar format.
+
+    Each day becomes one status code array per court (indexed by grid hour)
+    plus row lists for the slots with details. Members and blocks are stored
+    once in tables shared by all days and referenced by index; `court` in
+    the rows indexes the courts table.
+    """
+
+    def __init__(self):
+        self.courts = []
+        self.members = []
+        self.blocks = []
+        self._court_index = {}
+        self._member_index = {}
+        self._block_index = {}
+        self._status_codes = {status: code for code, status in enumerate(COMPACT_STATUS_CODES)}
+
+    def _court(self, court):
+        index = self._court_index.get(court['court_id'])
+        if index is None:
+            index = self._court_index[court['court_id']] = len(self.courts)
+            self.courts.append([court['court_id'], court['court_number']])
+        return index
+
+    def _member(self, member_id, name, has_profile_picture, profile_picture_version):
+        index = self._member_index.get(member_id)
+        if index is None:
+            index = self._member_index[member_id] = len(self.members)
+            self.members.append([member_id, name, has_profile_picture, profile_picture_version])
+        return index
+
+    def _block(self, block, is_temporary):
+        index = self._block_index.get(block['block_id'])
+        if index is None:
+            index = self._block_index[block['block_id']] = len(self.blocks)
+            self.blocks.append([block['block_id'], block['reason'], block['details'], is_temporary])
+        return index
+
+    def add_day(self, courts_data):
+        """
+        Encode one day.
+
+        Args:
+            courts_data: Result of AvailabilitySnapshot.project() for the day
+
+        Returns:
+            dict: status, reservations, block_slots and suspended of the day
+        """
+        status = []
+        reservations = []
+        block_slots = []
+        suspended = []
+
+        for court in courts_data:
+            court_index = self._court(court)
+            codes = [0] * (GRID_END_HOUR - GRID_START_HOUR)
+
+            for slot in court['occupied']:
+                hour = int(slot['time'][:2])
+                codes[hour - GRID_START_HOUR] = self._status_codes[slot['status']]
+                details = slot['details']
+                if details is None:
+                    continue
+
+                if 'block_id' in details:
+                    underlying = details.get('underlying_block')
+                    block_slots.append([
+                        court_index, hour,
+                        self._block(details, details['is_temporary']),
+                        self._block(underlying, False) if underlying else None
+                    ])
+                    booking = details.get('suspended_reservation')
+                    if booking:
+                        suspended.append([
+                            court_index, hour, booking['reservation_id'],
+                            self._member(
+                                booking['booked_for_id'], booking['booked_for'],
+                                booking['booked_for_has_profile_picture'],
+                                booking['booked_for_profile_picture_version']
+                            ),
+                            booking['booked_by_id'],
+                            booking.get('can_cancel', False)
+                        ])
+                else:
+                    reservations.append([
+                        court_index, hour, details['reservation_id'],
+                        self._member(
+                            details['booked_for_id'], details['booked_for'],
+                            details['booked_for_has_profile_picture'],
+                            details['booked_for_profile_picture_version']
+                        ),
+                        self._member(
+                            details['booked_by_id'], details['booked_by'],
+                            details['booked_by_has_profile_picture'],
+                            details['booked_by_profile_picture_version']
+                        ),
+                        details.get('can_cancel', False)
+                    ])
+
+            status.append(codes)
+
+        return {
+            'status': status,
+            'reservations': reservations,
+            'block_slots': block_slots,
+            'suspended': suspended
+        }
+
+    def tables(self):
+        """
+        Shared tables and format description, to be sent once per response.
+
+        Returns:
+            dict: first_hour, status_codes, schema, courts, members and blocks
+        """
+        return {
+            'first_hour': GRID_START_HOUR,
+            'status_codes': list(COMPACT_STATUS_CODES),
+            'schema': COMPACT_SCHEMA,
+            'courts': self.courts,
+            'members': self.members,
+            'blocks': self.blocks
+        }
+
+
+class AvailabilityService:
+    """Service computing court availability for all consumers."""
+
+    @staticmethod
+    def get_day_snapshots(dates, current_time, current_versions=None):
+        """Get availability snapshots for the given dates.
+
+        Cached snapshots are reused; all cache misses are built together from one
+        batch of queries covering the missing dates.
+
+        Args:
+            dates: List of dates
+            current_time: Current Berlin time
+            current_versions: Optional dict of date -> change version read by the
+                caller; cached snapshots of other versions (e.g. written by
+                another worker process) are rebuilt instead of reused
+
+        Returns:
+            Dict of date -> AvailabilitySnapshot
+        """
+        snapshots = {}
+        missing = []
+        for day in dates:
+            snapshot = AvailabilityCacheService.get_snapshot(day)
+            if snapshot is None or (
+                current_versions is not None and snapshot.version != current_versions.get(day)
+            ):
+                missing.append(day)
+            else:
+                snapshots[day] = snapshot
+
+        if not missing:
+            return snapshots
+
+        # Take generation tokens before reading, so a write that lands while we
+        # build makes store_snapshot() discard the (possibly stale) result
+        generations = {day: AvailabilityCacheService.get_generation(day) for day in missing}
+        versions = AvailabilityCacheService.get_versions(missing)
+        first_date, last_date = min(missing), max(missing)
+
+        courts, reservations, blocks, suspended_reservations = _query_availability_rows(
+            first_date, last_date
+        )
+
+        # Group data by date
+        reservations_by_date = {}
+        for res in reservations:
+            reservations_by_date.setdefault(res.date, []).append(res)
+
+        blocks_by_date = {}
+        for block in blocks:
+            blocks_by_date.setdefault(block.date, []).append(block)
+
+        suspended_by_date = {}
+        for res in suspended_reservations:
+            suspended_by_date.setdefault(res.date, []).append(res)
+
+        for day in missing:
+            occupancy = _build_day_occupancy(
+                day,
+                courts,
+                reservations_by_date.get(day, []),
+                blocks_by_date.get(day, []),
+                suspended_by_date.get(day, []),
+                current_time
+            )
+            snapshot = _build_day_snapshot(day, courts, occupancy, versions.get(day))
+            AvailabilityCacheService.store_snapshot(snapshot, generations[day])
+            snapshots[day] = snapshot
+
+        return snapshots
+
+    @staticmethod
+    def get_day_snapshot(query_date, current_time):
+        """
+        Get the availability snapshot of a single date.
+
+        Args:
+            query_date: Date to get
+            current_time: Current Berlin time
+
+        Returns:
+            AvailabilitySnapshot for the date
+        """
+        return AvailabilityService.get_day_snapshots([query_date], current_time)[query_date]
+
+    @staticmethod
+    def get_public_body(query_date, current_time):
+        """
+        Get the pre-rendered anonymous availability response of a date.
+
+        The JSON body is rendered once per snapshot and shared by all
+        anonymous requests until the date changes or the snapshot expires.
+
+        Args:
+            query_date: Date to get
+            current_time: Current Berlin time
+
+        Returns:
+            tuple: (body bytes, entity tag or None if the version is unknown)
+        """
+        snapshot = AvailabilityService.get_day_snapshot(query_date, current_time)
+
+        body = snapshot.public_body
+        if body is None:
+            # Concurrent requests may render the same body twice; both are equal
+            body = snapshot.public_body = json.dumps({
+                'date': query_date.isoformat(),
+                'courts': snapshot.project(None, current_time),
+                'metadata': {
+                    'generated_at': current_time.isoformat(),
+                    'timezone': 'Europe/Berlin'
+                }
+            }, separators=(',', ':')).encode()
+
+        etag = None
+        if snapshot.version is not None:
+            etag = f'public.{query_date.isoformat()}.{snapshot.version}'
+        return body, etag
+
+    @staticmethod
+    def build_grid(snapshot, is_authenticated, current_time):
+        """
+        Render the full web grid of a snapshot: every grid hour of every court.
+
+        Blocks (temporary ones included) are shown as 'blocked', reservations
+        that have already ended as 'available'. Anonymous viewers see every
+        booking as 'reserved' without member details.
+
+        The slot dicts are created per call, so callers may add rendering fields.
+
+        Args:
+            snapshot: AvailabilitySnapshot to render
+            is_authenticated: Whether the viewer is a logged-in member
+            current_time: Current Berlin time
+
+        Returns:
+            list: Court dicts with court_id, court_number and slots
+        """
+        current_time = ensure_berlin_timezone(current_time)
+        slot_times = [time(hour, 0).strftime('%H:%M') for hour in range(GRID_START_HOUR, GRID_END_HOUR)]
+
+        grid = []
+        for court_id, court_number, occupied in snapshot.courts:
+            entries = {entry.slot['time']: entry for entry in occupied}
+            grid.append({
+                'court_id': court_id,
+                'court_number': court_number,
+                'slots': [
+                    _grid_slot(slot_time, entries.get(slot_time), is_authenticated, current_time)
+                    for slot_time in slot_times
+                ]
+            })
+        return grid
+
+    @staticmethod
+    def summarize(snapshot, current_time):
+        """
+        Count the grid slots of a snapshot by real-time state.
+
+        Args:
+            snapshot: AvailabilitySnapshot to count
+            current_time: Current Berlin time
+
+        Returns:
+            dict: total_slots, available_slots, active_reservations,
+                  past_reservations, short_notice_active and blocked_slots
+        """
+        current_time = ensure_berlin_timezone(current_time)
+        summary = {
+            'total_slots': len(snapshot.courts) * (GRID_END_HOUR - GRID_START_HOUR),
+            'active_reservations': 0,
+            'past_reservations': 0,
+            'short_notice_active': 0,
+            'blocked_slots': 0
+        }
+
+        for _, _, occupied in snapshot.courts:
+            for entry in occupied:
+                if entry.reservation is None:
+                    summary['blocked_slots'] += 1
+                elif ReservationService.is_reservation_currently_active(entry.reservation, current_time):
+                    summary['active_reservations'] += 1
+                    if entry.reservation.is_short_notice:
+                        summary['short_notice_active'] += 1
+                else:
+                    summary['past_reservations'] += 1
+
+        summary['available_slots'] = (
+            summary['total_slots'] - summary['active_reservations'] - summary['blocked_slots']
+        )
+        return summary
@@ -0,0 +1,261 @@
+"""In-process broadcaster of court slot changes for the availability stream.
+
+Write paths publish the slots they touched before committing. The current
+status of those slots is read in the write's transaction, and once it commits
+one event per slot is appended to a bounded in-memory log, which the SSE
+endpoint streams to connected clients. Event cursors let reconnecting clients
+replay what they missed; a cursor that is no longer in the log (or from
+another process) triggers a reset instead.
+
+The broadcaster only exists once a client has subscribed, so writes cost no
+extra queries in processes nobody streams from (apart from recording the
+slots in the persistent change log, see availability_change_service). Like
+the snapshot cache, it is process-local: writes handled by other worker
+processes are not seen.
+"""
+import logging
+import threading
+import uuid
+from collections import deque
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+from app import db
+from app.models import Block, BlockReason, Court, Reservation
+from app.services.availability_change_service import AvailabilityChangeService
+
+logger = logging.getLogger(__name__)
+
+# Session.info key of the event payloads streamed when the transaction commits
+_PENDING_EVENTS_KEY = 'availability_stream_pending_events'
+
+
+class _Broadcaster:
+    """Bounded, sequenced event log with blocking waits."""
+
+    def __init__(self, max_events):
+        self.instance = uuid.uuid4().hex[:8]
+        self.condition = threading.Condition()
+        self.events = deque(maxlen=max_events)
+        self.sequence = 0
+        # Open streams, in total and per client address
+        self.open_streams = 0
+        self.streams_by_client = {}
+
+    def cursor(self, sequence):
+        return f'{self.instance}-{sequence}'
+
+    def parse_cursor(self, cursor):
+        """Turn a client cursor into a sequence number, or None if it can't be replayed."""
+        instance, _, sequence = (cursor or '').partition('-')
+        if instance != self.instance or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        with self.condition:
+            if sequence > self.sequence:
+                return None
+            oldest = self.events[0][0] if self.events else self.sequence + 1
+            # Events between the cursor and the oldest buffered one were dropped
+            if sequence < oldest - 1:
+                return None
+        return sequence
+
+    def open_stream(self, client, max_streams, max_per_client):
+        """Count a new stream of a client; False if it would exceed a limit."""
+        with self.condition:
+            client_streams = self.streams_by_client.get(client, 0)
+            if self.open_streams >= max_streams or client_streams >= max_per_client:
+                return False
+            self.open_streams += 1
+            self.streams_by_client[client] = client_streams + 1
+            return True
+
+    def close_stream(self, client):
+        """Stop counting a stream opened with open_stream()."""
+        with self.condition:
+            self.open_streams -= 1
+            client_streams = self.streams_by_client.pop(client, 1) - 1
+            if client_streams > 0:
+                self.streams_by_client[client] = client_streams
+
+    def append(self, payloads):
+        with self.condition:
+            for payload in payloads:
+                self.sequence += 1
+                self.events.append((self.sequence, payload))
+            self.condition.notify_all()
+
+    def wait(self, after_sequence, timeout):
+        """Return events newer than after_sequence, waiting up to timeout seconds for one."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence > after_sequence, timeout)
+            return [(sequence, payload) for sequence, payload in self.events if sequence > after_sequence]
+
+    @property
+    def latest(self):
+        with self.condition:
+            return self.sequence
+
+
+def _get_broadcaster(create=False):
+    """Get the broadcaster of the current app, optionally creating it."""
+    if not has_app_context():
+        return None
+    broadcaster = current_app.extensions.get('availability_stream')
+    if broadcaster is None and create:
+        broadcaster = current_app.extensions.setdefault('availability_stream', _Broadcaster(
+            current_app.config.get('AVAILABILITY_STREAM_BUFFER_SIZE', 1000)
+        ))
+    return broadcaster
+
+
+def _broadcast_pending_events(session):
+    """after_commit listener: stream the events of the committed transaction."""
+    payloads = session.info.pop(_PENDING_EVENTS_KEY, None)
+    broadcaster = _get_broadcaster()
+    if payloads and broadcaster is not None:
+        broadcaster.append(payloads)
+
+
+def _discard_pending_events(session, *args):
+    """after_rollback listener: nothing was committed."""
+    session.info.pop(_PENDING_EVENTS_KEY, None)
+
+
+def register_slot_change_publishing():
+    """Stream the slot changes of the application session's transactions once they commit."""
+    for name, listener in (
+        ('after_commit', _broadcast_pending_events),
+        ('after_rollback', _discard_pending_events)
+    ):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+
+def reservation_slots(*reservations):
+    """Slots (date, court_id, hour) occupied by the given reservations."""
+    return {(r.date, r.court_id, r.start_time.hour) for r in reservations}
+
+
+def block_slots(*blocks):
+    """Slots (date, court_id, hour) covered by the given blocks."""
+    return {
+        (block.date, block.court_id, hour)
+        for block in blocks
+        for hour in range(block.start_time.hour, block.end_time.hour)
+    }
+
+
+def _slot_statuses(query_date, court_ids):
+    """
+    Current grid status of the occupied slots of some courts on a date.
+
+    Uses the same precedence as the availability grid: temporary blocks over
+    regular blocks over reservations.
+
+    Returns:
+        dict: (court_id, hour) -> status; free slots are absent
+    """
+    statuses = {}
+
+    blocks = db.session.query(
+        Block.court_id, Block.start_time, Block.end_time, BlockReason.is_temporary
+    ).outerjoin(
+        BlockReason, Block.reason_id == BlockReason.id
+    ).filter(
+        Block.date == query_date,
+        Block.court_id.in_(court_ids)
+    ).all()
+
+    for court_id, start_time, end_time, is_temporary in blocks:
+        for hour in range(start_time.hour, end_time.hour):
+            if is_temporary:
+                statuses[(court_id, hour)] = 'blocked_temporary'
+            else:
+                statuses.setdefault((court_id, hour), 'blocked')
+
+    reservations = db.session.query(
+        Reservation.court_id, Reservation.start_time, Reservation.is_short_notice
+    ).filter(
+        Reservation.date == query_date,
+        Reservation.court_id.in_(court_ids),
+        Reservation.status == 'active'
+    ).all()
+
+    for court_id, start_time, is_short_notice in reservations:
+        statuses.setdefault(
+            (court_id, start_time.hour), 'short_notice' if is_short_notice else 'reserved'
+        )
+
+    return statuses
+
+
+class AvailabilityStreamService:
+    """Service for publishing and streaming court slot changes."""
+
+    @staticmethod
+    def publish_slot_changes(slots):
+        """
+        Publish the status of slots changed by a write once it commits.
+
+        The slots are also appended to the persistent change log behind the
+        incremental changes feed, in the same transaction.
+
+        Call in the write's transaction, before committing. A failure to read
+        the statuses is logged and only costs the stream the events of this
+        write.
+
+        Args:
+            slots: Iterable of (date, court_id, hour) tuples
+        """
+        slots = sorted({slot for slot in slots if slot[0] is not None})
+        AvailabilityChangeService.record_slot_changes(slots)
+
+        if not slots or _get_broadcaster() is None:
+            return
+
+        try:
+            court_ids = {court_id for _, court_id, _ in slots}
+            court_numbers = dict(
+                db.session.query(Court.id, Court.number).filter(Court.id.in_(court_ids)).all()
+            )
+
+            payloads = []
+            statuses_by_date = {}
+            for slot_date, court_id, hour in slots:
+                if slot_date not in statuses_by_date:
+                    statuses_by_date[slot_date] = _slot_statuses(slot_date, court_ids)
+                payloads.append({
+                    'date': slot_date.isoformat(),
+                    'court_id': court_id,
+                    'court_number': court_numbers.get(court_id),
+                    'hour': hour,
+                    'time': f'{hour:02d}:00',
+                    'status': statuses_by_date[slot_date].get((court_id, hour), 'available')
+                })
+        except Exception as e:
+            logger.error(f"Failed to publish availability changes: {e}")
+            return
+
+        db.session.info.setdefault(_PENDING_EVENTS_KEY, []).extend(payloads)
+
+    @staticmethod
+    def subscribe(last_cursor=None):
+        """
+        Start a subscription, replaying from a client cursor if possible.
+
+        Args:
+            last_cursor: Cursor of the last event the client received, if any
+
+        Returns:
+            tuple: (broadcaster, start sequence, replayed: bool). If replayed
+                   is False while a cursor was given, the client missed
+                   events and must refetch availability.
+        """
+        broadcaster = _get_broadcaster(create=True)
+        if last_cursor:
+            sequence = broadcaster.parse_cursor(last_cursor)
+            if sequence is not None:
+                return broadcaster, sequence, True
+        return broadcaster, broadcaster.latest, False
@@ -2,6 +2,10 @@
 from app import db
 from app.models import BlockReason, Block, ReasonAuditLog
 from app.constants.messages import ErrorMessages
+from app.services.availability_cache_service import AvailabilityCacheService
+from app.services.availability_stream_service import AvailabilityStreamService, block_slots
+from app.services.outbox_service import OutboxService
+from app.services.waitlist_service import WaitlistService
 from typing import Tuple, List, Optional
 import logging
 
@@ -137,6 +141,8 @@ class BlockReasonService:
             db.session.commit()
 
             if changes:
+                # Reason names are shown on every blocked slot using this reason
+                AvailabilityCacheService.invalidate_all()
                 logger.info(f"Block reason {reason_id} updated: {', '.join(changes)} by admin {admin_id}")
             return True, None
 
@@ -349,10 +355,16 @@ class BlockReasonService:
             
             # Delete future blocks
             deleted_count = len(future_blocks)
+            affected_dates = {block.date for block in future_blocks}
+            affected_slots = block_slots(*future_blocks)
             for block in future_blocks:
                 db.session.delete(block)
             
+            AvailabilityCacheService.invalidate(*affected_dates)
+            AvailabilityStreamService.publish_slot_changes(affected_slots)
+            WaitlistService.enqueue_freed_slots(affected_slots)
             db.session.commit()
+            OutboxService.dispatch()
             
             logger.info(f"Cleaned up {deleted_count} future blocks with reason '{reason_name}'")
             return deleted_count
@@ -428,9 +440,13 @@ class BlockReasonService:
 
             # Delete all blocks referencing this reason first
             blocks_deleted = 0
+            affected_dates = set()
+            affected_slots = set()
             if usage_count > 0:
                 blocks_to_delete = Block.query.filter_by(reason_id=reason_id).all()
                 blocks_deleted = len(blocks_to_delete)
+                affected_dates = {block.date for block in blocks_to_delete}
+                affected_slots = block_slots(*blocks_to_delete)
                 for block in blocks_to_delete:
                     db.session.delete(block)
 
@@ -448,7 +464,11 @@ class BlockReasonService:
             db.session.add(audit_log)
 
             db.session.delete(reason)
+            AvailabilityCacheService.invalidate(*affected_dates)
+            AvailabilityStreamService.publish_slot_changes(affected_slots)
+            WaitlistService.enqueue_freed_slots(affected_slots)
             db.session.commit()
+            OutboxService.dispatch()
 
             logger.info(f"Block reason '{reason_name}' permanently deleted by admin {admin_id}, {blocks_deleted} blocks also deleted")
             return True, None
@@ -3,7 +3,11 @@ from datetime import date, datetime, time
 from sqlalchemy.orm import joinedload
 from app import db
 from app.models import Block, Reservation, BlockReason, BlockAuditLog
-from app.services.email_service import EmailService
+from app.services.availability_cache_service import AvailabilityCacheService
+from app.services.availability_stream_service import AvailabilityStreamService, block_slots
+from app.services.notification_digest_service import NotificationDigestService
+from app.services.outbox_service import OutboxService
+from app.services.waitlist_service import WaitlistService
 from app.constants.messages import ErrorMessages
 from app.utils.serializers import serialize_for_json
 import logging
@@ -105,18 +109,8 @@ class BlockService:
                 performed_by_id=block.created_by_id
             )
 
-            # Send email notifications with block reason
-            try:
-                EmailService.send_booking_cancelled(reservation, cancellation_reason)
-            except Exception as e:
-                logger.error(f"Failed to send cancellation email for reservation {reservation.id}: {str(e)}")
-
-            # Send push notifications
-            try:
-                from app.services.push_notification_service import PushNotificationService
-                PushNotificationService.send_booking_cancelled_push(reservation, cancellation_reason)
-            except Exception as e:
-                logger.error(f"Failed to send cancellation push for reservation {reservation.id}: {str(e)}")
+            # Notify both parties in their next digest
+            NotificationDigestService.add(reservation, 'cancelled', cancellation_reason)
 
         return conflicting_reservations
 
@@ -173,18 +167,8 @@ class BlockService:
                 performed_by_id=block.created_by_id
             )
 
-            # Send email notification for suspension
-            try:
-                EmailService.send_booking_suspended(reservation, suspension_reason)
-            except Exception as e:
-                logger.error(f"Failed to send suspension email for reservation {reservation.id}: {str(e)}")
-
-            # Send push notification for suspension
-            try:
-                from app.services.push_notification_service import PushNotificationService
-                PushNotificationService.send_booking_suspended_push(reservation, suspension_reason)
-            except Exception as e:
-                logger.error(f"Failed to send suspension push for reservation {reservation.id}: {str(e)}")
+            # Notify both parties in their next digest
+            NotificationDigestService.add(reservation, 'suspended', suspension_reason)
 
         return conflicting_reservations
 
@@ -243,17 +227,8 @@ class BlockService:
             performed_by_id=admin_id
         )
 
-        try:
-            EmailService.send_booking_restored(reservation)
-        except Exception as e:
-            logger.error(f"Failed to send restoration email for reservation {reservation.id}: {str(e)}")
-
-        # Send push notification for restoration
-        try:
-            from app.services.push_notification_service import PushNotificationService
-            PushNotificationService.send_booking_restored_push(reservation)
-        except Exception as e:
-            logger.error(f"Failed to send restoration push for reservation {reservation.id}: {str(e)}")
+        # Notify both parties in their next digest
+        NotificationDigestService.add(reservation, 'restored')
 
     @staticmethod
     def _cancel_suspended_reservation(reservation, reason, admin_id):
@@ -278,17 +253,8 @@ class BlockService:
             performed_by_id=admin_id
         )
 
-        try:
-            EmailService.send_booking_cancelled(reservation, reason)
-        except Exception as e:
-            logger.error(f"Failed to send cancellation email for reservation {reservation.id}: {str(e)}")
-
-        # Send push notification for cancellation
-        try:
-            from app.services.push_notification_service import PushNotificationService
-            PushNotificationService.send_booking_cancelled_push(reservation, reason)
-        except Exception as e:
-            logger.error(f"Failed to send cancellation push for reservation {reservation.id}: {str(e)}")
+        # Notify both parties in their next digest
+        NotificationDigestService.add(reservation, 'cancelled', reason)
 
     @staticmethod
     def _is_still_covered_by_block(reservation, block):
@@ -368,6 +334,7 @@ class BlockService:
             old_start_time = block.start_time
             old_end_time = block.end_time
             old_court_id = block.court_id
+            old_slots = block_slots(block)
 
             # Update the block
             for field, value in updates.items():
@@ -402,7 +369,12 @@ class BlockService:
                 else:
                     BlockService.cancel_conflicting_reservations(block)
 
+            AvailabilityCacheService.invalidate(old_date, block.date)
+            AvailabilityStreamService.publish_slot_changes(old_slots | block_slots(block))
+            # Offer slots the block no longer covers to the waitlist
+            WaitlistService.enqueue_freed_slots(old_slots - block_slots(block))
             db.session.commit()
+            OutboxService.dispatch()
 
             # Log the operation (unless skipped for batch operations)
             if not skip_audit_log:
@@ -603,7 +575,10 @@ class BlockService:
 
             is_temporary = blocks[0].is_temporary_block if blocks else False
 
+            AvailabilityCacheService.invalidate(date)
+            AvailabilityStreamService.publish_slot_changes(block_slots(*blocks))
             db.session.commit()
+            OutboxService.dispatch()
 
             # Get reason name for audit log
             reason_name = reason.name if reason else None
@@ -683,10 +658,17 @@ class BlockService:
                     all_restored.extend(restored)
 
             # Delete all blocks in the batch
+            affected_dates = {block.date for block in blocks_to_delete}
+            affected_slots = block_slots(*blocks_to_delete)
             for block in blocks_to_delete:
                 db.session.delete(block)
 
+            AvailabilityCacheService.invalidate(*affected_dates)
+            AvailabilityStreamService.publish_slot_changes(affected_slots)
+            # Offer the freed slots to the waitlist
+            WaitlistService.enqueue_freed_slots(affected_slots)
             db.session.commit()
+            OutboxService.dispatch()
 
             # Log the operation with full details
             log_data = {
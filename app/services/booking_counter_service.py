@@ -0,0 +1,366 @@
+"""Per-member counters of active booking sessions.
+
+A member's active regular and short notice bookings (active or suspended,
+not yet ended) are kept in one MemberBookingCounter row, so limit checks
+read a single row instead of listing the bookings.
+
+The counters are maintained in the same flush as every ORM write to a
+reservation (insert, status change, delete): new counted bookings are added
+and lower valid_until to their end, removed ones are subtracted. Bookings
+that simply end need no write: a row is only used while the current time is
+before valid_until (the earliest end among the counted bookings), after
+that the counts are recomputed from the reservations.
+
+Rows are only created or recomputed-and-stored by booking attempts holding
+the booking lock (see ReservationCreationService), so a concurrent booking
+can never be missed by a stored count. Other readers recompute without
+storing. Bulk query updates bypass the flush and must call invalidate().
+
+Display-only readers (the reservation status the app fetches on every
+screen) may also use a short-lived process-local copy of the counts. It is
+dropped when a transaction changing the member's reservations commits in
+this process; other processes see the change once BOOKING_COUNTS_CACHE_SECONDS
+have passed.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import case, delete, event, func, insert, inspect, select, update
+
+from app import db
+from app.models import MemberBookingCounter, Reservation
+from app.utils.query_helpers import build_active_reservation_time_filter
+from app.utils.timezone_utils import ensure_berlin_timezone
+
+logger = logging.getLogger(__name__)
+
+# Reservation statuses counting towards the limits
+COUNTED_STATUSES = ('active', 'suspended')
+
+_TRACKED_ATTRIBUTES = ('status', 'booked_for_id', 'is_short_notice', 'date', 'end_time')
+
+# Session.info key of the members whose counts change when the transaction commits
+_CHANGED_MEMBERS_KEY = 'booking_counts_changed'
+
+# Upper bound on cached members per process
+MAX_CACHED_MEMBERS = 5000
+
+
+class _CountsCache:
+    """Process-local cache of display counts for one application instance."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        # Bumped by every drop, so counts read before a commit are never stored after it
+        self.generation = 0
+
+
+def _get_cache():
+    """Get the counts cache of the current app, creating it if necessary."""
+    if not has_app_context():
+        return None
+    cache = current_app.extensions.get('booking_counts_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('booking_counts_cache', _CountsCache())
+    return cache
+
+
+def _mark_changed(session, member_ids):
+    session.info.setdefault(_CHANGED_MEMBERS_KEY, set()).update(member_ids)
+
+
+def _drop_cached_counts(session):
+    """after_commit listener: forget the cached counts of members changed by the transaction."""
+    member_ids = session.info.pop(_CHANGED_MEMBERS_KEY, None)
+    cache = _get_cache()
+    if not member_ids or cache is None:
+        return
+    with cache.lock:
+        cache.generation += 1
+        for member_id in member_ids:
+            cache.entries.pop(member_id, None)
+
+
+def _discard_changes(session, *args):
+    """after_rollback listener: nothing was committed."""
+    session.info.pop(_CHANGED_MEMBERS_KEY, None)
+
+
+def _counted_session(values):
+    """(member_id, is_short_notice, end) of a booking that counts, else None."""
+    if values['status'] not in COUNTED_STATUSES or values['booked_for_id'] is None:
+        return None
+    return (
+        values['booked_for_id'],
+        bool(values['is_short_notice']),
+        datetime.combine(values['date'], values['end_time'])
+    )
+
+
+def _values(reservation, before_flush):
+    """Tracked attribute values of a reservation before or after the flush."""
+    state = inspect(reservation)
+    values = {}
+    for key in _TRACKED_ATTRIBUTES:
+        history = state.attrs[key].history
+        if before_flush:
+            value = history.deleted[0] if history.deleted else (history.unchanged or [None])[0]
+        else:
+            value = getattr(reservation, key)
+        values[key] = value
+    if values['status'] is None and not before_flush:
+        values['status'] = 'active'  # column default
+    return values
+
+
+def _count_column(is_short_notice):
+    table = MemberBookingCounter.__table__
+    return table.c.short_notice_count if is_short_notice else table.c.regular_count
+
+
+def _add_session(connection, member_id, is_short_notice, end):
+    table = MemberBookingCounter.__table__
+    column = _count_column(is_short_notice)
+    connection.execute(
+        update(table).where(table.c.member_id == member_id).values({
+            column: column + 1,
+            table.c.valid_until: case(
+                ((table.c.valid_until.is_(None)) | (table.c.valid_until > end), end),
+                else_=table.c.valid_until
+            )
+        })
+    )
+
+
+def _remove_session(connection, member_id, is_short_notice, end):
+    # A session ending after computed_at is part of the counts (recomputed
+    # or added since); anything else can't be told apart, so the row is dropped
+    table = MemberBookingCounter.__table__
+    column = _count_column(is_short_notice)
+    connection.execute(
+        update(table).where(table.c.member_id == member_id, table.c.computed_at < end).values({column: column - 1})
+    )
+    connection.execute(
+        delete(table).where(table.c.member_id == member_id, table.c.computed_at >= end)
+    )
+
+
+def _maintain_counters(session, flush_context):
+    """after_flush listener applying the flushed reservation changes to the counters."""
+    changes = []
+    for reservation in session.new:
+        if isinstance(reservation, Reservation):
+            changes.append((None, _counted_session(_values(reservation, before_flush=False))))
+    for reservation in session.dirty:
+        if isinstance(reservation, Reservation) and session.is_modified(reservation):
+            changes.append((
+                _counted_session(_values(reservation, before_flush=True)),
+                _counted_session(_values(reservation, before_flush=False))
+            ))
+    for reservation in session.deleted:
+        if isinstance(reservation, Reservation):
+            changes.append((_counted_session(_values(reservation, before_flush=True)), None))
+
+    changes = [(old, new) for old, new in changes if old != new]
+    if not changes:
+        return
+
+    _mark_changed(session, {
+        session_values[0] for change in changes for session_values in change if session_values is not None
+    })
+    connection = session.connection()
+    for old, new in changes:
+        if old is not None:
+            _remove_session(connection, *old)
+        if new is not None:
+            _add_session(connection, *new)
+
+
+def register_counter_maintenance():
+    """Maintain the booking counters (and the cached counts) on every write of the application session."""
+    for name, listener in (
+        ('after_flush', _maintain_counters),
+        ('after_commit', _drop_cached_counts),
+        ('after_rollback', _discard_changes)
+    ):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+
+class BookingCounterService:
+    """Service for reading the per-member active booking counters."""
+
+    @staticmethod
+    def is_current(computed_at, valid_until, berlin_time):
+        """
+        Check whether stored counts are valid at a point in time.
+
+        Args:
+            computed_at: Row's computed_at (None if there is no row)
+            valid_until: Row's valid_until
+            berlin_time: Current Berlin time
+
+        Returns:
+            bool: True if the counts can be used as they are
+        """
+        return (
+            computed_at is not None and computed_at <= berlin_time
+            and (valid_until is None or valid_until > berlin_time)
+        )
+
+    @staticmethod
+    def compute(member_id, berlin_time):
+        """
+        Count a member's active booking sessions from the reservations.
+
+        Args:
+            member_id: ID of the member
+            berlin_time: Current Berlin time
+
+        Returns:
+            tuple: (regular count, short notice count, end of the earliest counted session or None)
+        """
+        counted = (
+            Reservation.booked_for_id == member_id,
+            Reservation.status.in_(COUNTED_STATUSES),
+            build_active_reservation_time_filter(berlin_time.date(), berlin_time.time(), Reservation)
+        )
+        earliest = select(Reservation.date, Reservation.end_time).where(*counted).order_by(
+            Reservation.date, Reservation.end_time
+        ).limit(1).subquery()
+
+        # Conditional counts and the earliest end in one statement
+        row = db.session.execute(
+            select(
+                func.coalesce(func.sum(case((Reservation.is_short_notice == False, 1), else_=0)), 0).label('regular'),
+                func.coalesce(func.sum(case((Reservation.is_short_notice == True, 1), else_=0)), 0).label('short_notice'),
+                select(earliest.c.date).scalar_subquery().label('first_date'),
+                select(earliest.c.end_time).scalar_subquery().label('first_end')
+            ).where(*counted)
+        ).one()
+
+        valid_until = datetime.combine(row.first_date, row.first_end) if row.first_date else None
+        return int(row.regular), int(row.short_notice), valid_until
+
+    @staticmethod
+    def compute_many(member_ids, berlin_time):
+        """
+        Count the active booking sessions of several members in one grouped query.
+
+        Args:
+            member_ids: IDs of the members
+            berlin_time: Current Berlin time
+
+        Returns:
+            dict: Member ID -> (regular count, short notice count); members
+                  without active sessions are left out
+        """
+        if not member_ids:
+            return {}
+
+        rows = db.session.execute(
+            select(
+                Reservation.booked_for_id,
+                func.sum(case((Reservation.is_short_notice == False, 1), else_=0)).label('regular'),
+                func.sum(case((Reservation.is_short_notice == True, 1), else_=0)).label('short_notice')
+            ).where(
+                Reservation.booked_for_id.in_(member_ids),
+                Reservation.status.in_(COUNTED_STATUSES),
+                build_active_reservation_time_filter(berlin_time.date(), berlin_time.time(), Reservation)
+            ).group_by(Reservation.booked_for_id)
+        )
+        return {row.booked_for_id: (int(row.regular), int(row.short_notice)) for row in rows}
+
+    @staticmethod
+    def store(member_id, regular, short_notice, valid_until, berlin_time):
+        """
+        Store recomputed counts in the current transaction.
+
+        Only call while holding the member's booking lock.
+
+        Args:
+            member_id: ID of the member
+            regular: Active regular sessions
+            short_notice: Active short notice sessions
+            valid_until: End of the earliest counted session, or None
+            berlin_time: Berlin time the counts were computed at
+        """
+        table = MemberBookingCounter.__table__
+        values = {
+            'regular_count': regular,
+            'short_notice_count': short_notice,
+            'valid_until': valid_until,
+            'computed_at': berlin_time
+        }
+        result = db.session.execute(update(table).where(table.c.member_id == member_id).values(values))
+        if result.rowcount == 0:
+            db.session.execute(insert(table).values(member_id=member_id, **values))
+
+    @staticmethod
+    def get_counts(member_id, current_time=None, cached=False):
+        """
+        Get a member's active booking session counts.
+
+        Args:
+            member_id: ID of the member
+            current_time: Current datetime for testing (defaults to Europe/Berlin now)
+            cached: Allow counts cached by this process (for display only, never for limit checks)
+
+        Returns:
+            dict: regular and short_notice session counts
+        """
+        berlin_time = ensure_berlin_timezone(current_time)
+        cache = _get_cache() if cached else None
+        if cache is not None:
+            with cache.lock:
+                entry = cache.entries.get(member_id)
+                generation = cache.generation
+            if entry is not None:
+                counts, computed_at, valid_until, expires_at = entry
+                if time.monotonic() < expires_at and BookingCounterService.is_current(computed_at, valid_until, berlin_time):
+                    return dict(counts)
+
+        row = db.session.execute(
+            select(MemberBookingCounter.regular_count, MemberBookingCounter.short_notice_count,
+                   MemberBookingCounter.valid_until, MemberBookingCounter.computed_at)
+            .where(MemberBookingCounter.member_id == member_id)
+        ).first()
+
+        if row is not None and BookingCounterService.is_current(row.computed_at, row.valid_until, berlin_time):
+            counts = {'regular': row.regular_count, 'short_notice': row.short_notice_count}
+            computed_at, valid_until = row.computed_at, row.valid_until
+        else:
+            regular, short_notice, valid_until = BookingCounterService.compute(member_id, berlin_time)
+            counts = {'regular': regular, 'short_notice': short_notice}
+            computed_at = berlin_time
+
+        # Not cached inside a transaction with uncommitted changes to the member's bookings
+        if cache is not None and member_id not in db.session.info.get(_CHANGED_MEMBERS_KEY, ()):
+            ttl = current_app.config.get('BOOKING_COUNTS_CACHE_SECONDS', 30)
+            with cache.lock:
+                if cache.generation == generation:
+                    cache.entries[member_id] = (dict(counts), computed_at, valid_until, time.monotonic() + ttl)
+                    cache.entries.move_to_end(member_id)
+                    while len(cache.entries) > MAX_CACHED_MEMBERS:
+                        cache.entries.popitem(last=False)
+        return counts
+
+    @staticmethod
+    def invalidate(member_ids):
+        """
+        Drop the counters of members whose reservations were changed by a bulk update.
+
+        Args:
+            member_ids: Iterable of member IDs
+        """
+        member_ids = set(member_ids)
+        if member_ids:
+            _mark_changed(db.session, member_ids)
+            db.session.execute(
+                delete(MemberBookingCounter).where(MemberBookingCounter.member_id.in_(member_ids))
+            )
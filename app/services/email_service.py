@@ -1,12 +1,119 @@
-"""Email service for sending notifications."""
+"""Email service for sending notifications.
+
+Emails sent asynchronously are queued for a worker pool per process:
+MAIL_WORKERS threads drain a bounded queue, each keeping its SMTP session
+open for up to MAIL_MESSAGES_PER_CONNECTION messages or until it has been
+idle for MAIL_IDLE_SECONDS, so a mass cancellation logs in a few times
+instead of once per email. A failed send is retried on a fresh session
+with exponential backoff.
+"""
+import queue
 import threading
+import time
 from flask import current_app, copy_current_request_context
 from flask_mailman import EmailMessage
 from app import mail
+from app.services.notification_recipient_service import NotificationRecipientService
 import logging
 
 logger = logging.getLogger(__name__)
 
+_pool_lock = threading.Lock()
+
+
+class _MailWorkerPool:
+    """Bounded email queue drained by worker threads that reuse their SMTP sessions."""
+
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue(maxsize=app.config.get('MAIL_QUEUE_SIZE', 1000))
+        for index in range(app.config.get('MAIL_WORKERS', 2)):
+            threading.Thread(target=self._run, name=f'mail-worker-{index}', daemon=True).start()
+
+    def submit(self, message):
+        """Queue a message; False if it was dropped because the queue stayed full."""
+        try:
+            self.queue.put(message, timeout=self.app.config.get('MAIL_ENQUEUE_TIMEOUT_SECONDS', 5))
+            return True
+        except queue.Full:
+            logger.error(f"Email queue full, dropping email to {', '.join(message.to)}")
+            return False
+
+    def flush(self):
+        """Block until every queued message has been sent or given up."""
+        self.queue.join()
+
+    def _run(self):
+        idle_seconds = self.app.config.get('MAIL_IDLE_SECONDS', 30)
+        per_connection = self.app.config.get('MAIL_MESSAGES_PER_CONNECTION', 50)
+        connection = None
+        sent = 0
+        while True:
+            try:
+                message = self.queue.get(timeout=idle_seconds if connection else None)
+            except queue.Empty:
+                # Don't hold an idle session open until the server drops it
+                connection = self._close(connection)
+                continue
+            try:
+                with self.app.app_context():
+                    delivered_on = self._deliver(connection, message)
+                sent = sent + 1 if delivered_on is connection else 1
+                connection = delivered_on
+                if connection and sent >= per_connection:
+                    connection = self._close(connection)
+            except Exception as e:
+                logger.error(f"Email worker failed: {e}")
+                connection = self._close(connection)
+            finally:
+                self.queue.task_done()
+
+    def _deliver(self, connection, message):
+        """
+        Send a message, reconnecting and backing off after failures.
+
+        Returns:
+            The open session to reuse, or None if the message was given up
+        """
+        max_attempts = self.app.config.get('MAIL_MAX_ATTEMPTS', 3)
+        retry_seconds = self.app.config.get('MAIL_RETRY_SECONDS', 2)
+        for attempt in range(1, max_attempts + 1):
+            try:
+                if connection is None:
+                    connection = mail.get_connection()
+                # Opened here so send_messages() leaves the session open
+                connection.open()
+                connection.send_messages([message])
+                logger.info(f"Email sent successfully to {', '.join(message.to)}")
+                return connection
+            except Exception as e:
+                connection = self._close(connection)
+                if attempt == max_attempts:
+                    logger.error(f"Failed to send email to {', '.join(message.to)}: {str(e)}")
+                    return None
+                logger.warning(f"Sending email to {', '.join(message.to)} failed, retrying: {str(e)}")
+                time.sleep(retry_seconds * 2 ** (attempt - 1))
+
+    @staticmethod
+    def _close(connection):
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        return None
+
+
+def _get_pool(app):
+    """Get the mail worker pool of an app, starting it on first use."""
+    pool = app.extensions.get('mail_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get('mail_pool')
+            if pool is None:
+                pool = app.extensions['mail_pool'] = _MailWorkerPool(app)
+    return pool
+
 
 class EmailService:
     """Service for sending email notifications in German."""
@@ -25,6 +132,20 @@ Uhrzeit: {start_time} - {end_time}
 Gebucht für: {booked_for_name}
 Gebucht von: {booked_by_name}
 
+Viele Grüße
+Dein TCZ-Team'''
+        },
+        'bookings_created': {
+            'subject': 'Buchungsbestätigung - {count} Buchungen',
+            'body': '''Hallo {recipient_name},
+
+deine Buchungen wurden erstellt:
+
+{booking_lines}
+
+Gebucht für: {booked_for_name}
+Gebucht von: {booked_by_name}
+
 Viele Grüße
 Dein TCZ-Team'''
         },
@@ -54,6 +175,32 @@ Datum: {date}
 Uhrzeit: {start_time} - {end_time}
 {reason_text}
 
+Viele Grüße
+Dein TCZ-Team'''
+        },
+        'admin_overrides': {
+            'subject': 'Buchungsstornierung durch Administrator - {count} Buchungen',
+            'body': '''Hallo {recipient_name},
+
+folgende Buchungen wurden durch einen Administrator storniert:
+
+{booking_lines}
+
+Grund: {reason}
+
+Viele Grüße
+Dein TCZ-Team'''
+        },
+        'notification_digest': {
+            'subject': 'Änderungen an deinen Buchungen',
+            'body': '''Hallo {recipient_name},
+
+an {count} deiner Buchungen hat sich etwas geändert:
+
+{change_lines}
+
+Ausgesetzte Buchungen werden automatisch wiederhergestellt, sobald die Sperre aufgehoben wird.
+
 Viele Grüße
 Dein TCZ-Team'''
         },
@@ -126,10 +273,47 @@ Dein TCZ-Team'''
         }
     }
     
+    @staticmethod
+    def _build_message(recipient_email, subject, body, app):
+        """
+        Build the message for a recipient, applying the development redirect.
+
+        Args:
+            recipient_email: Email address of recipient
+            subject: Email subject
+            body: Email body text
+            app: Flask application instance
+
+        Returns:
+            EmailMessage|None: The message, or None if email sending is disabled
+        """
+        # Skip email if disabled (check for disabled placeholder)
+        mail_username = app.config.get('MAIL_USERNAME')
+        if not mail_username or mail_username == 'disabled@example.com':
+            logger.info(f"Email sending disabled, skipping email to {recipient_email}")
+            return None
+
+        # In development mode, redirect all emails to a single address
+        dev_recipient = app.config.get('DEV_EMAIL_RECIPIENT')
+        actual_recipient = recipient_email
+
+        if dev_recipient and app.debug:
+            logger.info(f"DEV MODE: Redirecting email from {recipient_email} to {dev_recipient}")
+            actual_recipient = dev_recipient
+            # Add header to body showing original recipient
+            body = f"[DEV MODE - Original recipient: {recipient_email}]\n\n" + body
+
+        return EmailMessage(
+            subject=subject,
+            to=[actual_recipient],
+            body=body,
+            from_email=app.config.get('MAIL_DEFAULT_SENDER')
+        )
+
     @staticmethod
     def _send_email_sync(recipient_email, subject, body, app):
         """
-        Synchronously send an email (used by background thread).
+        Synchronously send an email over a session of its own.
 
         Args:
             recipient_email: Email address of recipient
@@ -141,35 +325,17 @@ Dein TCZ-Team'''
             bool: True if sent successfully, False otherwise
         """
         with app.app_context():
-            # Skip email if disabled (check for disabled placeholder)
-            mail_username = app.config.get('MAIL_USERNAME')
-            if not mail_username or mail_username == 'disabled@example.com':
-                logger.info(f"Email sending disabled, skipping email to {recipient_email}")
+            msg = EmailService._build_message(recipient_email, subject, body, app)
+            if msg is None:
                 return False
 
-            # In development mode, redirect all emails to a single address
-            dev_recipient = app.config.get('DEV_EMAIL_RECIPIENT')
-            actual_recipient = recipient_email
-
-            if dev_recipient and app.debug:
-                logger.info(f"DEV MODE: Redirecting email from {recipient_email} to {dev_recipient}")
-                actual_recipient = dev_recipient
-                # Add header to body showing original recipient
-                body = f"[DEV MODE - Original recipient: {recipient_email}]\n\n" + body
-
             try:
-                msg = EmailMessage(
-                    subject=subject,
-                    to=[actual_recipient],
-                    body=body,
-                    from_email=app.config.get('MAIL_DEFAULT_SENDER')
-                )
                 msg.send()
-                logger.info(f"Email sent successfully to {actual_recipient}")
+                logger.info(f"Email sent successfully to {', '.join(msg.to)}")
                 return True
             except Exception as e:
                 # Log error but don't fail the operation
-                logger.error(f"Failed to send email to {actual_recipient}: {str(e)}")
+                logger.error(f"Failed to send email to {', '.join(msg.to)}: {str(e)}")
                 return False
 
     @staticmethod
@@ -184,7 +350,7 @@ Dein TCZ-Team'''
             recipient_email: Email address of recipient
             subject: Email subject
             body: Email body text
-            async_send: If True, send in background thread (default True)
+            async_send: If True, queue for the mail worker pool (default True)
 
         Returns:
             bool: True if queued/sent successfully, False otherwise
@@ -192,18 +358,29 @@ Dein TCZ-Team'''
         app = current_app._get_current_object()
 
         if async_send:
-            # Send in background thread to avoid blocking the request
-            thread = threading.Thread(
-                target=EmailService._send_email_sync,
-                args=(recipient_email, subject, body, app)
-            )
-            thread.daemon = True
-            thread.start()
+            msg = EmailService._build_message(recipient_email, subject, body, app)
+            if msg is None:
+                # Disabled sending counts as handled, as it always has for async emails
+                return True
+            # Sent by the worker pool to avoid blocking the request
+            if not _get_pool(app).submit(msg):
+                return False
             logger.info(f"Email queued for async delivery to {recipient_email}")
             return True
         else:
             return EmailService._send_email_sync(recipient_email, subject, body, app)
-    
+
+    @staticmethod
+    def flush():
+        """
+        Wait until the emails queued so far have been sent (or given up).
+
+        For tests and shutdown; returns at once if nothing was ever queued.
+        """
+        pool = current_app.extensions.get('mail_pool')
+        if pool is not None:
+            pool.flush()
+
     @staticmethod
     def _should_notify_member(member, is_own_booking):
         """
@@ -242,6 +419,10 @@ Dein TCZ-Team'''
             bool: True if all intended emails sent successfully
         """
         template = EmailService.TEMPLATES[template_key]
+        # Both parties with their preferences in one query
+        recipients = NotificationRecipientService.resolve_parties([reservation], with_tokens=False)
+        booked_for = recipients[reservation.booked_for_id].member
+        booked_by = recipients[reservation.booked_by_id].member
 
         # Build base context
         context = {
@@ -249,8 +430,8 @@ Dein TCZ-Team'''
             'date': reservation.date.strftime('%d.%m.%Y'),
             'start_time': reservation.start_time.strftime('%H:%M'),
             'end_time': reservation.end_time.strftime('%H:%M'),
-            'booked_for_name': reservation.booked_for.name,
-            'booked_by_name': reservation.booked_by.name
+            'booked_for_name': booked_for.name,
+            'booked_by_name': booked_by.name
         }
 
         # Add extra context if provided
@@ -259,30 +440,24 @@ Dein TCZ-Team'''
 
         is_own_booking = reservation.booked_for_id == reservation.booked_by_id
 
-        # Send to booked_for member (check preferences)
-        success1 = True
-        if EmailService._should_notify_member(reservation.booked_for, is_own_booking):
-            success1 = EmailService._send_email(
-                reservation.booked_for.email,
-                template['subject'].format(**context),
-                template['body'].format(recipient_name=reservation.booked_for.name, **context)
-            )
-        else:
-            logger.info(f"Skipping notification to {reservation.booked_for.email} (preferences)")
-
-        # Send to booked_by member (if different) - always "own booking" for them
-        success2 = True
-        if reservation.booked_for_id != reservation.booked_by_id:
-            if EmailService._should_notify_member(reservation.booked_by, is_own_booking=True):
-                success2 = EmailService._send_email(
-                    reservation.booked_by.email,
+        # Booked_for member per preferences; the booking member (if different)
+        # always as "own booking"
+        plan = [(booked_for, is_own_booking)]
+        if not is_own_booking:
+            plan.append((booked_by, True))
+
+        success = True
+        for member, own in plan:
+            if EmailService._should_notify_member(member, own):
+                success = EmailService._send_email(
+                    member.email,
                     template['subject'].format(**context),
-                    template['body'].format(recipient_name=reservation.booked_by.name, **context)
-                )
+                    template['body'].format(recipient_name=member.name, **context)
+                ) and success
             else:
-                logger.info(f"Skipping notification to {reservation.booked_by.email} (preferences)")
+                logger.info(f"Skipping notification to {member.email} (preferences)")
 
-        return success1 and success2
+        return success
     
     @staticmethod
     def send_booking_created(reservation):
@@ -297,6 +472,57 @@ Dein TCZ-Team'''
         """
         return EmailService._send_reservation_email(reservation, 'booking_created')
     
+    @staticmethod
+    def send_bookings_created(reservations):
+        """
+        Send one booking created notification for several reservations to both parties.
+
+        All reservations must be for the same member and made by the same member.
+
+        Args:
+            reservations: List of Reservation objects
+
+        Returns:
+            bool: True if both emails sent successfully
+        """
+        if len(reservations) == 1:
+            return EmailService.send_booking_created(reservations[0])
+        if not reservations:
+            return True
+
+        first = reservations[0]
+        recipients = NotificationRecipientService.resolve_parties([first], with_tokens=False)
+        booked_for = recipients[first.booked_for_id].member
+        booked_by = recipients[first.booked_by_id].member
+        template = EmailService.TEMPLATES['bookings_created']
+        context = {
+            'count': len(reservations),
+            'booking_lines': '\n'.join(
+                f"Platz {r.court.number}: {r.date.strftime('%d.%m.%Y')}, "
+                f"{r.start_time.strftime('%H:%M')} - {r.end_time.strftime('%H:%M')}"
+                for r in reservations
+            ),
+            'booked_for_name': booked_for.name,
+            'booked_by_name': booked_by.name
+        }
+
+        is_own_booking = first.booked_for_id == first.booked_by_id
+        plan = [(booked_for, is_own_booking)]
+        if not is_own_booking:
+            plan.append((booked_by, True))
+
+        success = True
+        for member, own in plan:
+            if EmailService._should_notify_member(member, own):
+                success = EmailService._send_email(
+                    member.email,
+                    template['subject'].format(**context),
+                    template['body'].format(recipient_name=member.name, **context)
+                ) and success
+            else:
+                logger.info(f"Skipping notification to {member.email} (preferences)")
+        return success
+
     @staticmethod
     def send_booking_modified(reservation):
         """
@@ -381,6 +607,115 @@ Dein TCZ-Team'''
             {'reason': reason}
         )
 
+    @staticmethod
+    def send_admin_overrides(member, reservations, reason):
+        """
+        Send one admin cancellation notification for several reservations to a member.
+
+        The member is notified of the reservations they would be notified of
+        individually (booked for them or by them, per their preferences).
+
+        Args:
+            member: Member object of the recipient
+            reservations: List of Reservation objects the member booked or was booked for
+            reason: Cancellation reason
+
+        Returns:
+            bool: True if the email was sent or nothing was to be sent
+        """
+        reservations = [
+            r for r in reservations
+            if EmailService._should_notify_member(
+                member, is_own_booking=r.booked_by_id == member.id or r.booked_for_id == r.booked_by_id
+            )
+        ]
+        if not reservations:
+            logger.info(f"Skipping notification to {member.email} (preferences)")
+            return True
+        if len(reservations) == 1:
+            reservation = reservations[0]
+            template = EmailService.TEMPLATES['admin_override']
+            context = {
+                'court_number': reservation.court.number,
+                'date': reservation.date.strftime('%d.%m.%Y'),
+                'start_time': reservation.start_time.strftime('%H:%M'),
+                'end_time': reservation.end_time.strftime('%H:%M'),
+                'reason': reason
+            }
+        else:
+            template = EmailService.TEMPLATES['admin_overrides']
+            context = {
+                'count': len(reservations),
+                'booking_lines': '\n'.join(
+                    f"Platz {r.court.number}: {r.date.strftime('%d.%m.%Y')}, "
+                    f"{r.start_time.strftime('%H:%M')} - {r.end_time.strftime('%H:%M')}"
+                    for r in reservations
+                ),
+                'reason': reason
+            }
+
+        return EmailService._send_email(
+            member.email,
+            template['subject'].format(**context),
+            template['body'].format(recipient_name=member.name, **context)
+        )
+
+    @staticmethod
+    def send_notification_digest(member, changes):
+        """
+        Send one email covering several reservation changes to a member.
+
+        The member is told about the changes they would be notified of
+        individually (booked for them or by them, per their preferences).
+        A single change is sent with its usual template.
+
+        Args:
+            member: Member object of the recipient
+            changes: List of (kind, Reservation, reason) tuples, kind being
+                     'suspended', 'cancelled' or 'restored'
+
+        Returns:
+            bool: True if the email was sent or nothing was to be sent
+        """
+        changes = [
+            (kind, r, reason) for kind, r, reason in changes
+            if EmailService._should_notify_member(
+                member, is_own_booking=r.booked_by_id == member.id or r.booked_for_id == r.booked_by_id
+            )
+        ]
+        if not changes:
+            logger.info(f"Skipping notification to {member.email} (preferences)")
+            return True
+
+        if len(changes) == 1:
+            kind, reservation, reason = changes[0]
+            template = EmailService.TEMPLATES[f'booking_{kind}']
+            context = {
+                'court_number': reservation.court.number,
+                'date': reservation.date.strftime('%d.%m.%Y'),
+                'start_time': reservation.start_time.strftime('%H:%M'),
+                'end_time': reservation.end_time.strftime('%H:%M'),
+                'reason_text': f"Grund: {reason}" if reason else ""
+            }
+        else:
+            labels = {'suspended': 'Ausgesetzt', 'cancelled': 'Storniert', 'restored': 'Wiederhergestellt'}
+            template = EmailService.TEMPLATES['notification_digest']
+            context = {
+                'count': len(changes),
+                'change_lines': '\n'.join(
+                    f"{labels[kind]} - Platz {r.court.number}: {r.date.strftime('%d.%m.%Y')}, "
+                    f"{r.start_time.strftime('%H:%M')} - {r.end_time.strftime('%H:%M')}"
+                    + (f" ({reason})" if reason else "")
+                    for kind, r, reason in changes
+                )
+            }
+
+        return EmailService._send_email(
+            member.email,
+            template['subject'].format(**context),
+            template['body'].format(recipient_name=member.name, **context)
+        )
+
     @staticmethod
     def send_verification_email(member, verification_url):
         """
@@ -0,0 +1,147 @@
+"""Store of responses to requests sent with an Idempotency-Key header.
+
+Clients on flaky connections retry writes they can't tell succeeded. When a
+request carries an Idempotency-Key, its successful response is kept for
+IDEMPOTENCY_TTL_SECONDS, keyed by member, method, path and key, and a retry
+gets that response back without running the request again. Only successful
+responses are kept: errors (a busy lock, a limit) may not hold on a retry.
+
+While the first request is still running, the key is held, so a concurrent
+retry is turned away instead of running twice. The hold is a lease of
+IDEMPOTENCY_LEASE_SECONDS, longer than any request may run: should the
+request die without releasing the key, a retry may go ahead once it has
+passed. A key reused for a different request body is rejected.
+
+The keys are IdempotencyKey rows, so a retry is recognised by whichever
+worker process it reaches; the unique index on the scope decides between
+concurrent first attempts. Expired keys are pruned by the outbox worker.
+"""
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+# Outcome of IdempotencyService.begin()
+BEGIN_NEW = 'new'
+BEGIN_REPLAY = 'replay'
+BEGIN_IN_PROGRESS = 'in_progress'
+BEGIN_MISMATCH = 'mismatch'
+
+
+def request_fingerprint(body):
+    """Digest identifying a request body."""
+    return hashlib.sha256(body or b'').hexdigest()
+
+
+def _scope_filter(scope):
+    member_id, method, path, key = scope
+    return IdempotencyKey.query.filter_by(member_id=member_id, method=method, path=path, key=key)
+
+
+def _expires_at(setting, default):
+    return datetime.utcnow() + timedelta(seconds=current_app.config.get(setting, default))
+
+
+class IdempotencyService:
+    """Service for replaying responses to retried requests."""
+
+    @staticmethod
+    def begin(scope, fingerprint):
+        """
+        Look up a key, holding it for the caller if it is new (commits).
+
+        Args:
+            scope: (member ID, method, path, Idempotency-Key) tuple
+            fingerprint: request_fingerprint() of the request body
+
+        Returns:
+            tuple: (outcome, IdempotencyKey or None) - outcome is one of
+                   BEGIN_NEW (caller must complete() or release()),
+                   BEGIN_REPLAY (with the stored response),
+                   BEGIN_IN_PROGRESS or BEGIN_MISMATCH
+        """
+        entry = _scope_filter(scope).first()
+        if entry is not None and entry.expires_at <= datetime.utcnow():
+            db.session.delete(entry)
+            db.session.flush()
+            entry = None
+
+        if entry is None:
+            member_id, method, path, key = scope
+            # Leased for the request only; complete() keeps the response for the TTL
+            db.session.add(IdempotencyKey(
+                member_id=member_id, method=method, path=path, key=key,
+                fingerprint=fingerprint, expires_at=_expires_at('IDEMPOTENCY_LEASE_SECONDS', 360)
+            ))
+            try:
+                db.session.commit()
+                return BEGIN_NEW, None
+            except IntegrityError:
+                # A concurrent first attempt holds the key
+                db.session.rollback()
+                entry = _scope_filter(scope).first()
+                if entry is None:
+                    return BEGIN_IN_PROGRESS, None
+
+        if entry.fingerprint != fingerprint:
+            return BEGIN_MISMATCH, None
+        if entry.status_code is None:
+            return BEGIN_IN_PROGRESS, None
+        return BEGIN_REPLAY, entry
+
+    @staticmethod
+    def complete(scope, status_code, body, mimetype):
+        """
+        Store the response of a request begun with BEGIN_NEW (commits).
+
+        Args:
+            scope: Key passed to begin()
+            status_code: Response status (2xx)
+            body: Response body bytes
+            mimetype: Response mimetype
+        """
+        try:
+            _scope_filter(scope).update({
+                'status_code': status_code,
+                'body': body,
+                'mimetype': mimetype,
+                'expires_at': _expires_at('IDEMPOTENCY_TTL_SECONDS', 86400)
+            }, synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            # The request itself succeeded; a retry will then run it again
+            db.session.rollback()
+            logger.error(f"Failed to store idempotent response: {e}")
+
+    @staticmethod
+    def release(scope):
+        """
+        Forget a key begun with BEGIN_NEW whose request failed, so it can be retried (commits).
+
+        Args:
+            scope: Key passed to begin()
+        """
+        try:
+            db.session.rollback()
+            _scope_filter(scope).filter(
+                IdempotencyKey.status_code.is_(None)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to release idempotency key: {e}")
+
+    @staticmethod
+    def prune():
+        """Delete expired keys."""
+        IdempotencyKey.query.filter(
+            IdempotencyKey.expires_at < datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.session.commit()
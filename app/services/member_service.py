@@ -448,6 +448,11 @@ class MemberService:
 
             db.session.commit()
 
+            # Member names are part of the cached court availability
+            if 'firstname' in changes or 'lastname' in changes:
+                from app.services.availability_cache_service import AvailabilityCacheService
+                AvailabilityCacheService.invalidate_all()
+
             logger.info(f"Member updated: {member_id} by {admin_id}, changes: {list(changes.keys())}")
 
             # Send verification email if email was changed
@@ -516,13 +521,20 @@ class MemberService:
 
             # If force delete, cancel all active reservations
             if force and active_reservations_count > 0:
-                Reservation.query.filter(
+                from app.services.booking_counter_service import BookingCounterService
+
+                cancelled = Reservation.query.filter(
                     or_(
                         Reservation.booked_by_id == member_id,
                         Reservation.booked_for_id == member_id
                     ),
                     Reservation.status == 'active'
-                ).update({
+                )
+                # The bulk update bypasses the booking counters of the members booked for
+                BookingCounterService.invalidate(
+                    row.booked_for_id for row in cancelled.with_entities(Reservation.booked_for_id).distinct()
+                )
+                cancelled.update({
                     'status': 'cancelled',
                     'reason': 'Mitglied gelöscht durch Administrator'
                 }, synchronize_session=False)
@@ -544,6 +556,10 @@ class MemberService:
             db.session.delete(member)
             db.session.commit()
 
+            # The member's reservations are gone from every date they were on
+            from app.services.availability_cache_service import AvailabilityCacheService
+            AvailabilityCacheService.invalidate_all()
+
             logger.info(f"Member deleted: {member_id} ({member_data['email']}) by admin {admin_id}")
 
             return True, None
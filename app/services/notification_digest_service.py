@@ -0,0 +1,124 @@
+"""Coalescing of reservation change notifications into one digest per member.
+
+Block operations suspend, cancel and restore reservations one at a time,
+and a multi-court block (or several blocks created in a row) can affect
+the same member several times within seconds. Instead of notifying every
+change, the changes are recorded as NotificationDigestItem rows attached
+to one 'notification_digest' outbox event per member, which becomes due
+NOTIFICATION_DIGEST_SECONDS after the first change. The member then gets
+one email and one push notification covering the latest change of each
+reservation, filtered by the same preferences as the single notifications.
+A suspension lifted again within the window is left out altogether.
+
+The open event is locked while a change is attached to it, so a worker
+can't claim it halfway; changes recorded after the claim start a new digest.
+"""
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import NotificationDigestItem, OutboxEvent, Reservation
+
+logger = logging.getLogger(__name__)
+
+# Reservation changes a digest reports
+DIGEST_KINDS = ('suspended', 'cancelled', 'restored')
+
+
+class NotificationDigestService:
+    """Service for buffering reservation change notifications per recipient."""
+
+    @staticmethod
+    def add(reservation, kind, reason=None):
+        """
+        Record a reservation change for the digests of both parties (not committed).
+
+        Args:
+            reservation: Reservation object that changed
+            kind: 'suspended', 'cancelled' or 'restored'
+            reason: Optional reason shown with the change
+        """
+        if kind not in DIGEST_KINDS:
+            raise ValueError(f"Unknown digest kind: {kind}")
+
+        for member_id in {reservation.booked_for_id, reservation.booked_by_id}:
+            event = NotificationDigestService._open_event(member_id)
+            db.session.add(NotificationDigestItem(
+                event_id=event.id,
+                member_id=member_id,
+                reservation_id=reservation.id,
+                kind=kind,
+                reason=reason[:255] if reason else None
+            ))
+
+    @staticmethod
+    def _open_event(member_id):
+        """The member's digest event that hasn't been claimed yet, created if needed."""
+        event = OutboxEvent.query.join(
+            NotificationDigestItem, NotificationDigestItem.event_id == OutboxEvent.id
+        ).filter(
+            NotificationDigestItem.member_id == member_id,
+            OutboxEvent.event_type == 'notification_digest',
+            OutboxEvent.status == 'pending',
+            OutboxEvent.attempts == 0
+        ).with_for_update().first()
+        if event is not None:
+            return event
+
+        from app.services.outbox_service import OutboxService
+
+        event = OutboxService.enqueue('notification_digest', {'member_id': member_id})
+        window = current_app.config.get('NOTIFICATION_DIGEST_SECONDS', 60)
+        event.available_at = datetime.utcnow() + timedelta(seconds=window)
+        db.session.flush()
+        event.payload = {'member_id': member_id, 'event_id': event.id}
+        return event
+
+    @staticmethod
+    def _cancels_out(first, latest, reservation):
+        """Whether a reservation was suspended and restored within the digest, so nothing changed for the member."""
+        return first.kind == 'suspended' and latest.kind == 'restored' and reservation.status == 'active'
+
+    @staticmethod
+    def deliver(payload):
+        """
+        Send a member's digest and remove its items (outbox handler).
+
+        Args:
+            payload: Payload of the 'notification_digest' event
+        """
+        from app.services.email_service import EmailService
+        from app.services.notification_recipient_service import NotificationRecipientService
+        from app.services.push_notification_service import PushNotificationService
+
+        items = NotificationDigestItem.query.filter_by(
+            event_id=payload['event_id']
+        ).order_by(NotificationDigestItem.id).all()
+        # The member with their preferences and device tokens in one query
+        recipient = NotificationRecipientService.resolve([payload['member_id']]).get(payload['member_id'])
+
+        # Only the latest change of each reservation is still news
+        first, latest = {}, {}
+        for item in items:
+            first.setdefault(item.reservation_id, item)
+            latest[item.reservation_id] = item
+        reservations = Reservation.query.options(
+            joinedload(Reservation.court)
+        ).filter(
+            Reservation.id.in_(latest)
+        ).order_by(Reservation.date, Reservation.start_time, Reservation.court_id).all() if latest else []
+        changes = [
+            (latest[r.id].kind, r, latest[r.id].reason) for r in reservations
+            if not NotificationDigestService._cancels_out(first[r.id], latest[r.id], r)
+        ]
+
+        if recipient and changes:
+            EmailService.send_notification_digest(recipient.member, changes)
+            PushNotificationService.send_notification_digest_push(recipient.member, changes, recipient=recipient)
+            logger.info(f"Sent digest of {len(changes)} changes to {recipient.member.email} ({len(items)} merged)")
+
+        # Removed together with the event's status
+        NotificationDigestItem.query.filter_by(event_id=payload['event_id']).delete(synchronize_session=False)
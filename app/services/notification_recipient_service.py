@@ -0,0 +1,68 @@
+"""Resolution of notification recipients for a fan-out in one query.
+
+The email and push senders need each recipient's notification preferences
+(columns of Member) and, for pushes, the member's active device tokens.
+Loading them member by member costs one or two queries per party of every
+reservation; resolve() loads the members of a whole fan-out together with
+their active tokens in one outer-joined query instead.
+"""
+from collections import namedtuple
+
+from sqlalchemy import and_
+
+from app import db
+from app.models import DeviceToken, Member
+
+# A member to notify with the tokens of their active devices (empty if not loaded)
+Recipient = namedtuple('Recipient', ['member', 'tokens'])
+
+
+class NotificationRecipientService:
+    """Service for loading the recipients of notifications in bulk."""
+
+    @staticmethod
+    def resolve(member_ids, with_tokens=True):
+        """
+        Load members and their active device tokens in one query.
+
+        Args:
+            member_ids: IDs of the members to notify (duplicates and None are ignored)
+            with_tokens: Also load the active device tokens (for push notifications)
+
+        Returns:
+            dict: Member ID -> Recipient; unknown members are left out
+        """
+        member_ids = {member_id for member_id in member_ids if member_id is not None}
+        if not member_ids:
+            return {}
+
+        if not with_tokens:
+            return {member.id: Recipient(member, []) for member in Member.query.filter(Member.id.in_(member_ids))}
+
+        rows = db.session.query(Member, DeviceToken.token).outerjoin(
+            DeviceToken, and_(DeviceToken.member_id == Member.id, DeviceToken.is_active == True)
+        ).filter(Member.id.in_(member_ids)).order_by(DeviceToken.id)
+
+        recipients = {}
+        for member, token in rows:
+            recipient = recipients.setdefault(member.id, Recipient(member, []))
+            if token is not None:
+                recipient.tokens.append(token)
+        return recipients
+
+    @staticmethod
+    def resolve_parties(reservations, with_tokens=True):
+        """
+        Load the members booked for and by any of the reservations in one query.
+
+        Args:
+            reservations: Reservation objects (or rows with booked_for_id and booked_by_id)
+            with_tokens: Also load the active device tokens (for push notifications)
+
+        Returns:
+            dict: Member ID -> Recipient
+        """
+        member_ids = set()
+        for reservation in reservations:
+            member_ids.update((reservation.booked_for_id, reservation.booked_by_id))
+        return NotificationRecipientService.resolve(member_ids, with_tokens)
@@ -0,0 +1,351 @@
+"""Transactional outbox for the side effects of committed writes.
+
+Write paths add their side effects (emails, push notifications, audit log
+entries, waitlist promotions) as OutboxEvent rows in the same transaction as
+the change itself, so an event exists exactly when the change was committed.
+Committing such a transaction wakes a worker thread per process, which
+delivers the events outside the request.
+
+Every event is claimed with a conditional update before it is handled, so
+several processes can drain the same table. A failed event is retried with
+exponential backoff and marked failed after OUTBOX_MAX_ATTEMPTS; an event
+whose worker died while handling it is picked up again once its claim
+expires. Delivery is therefore at least once.
+
+Write paths may also call dispatch() after committing: with
+OUTBOX_WORKER_ENABLED off (tests), it delivers the pending events in the
+calling request. Single bookings don't, so their response follows the
+commit directly; without the worker their events wait for process_pending().
+"""
+import logging
+import threading
+from datetime import date, datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import Member, OutboxEvent, Reservation
+from app.services.idempotency_service import IdempotencyService
+
+logger = logging.getLogger(__name__)
+
+# Prune delivered events and expired idempotency keys every this many handled events
+PRUNE_INTERVAL = 500
+
+# Session.info key set when the transaction adds outbox events
+_EVENTS_ADDED_KEY = 'outbox_events_added'
+
+_worker_lock = threading.Lock()
+
+
+def _load_reservations(reservation_ids):
+    """Reservations with their courts (the senders resolve the members themselves)."""
+    return Reservation.query.options(
+        joinedload(Reservation.court)
+    ).filter(
+        Reservation.id.in_(reservation_ids)
+    ).order_by(Reservation.date, Reservation.start_time, Reservation.court_id).all()
+
+
+def _send_booking_emails(payload):
+    from app.services.email_service import EmailService
+
+    reservations = _load_reservations(payload['reservation_ids'])
+    if reservations:
+        EmailService.send_bookings_created(reservations)
+
+
+def _send_booking_pushes(payload):
+    from app.services.push_notification_service import PushNotificationService
+
+    reservations = _load_reservations(payload['reservation_ids'])
+    if reservations:
+        PushNotificationService.send_bookings_created_push(reservations)
+
+
+def _send_cancellation_emails(payload):
+    from app.services.email_service import EmailService
+
+    member = db.session.get(Member, payload['member_id'])
+    reservations = _load_reservations(payload['reservation_ids'])
+    if member and reservations:
+        EmailService.send_admin_overrides(member, reservations, payload['reason'])
+
+
+def _send_cancellation_pushes(payload):
+    from app.services.notification_recipient_service import NotificationRecipientService
+    from app.services.push_notification_service import PushNotificationService
+
+    recipient = NotificationRecipientService.resolve([payload['member_id']]).get(payload['member_id'])
+    reservations = _load_reservations(payload['reservation_ids'])
+    if recipient and reservations:
+        PushNotificationService.send_bookings_cancelled_push(
+            recipient.member, reservations, payload['reason'], recipient=recipient
+        )
+
+
+def _send_notification_digest(payload):
+    from app.services.notification_digest_service import NotificationDigestService
+
+    NotificationDigestService.deliver(payload)
+
+
+def _write_audit_log(payload):
+    # Committed together with the event's status
+    from app.services.reservation_service import ReservationService
+
+    db.session.add(ReservationService.build_audit_log(
+        payload['operation'], payload['reservation_id'], payload['operation_data'], payload['performed_by_id']
+    ))
+
+
+def _promote_waitlists(payload):
+    from app.services.waitlist_service import WaitlistService
+
+    WaitlistService.process_freed_slots(
+        (date.fromisoformat(slot_date), court_id, hour) for slot_date, court_id, hour in payload['slots']
+    )
+
+
+# Event type -> handler(payload); a handler raises to have the event retried
+_HANDLERS = {
+    'bookings_created_email': _send_booking_emails,
+    'bookings_created_push': _send_booking_pushes,
+    'bookings_cancelled_email': _send_cancellation_emails,
+    'bookings_cancelled_push': _send_cancellation_pushes,
+    'notification_digest': _send_notification_digest,
+    'reservation_audit': _write_audit_log,
+    'waitlist_freed_slots': _promote_waitlists,
+}
+
+
+class _OutboxWorker:
+    """Background thread draining the outbox when woken and every poll interval."""
+
+    def __init__(self, app):
+        self.app = app
+        self.wakeup = threading.Event()
+        self.handled = 0
+        # Deliver what previous processes left behind right away
+        self.wakeup.set()
+        self.thread = threading.Thread(target=self._run, name='outbox-worker', daemon=True)
+        self.thread.start()
+
+    def wake(self):
+        self.wakeup.set()
+
+    def _run(self):
+        poll_seconds = self.app.config.get('OUTBOX_POLL_SECONDS', 10)
+        batch_size = self.app.config.get('OUTBOX_BATCH_SIZE', 50)
+        while True:
+            self.wakeup.wait(poll_seconds)
+            self.wakeup.clear()
+            with self.app.app_context():
+                try:
+                    while True:
+                        claimed = OutboxService.process_pending(batch_size)
+                        self.handled += claimed
+                        if claimed < batch_size:
+                            break
+                    if self.handled >= PRUNE_INTERVAL:
+                        self.handled = 0
+                        OutboxService.prune()
+                        IdempotencyService.prune()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Outbox worker failed: {e}")
+                finally:
+                    db.session.remove()
+
+
+def _get_worker():
+    """Get the worker of the current app, starting it on first use."""
+    app = current_app._get_current_object()
+    worker = app.extensions.get('outbox_worker')
+    if worker is None:
+        with _worker_lock:
+            worker = app.extensions.get('outbox_worker')
+            if worker is None:
+                worker = app.extensions['outbox_worker'] = _OutboxWorker(app)
+    return worker
+
+
+def _wake_worker(session):
+    """after_commit listener: have the worker deliver the events the transaction added."""
+    if not session.info.pop(_EVENTS_ADDED_KEY, None) or not has_app_context():
+        return
+    if current_app.config.get('OUTBOX_WORKER_ENABLED', True):
+        _get_worker().wake()
+
+
+def _discard_added_events(session, *args):
+    """after_rollback listener: nothing was committed."""
+    session.info.pop(_EVENTS_ADDED_KEY, None)
+
+
+def register_worker_wakeup():
+    """Wake the outbox worker whenever a transaction of the application session commits new events."""
+    for name, listener in (
+        ('after_commit', _wake_worker),
+        ('after_rollback', _discard_added_events)
+    ):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+
+class OutboxService:
+    """Service for recording and delivering post-commit side effects."""
+
+    @staticmethod
+    def enqueue(event_type, payload):
+        """
+        Add a side effect to the current transaction.
+
+        Args:
+            event_type: Key of the event handler (e.g. 'bookings_created_email')
+            payload: JSON-serializable dict passed to the handler
+
+        Returns:
+            OutboxEvent: The pending event (not committed)
+        """
+        event = OutboxEvent(event_type=event_type, payload=payload)
+        db.session.add(event)
+        db.session.info[_EVENTS_ADDED_KEY] = True
+        return event
+
+    @staticmethod
+    def enqueue_booking_notifications(reservation_ids):
+        """
+        Add the booking created email and push notifications to the current transaction.
+
+        Args:
+            reservation_ids: IDs of reservations made for one member by one member
+        """
+        payload = {'reservation_ids': list(reservation_ids)}
+        OutboxService.enqueue('bookings_created_email', payload)
+        OutboxService.enqueue('bookings_created_push', payload)
+
+    @staticmethod
+    def enqueue_cancellation_notifications(reservation_ids_by_member, reason):
+        """
+        Add one admin cancellation email and push notification per member to the current transaction.
+
+        Args:
+            reservation_ids_by_member: Dict of member ID -> IDs of the member's cancelled reservations
+            reason: Cancellation reason
+        """
+        rows = []
+        for member_id, reservation_ids in reservation_ids_by_member.items():
+            payload = {'member_id': member_id, 'reservation_ids': sorted(reservation_ids), 'reason': reason}
+            rows.append({'event_type': 'bookings_cancelled_email', 'payload': payload})
+            rows.append({'event_type': 'bookings_cancelled_push', 'payload': payload})
+        # One multi-row insert however many members are affected
+        if rows:
+            db.session.execute(insert(OutboxEvent), rows)
+            db.session.info[_EVENTS_ADDED_KEY] = True
+
+    @staticmethod
+    def dispatch():
+        """
+        Have the pending events delivered. Call after committing; never raises.
+        """
+        if not has_app_context():
+            return
+        try:
+            if current_app.config.get('OUTBOX_WORKER_ENABLED', True):
+                _get_worker().wake()
+            else:
+                OutboxService.process_pending()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to dispatch outbox events: {e}")
+
+    @staticmethod
+    def process_pending(limit=None):
+        """
+        Claim and handle the events that are due, oldest first.
+
+        Args:
+            limit: Most events to handle (defaults to OUTBOX_BATCH_SIZE)
+
+        Returns:
+            int: Number of events claimed (handled or rescheduled)
+        """
+        limit = limit or current_app.config.get('OUTBOX_BATCH_SIZE', 50)
+        event_ids = [row.id for row in db.session.query(OutboxEvent.id).filter(
+            OutboxEvent.status == 'pending',
+            OutboxEvent.available_at <= datetime.utcnow()
+        ).order_by(OutboxEvent.id).limit(limit)]
+        db.session.commit()
+
+        claimed = 0
+        for event_id in event_ids:
+            if OutboxService._claim(event_id):
+                OutboxService._handle(event_id)
+                claimed += 1
+        return claimed
+
+    @staticmethod
+    def _claim(event_id):
+        """Claim a due event for CLAIM_SECONDS; False if another worker got it first."""
+        now = datetime.utcnow()
+        claim_seconds = current_app.config.get('OUTBOX_CLAIM_SECONDS', 300)
+        result = db.session.execute(
+            update(OutboxEvent).where(
+                OutboxEvent.id == event_id,
+                OutboxEvent.status == 'pending',
+                OutboxEvent.available_at <= now
+            ).values(
+                attempts=OutboxEvent.attempts + 1,
+                available_at=now + timedelta(seconds=claim_seconds)
+            )
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def _handle(event_id):
+        """
+        Run the handler of a claimed event and record the outcome.
+
+        Returns:
+            bool: True if delivered, False if rescheduled or given up
+        """
+        event = db.session.get(OutboxEvent, event_id)
+        try:
+            handler = _HANDLERS.get(event.event_type)
+            if handler is None:
+                raise ValueError(f"Unknown outbox event type: {event.event_type}")
+            handler(event.payload)
+            event.status = 'done'
+            event.processed_at = datetime.utcnow()
+            event.last_error = None
+            db.session.commit()
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            event = db.session.get(OutboxEvent, event_id)
+            event.last_error = str(e)[:1000]
+            max_attempts = current_app.config.get('OUTBOX_MAX_ATTEMPTS', 5)
+            if event.attempts >= max_attempts:
+                event.status = 'failed'
+                logger.error(f"Outbox event {event_id} ({event.event_type}) failed for good: {e}")
+            else:
+                retry_seconds = current_app.config.get('OUTBOX_RETRY_SECONDS', 30)
+                event.available_at = datetime.utcnow() + timedelta(seconds=retry_seconds * 2 ** (event.attempts - 1))
+                logger.warning(f"Outbox event {event_id} ({event.event_type}) failed, retrying: {e}")
+            db.session.commit()
+            return False
+
+    @staticmethod
+    def prune():
+        """Delete delivered events older than OUTBOX_RETENTION_DAYS."""
+        retention_days = current_app.config.get('OUTBOX_RETENTION_DAYS', 7)
+        OutboxEvent.query.filter(
+            OutboxEvent.status == 'done',
+            OutboxEvent.processed_at < datetime.utcnow() - timedelta(days=retention_days)
+        ).delete(synchronize_session=False)
+        db.session.commit()
@@ -6,6 +6,7 @@ from PIL import Image
 from flask import current_app
 from app import db
 from app.models import Member
+from app.services.availability_cache_service import AvailabilityCacheService
 
 # Register HEIF/HEIC support with Pillow
 try:
@@ -129,6 +130,7 @@ class ProfilePictureService:
             member.has_profile_picture = True
             member.profile_picture_version += 1
             db.session.commit()
+            AvailabilityCacheService.invalidate_all()
 
             logger.info(f"Profile picture saved for member {member_id}, version {member.profile_picture_version}")
 
@@ -203,6 +205,7 @@ class ProfilePictureService:
             # Note: We don't reset version - this ensures cached images are invalidated
             member.profile_picture_version += 1
             db.session.commit()
+            AvailabilityCacheService.invalidate_all()
 
             logger.info(f"Profile picture deleted for member {member_id}")
 
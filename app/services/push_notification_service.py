@@ -1,13 +1,211 @@
-"""Push notification service for sending APNs notifications."""
+"""Push notification service for sending APNs notifications.
+
+Pushes are handed to a dispatcher per process: a bounded queue drained by
+PUSH_WORKERS threads that share one long-lived HTTP/2 connection to APNs,
+each send being one stream on it. The connection is opened on first use
+and reopened after a transport error. When the queue is full, callers
+wait up to PUSH_ENQUEUE_TIMEOUT_SECONDS for room before the push is
+dropped, so a burst of notifications can't pile up without bound.
+
+The outcome of every send is buffered by the dispatcher and written in
+batches of up to PUSH_RESULT_BATCH_SIZE: tokens APNs accepted get their
+last_used_at updated, tokens APNs reports as gone (410) are deactivated,
+all in one transaction instead of one commit per token. The dispatcher also
+counts sent, failed and dropped pushes and the APNs response times, see
+PushNotificationService.get_delivery_stats().
+"""
 import jwt
+import queue
 import time
 import threading
 import logging
 from datetime import datetime
 from flask import current_app
+from app.services.notification_recipient_service import NotificationRecipientService
 
 logger = logging.getLogger(__name__)
 
+_dispatcher_lock = threading.Lock()
+
+
+class _PushDispatcher:
+    """Bounded push queue with worker threads sharing one HTTP/2 APNs connection."""
+
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue(maxsize=app.config.get('PUSH_QUEUE_SIZE', 1000))
+        self.client = None
+        self.client_lock = threading.Lock()
+        self.host = "api.sandbox.push.apple.com" if app.debug else "api.push.apple.com"
+        # (device token, outcome) of sends not written to the database yet
+        self.results = []
+        self.stats_lock = threading.Lock()
+        self.counters = {'sent': 0, 'failed': 0, 'invalid_tokens': 0, 'dropped': 0}
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_count = 0
+        for index in range(app.config.get('PUSH_WORKERS', 4)):
+            threading.Thread(target=self._run, name=f'push-worker-{index}', daemon=True).start()
+
+    def submit(self, device_token, payload):
+        """Queue a push; False if it was dropped because the queue stayed full."""
+        try:
+            self.queue.put((device_token, payload), timeout=self.app.config.get('PUSH_ENQUEUE_TIMEOUT_SECONDS', 2))
+            return True
+        except queue.Full:
+            with self.stats_lock:
+                self.counters['dropped'] += 1
+            logger.warning(f"Push queue full, dropping push to {device_token[:20]}...")
+            return False
+
+    def flush(self):
+        """Block until every queued push has been sent and its result written."""
+        self.queue.join()
+        with self.app.app_context():
+            self._write_results()
+
+    def stats(self):
+        """Snapshot of the delivery counters and APNs response times."""
+        with self.stats_lock:
+            stats = dict(self.counters)
+            stats['pending_results'] = len(self.results)
+            stats['avg_latency_ms'] = round(self.latency_total / self.latency_count * 1000, 1) if self.latency_count else None
+            stats['max_latency_ms'] = round(self.latency_max * 1000, 1) if self.latency_count else None
+        stats['queued'] = self.queue.qsize()
+        return stats
+
+    def _record(self, device_token, outcome, latency=None):
+        """Count a send and buffer the result the database needs to know about."""
+        with self.stats_lock:
+            self.counters[outcome] += 1
+            if latency is not None:
+                self.latency_total += latency
+                self.latency_max = max(self.latency_max, latency)
+                self.latency_count += 1
+            if outcome in ('sent', 'invalid_tokens'):
+                self.results.append((device_token, outcome))
+
+    def _write_results(self):
+        """Write the buffered results in one transaction."""
+        from app import db
+        from app.models import DeviceToken
+
+        with self.stats_lock:
+            results, self.results = self.results, []
+        if not results:
+            return
+
+        used = {token for token, outcome in results if outcome == 'sent'}
+        gone = {token for token, outcome in results if outcome == 'invalid_tokens'}
+        try:
+            if used:
+                DeviceToken.query.filter(DeviceToken.token.in_(used)).update(
+                    {'last_used_at': datetime.utcnow()}, synchronize_session=False
+                )
+            if gone:
+                DeviceToken.query.filter(DeviceToken.token.in_(gone)).update(
+                    {'is_active': False}, synchronize_session=False
+                )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to write {len(results)} push results: {e}")
+            return
+        if gone:
+            logger.info(f"Deactivated {len(gone)} invalid device tokens")
+
+    def _get_client(self):
+        """The shared connection, opened on first use or after a failure."""
+        import httpx
+
+        with self.client_lock:
+            if self.client is None:
+                # One connection; concurrent requests become HTTP/2 streams on it
+                self.client = httpx.Client(
+                    http2=True,
+                    base_url=f"https://{self.host}",
+                    timeout=30.0,
+                    limits=httpx.Limits(max_connections=1, max_keepalive_connections=1)
+                )
+            return self.client
+
+    def _reset_client(self, client):
+        """Drop a broken connection so the next send reconnects."""
+        with self.client_lock:
+            if self.client is client:
+                self.client = None
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    def _run(self):
+        while True:
+            device_token, payload = self.queue.get()
+            try:
+                with self.app.app_context():
+                    self._send(device_token, payload)
+                    batch_size = self.app.config.get('PUSH_RESULT_BATCH_SIZE', 100)
+                    if self.queue.empty() or len(self.results) >= batch_size:
+                        self._write_results()
+            except Exception as e:
+                logger.error(f"Failed to send push notification: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _send(self, device_token, payload):
+        """Send one push over the shared connection."""
+        import httpx
+
+        jwt_token = PushNotificationService._get_apns_token(self.app)
+        if not jwt_token:
+            logger.warning("No APNs token available, skipping push notification")
+            self._record(device_token, 'failed')
+            return False
+
+        headers = {
+            'authorization': f'bearer {jwt_token}',
+            'apns-topic': self.app.config.get('APNS_BUNDLE_ID', 'com.tcz.tennisapp'),
+            'apns-push-type': 'alert',
+            'apns-priority': '10'
+        }
+
+        client = self._get_client()
+        started = time.monotonic()
+        try:
+            response = client.post(f"/3/device/{device_token}", json=payload, headers=headers)
+        except httpx.TransportError as e:
+            self._reset_client(client)
+            self._record(device_token, 'failed')
+            logger.error(f"APNs connection failed, reconnecting on next push: {e}")
+            return False
+        latency = time.monotonic() - started
+
+        if response.status_code == 200:
+            self._record(device_token, 'sent', latency)
+            logger.info(f"Push sent successfully to {device_token[:20]}...")
+            return True
+        elif response.status_code == 410:
+            # Device token is no longer valid, deactivated with the next batch of results
+            self._record(device_token, 'invalid_tokens', latency)
+            logger.info(f"Invalid token: {device_token[:20]}...")
+            return False
+        else:
+            self._record(device_token, 'failed', latency)
+            logger.error(f"APNs error {response.status_code}: {response.text}")
+            return False
+
+
+def _get_dispatcher(app):
+    """Get the push dispatcher of an app, starting it on first use."""
+    dispatcher = app.extensions.get('push_dispatcher')
+    if dispatcher is None:
+        with _dispatcher_lock:
+            dispatcher = app.extensions.get('push_dispatcher')
+            if dispatcher is None:
+                dispatcher = app.extensions['push_dispatcher'] = _PushDispatcher(app)
+    return dispatcher
+
 
 class PushNotificationService:
     """Service for sending push notifications via APNs."""
@@ -27,10 +225,22 @@ class PushNotificationService:
             'title': 'Neue Buchung fuer dich',
             'body': '{booked_by_name} hat Platz {court_number} fuer dich gebucht ({date}, {start_time})'
         },
+        'bookings_created': {
+            'title': 'Buchungsbestaetigung',
+            'body': '{count} Buchungen ab {date}, {start_time}'
+        },
+        'bookings_for_you': {
+            'title': 'Neue Buchungen fuer dich',
+            'body': '{booked_by_name} hat {count} Buchungen fuer dich erstellt (ab {date}, {start_time})'
+        },
         'booking_cancelled': {
             'title': 'Buchung storniert',
             'body': 'Platz {court_number} am {date}, {start_time} wurde storniert'
         },
+        'bookings_cancelled': {
+            'title': 'Buchungen storniert',
+            'body': '{count} Buchungen ab {date}, {start_time} wurden storniert'
+        },
         'booking_suspended': {
             'title': 'Buchung ausgesetzt',
             'body': 'Platz {court_number} am {date}, {start_time} - {reason}'
@@ -38,6 +248,10 @@ class PushNotificationService:
         'booking_restored': {
             'title': 'Buchung wiederhergestellt',
             'body': 'Platz {court_number} am {date}, {start_time} ist wieder aktiv'
+        },
+        'bookings_changed': {
+            'title': 'Buchungen geaendert',
+            'body': '{count} Buchungen ab {date}, {start_time} wurden geaendert'
         }
     }
 
@@ -80,81 +294,37 @@ class PushNotificationService:
                 return None
 
     @staticmethod
-    def _send_push_sync(device_token, payload, app):
+    def get_delivery_stats():
         """
-        Synchronously send a push notification (used by background thread).
+        Get the push delivery counters of this process.
 
-        Args:
-            device_token: APNs device token string
-            payload: APNs payload dictionary
-            app: Flask application instance for context
+        Returns:
+            dict: Counts of sent, failed and dropped pushes and invalid tokens,
+                  queue length and APNs response times (None before the first send)
         """
-        with app.app_context():
-            try:
-                import httpx
-
-                jwt_token = PushNotificationService._get_apns_token(app)
-                if not jwt_token:
-                    logger.warning("No APNs token available, skipping push notification")
-                    return False
-
-                bundle_id = app.config.get('APNS_BUNDLE_ID', 'com.tcz.tennisapp')
-                is_production = not app.debug
-
-                if is_production:
-                    host = "api.push.apple.com"
-                else:
-                    host = "api.sandbox.push.apple.com"
-
-                url = f"https://{host}/3/device/{device_token}"
-
-                headers = {
-                    'authorization': f'bearer {jwt_token}',
-                    'apns-topic': bundle_id,
-                    'apns-push-type': 'alert',
-                    'apns-priority': '10'
-                }
-
-                with httpx.Client(http2=True, timeout=30.0) as client:
-                    response = client.post(url, json=payload, headers=headers)
-
-                    if response.status_code == 200:
-                        logger.info(f"Push sent successfully to {device_token[:20]}...")
-                        return True
-                    elif response.status_code == 410:
-                        # Device token is no longer valid, mark as inactive
-                        PushNotificationService._deactivate_token_sync(device_token, app)
-                        logger.info(f"Deactivated invalid token: {device_token[:20]}...")
-                        return False
-                    else:
-                        logger.error(f"APNs error {response.status_code}: {response.text}")
-                        return False
-
-            except Exception as e:
-                logger.error(f"Failed to send push notification: {e}")
-                return False
+        dispatcher = current_app.extensions.get('push_dispatcher')
+        if dispatcher is None:
+            return {
+                'sent': 0, 'failed': 0, 'invalid_tokens': 0, 'dropped': 0, 'pending_results': 0,
+                'avg_latency_ms': None, 'max_latency_ms': None, 'queued': 0
+            }
+        return dispatcher.stats()
 
     @staticmethod
-    def _deactivate_token_sync(token, app):
-        """Mark a device token as inactive."""
-        with app.app_context():
-            from app import db
-            from app.models import DeviceToken
+    def flush():
+        """
+        Wait until the pushes queued so far have been sent and their results written.
 
-            device_token = DeviceToken.query.filter_by(token=token).first()
-            if device_token:
-                device_token.is_active = False
-                db.session.commit()
+        For tests and shutdown; returns at once if nothing was ever queued.
+        """
+        dispatcher = current_app.extensions.get('push_dispatcher')
+        if dispatcher is not None:
+            dispatcher.flush()
 
     @staticmethod
     def _send_push_async(device_token, payload, app):
-        """Send push notification in background thread."""
-        thread = threading.Thread(
-            target=PushNotificationService._send_push_sync,
-            args=(device_token, payload, app)
-        )
-        thread.daemon = True
-        thread.start()
+        """Queue a push notification for the app's push dispatcher."""
+        return _get_dispatcher(app).submit(device_token, payload)
 
     @staticmethod
     def _should_notify_member_push(member, is_own_booking):
@@ -181,15 +351,37 @@ class PushNotificationService:
         return member.push_notify_other_bookings
 
     @staticmethod
-    def _get_member_tokens(member_id):
-        """Get all active device tokens for a member."""
-        from app.models import DeviceToken
+    def _push_enabled(member):
+        """Check if member gets push notifications at all (enabled, email verified)."""
+        return member.push_notifications_enabled and member.email_verified
+
+    @staticmethod
+    def _wants_block_push(member):
+        """Check if member wants pushes about reservations hit by court blocks."""
+        return PushNotificationService._push_enabled(member) and member.push_notify_court_blocked
+
+    @staticmethod
+    def _push_to(recipient, payload, app):
+        """Queue a payload for every active device of a resolved recipient."""
+        for token in recipient.tokens:
+            PushNotificationService._send_push_async(token, payload, app)
 
-        tokens = DeviceToken.query.filter_by(
-            member_id=member_id,
-            is_active=True
-        ).all()
-        return [t.token for t in tokens]
+    @staticmethod
+    def _send_to_parties(reservation, payload, wants_push):
+        """
+        Push a payload to both parties of a reservation that want it.
+
+        Args:
+            reservation: Reservation object
+            payload: APNs payload
+            wants_push: Preference rule, called with the Member
+        """
+        app = current_app._get_current_object()
+        recipients = NotificationRecipientService.resolve_parties([reservation])
+        for member_id in dict.fromkeys((reservation.booked_for_id, reservation.booked_by_id)):
+            recipient = recipients.get(member_id)
+            if recipient and wants_push(recipient.member):
+                PushNotificationService._push_to(recipient, payload, app)
 
     @staticmethod
     def _build_payload(template_key, context, notification_type=None):
@@ -219,128 +411,157 @@ class PushNotificationService:
     @staticmethod
     def send_booking_created_push(reservation):
         """Send push notification for booking creation."""
-        app = current_app._get_current_object()
-
-        context = {
-            'court_number': reservation.court.number,
-            'date': reservation.date.strftime('%d.%m.%Y'),
-            'start_time': reservation.start_time.strftime('%H:%M'),
-            'end_time': reservation.end_time.strftime('%H:%M'),
-            'booked_for_name': reservation.booked_for.name,
-            'booked_by_name': reservation.booked_by.name
-        }
+        PushNotificationService.send_bookings_created_push([reservation])
 
-        is_own_booking = reservation.booked_for_id == reservation.booked_by_id
-
-        # Notify booked_for member
-        if PushNotificationService._should_notify_member_push(reservation.booked_for, is_own_booking):
-            tokens = PushNotificationService._get_member_tokens(reservation.booked_for_id)
-
-            if is_own_booking:
-                template_key = 'booking_created'
-            else:
-                template_key = 'booking_for_you'
+    @staticmethod
+    def send_bookings_created_push(reservations):
+        """
+        Send one push notification for one or several reservations to both parties.
 
-            payload = PushNotificationService._build_payload(template_key, context, 'booking_created')
+        All reservations must be for the same member and made by the same member.
+        """
+        if not reservations:
+            return
 
-            for token in tokens:
-                PushNotificationService._send_push_async(token, payload, app)
-        else:
-            logger.info(f"Skipping push to booked_for {reservation.booked_for.email} (preferences)")
+        app = current_app._get_current_object()
+        first = reservations[0]
+        recipients = NotificationRecipientService.resolve_parties([first])
+        booked_for, booked_by = recipients.get(first.booked_for_id), recipients.get(first.booked_by_id)
+        context = {
+            'count': len(reservations),
+            'court_number': first.court.number,
+            'date': first.date.strftime('%d.%m.%Y'),
+            'start_time': first.start_time.strftime('%H:%M'),
+            'end_time': first.end_time.strftime('%H:%M'),
+            'booked_for_name': booked_for.member.name if booked_for else '',
+            'booked_by_name': booked_by.member.name if booked_by else ''
+        }
 
-        # Notify booked_by member if different (they always get "own booking" notification)
+        single = len(reservations) == 1
+        is_own_booking = first.booked_for_id == first.booked_by_id
+        own_template = 'booking_created' if single else 'bookings_created'
+        plan = [(booked_for, is_own_booking, own_template if is_own_booking else
+                 ('booking_for_you' if single else 'bookings_for_you'))]
+        # The booking member always gets the "own booking" notification
         if not is_own_booking:
-            if PushNotificationService._should_notify_member_push(reservation.booked_by, is_own_booking=True):
-                tokens = PushNotificationService._get_member_tokens(reservation.booked_by_id)
-                payload = PushNotificationService._build_payload('booking_created', context, 'booking_created')
-
-                for token in tokens:
-                    PushNotificationService._send_push_async(token, payload, app)
-            else:
-                logger.info(f"Skipping push to booked_by {reservation.booked_by.email} (preferences)")
+            plan.append((booked_by, True, own_template))
+
+        for recipient, own, template_key in plan:
+            if recipient is None:
+                continue
+            if not PushNotificationService._should_notify_member_push(recipient.member, own):
+                logger.info(f"Skipping push to {recipient.member.email} (preferences)")
+                continue
+            payload = PushNotificationService._build_payload(template_key, context, 'booking_created')
+            PushNotificationService._push_to(recipient, payload, app)
 
     @staticmethod
     def send_booking_cancelled_push(reservation, reason=None):
         """Send push notification for booking cancellation."""
-        app = current_app._get_current_object()
-
         context = {
             'court_number': reservation.court.number,
             'date': reservation.date.strftime('%d.%m.%Y'),
             'start_time': reservation.start_time.strftime('%H:%M'),
             'reason': reason or ''
         }
-
         payload = PushNotificationService._build_payload('booking_cancelled', context, 'booking_cancelled')
+        PushNotificationService._send_to_parties(reservation, payload, PushNotificationService._wants_block_push)
+
+    @staticmethod
+    def send_bookings_cancelled_push(member, reservations, reason=None, recipient=None):
+        """
+        Send one push notification for several cancelled reservations to a member.
+
+        Args:
+            member: Member object of the recipient
+            reservations: List of Reservation objects the member booked or was booked for
+            reason: Optional cancellation reason
+            recipient: The member's Recipient if already resolved (loaded otherwise)
+        """
+        if not reservations:
+            return
+        if not PushNotificationService._wants_block_push(member):
+            logger.info(f"Skipping push to {member.email} (preferences)")
+            return
+
+        app = current_app._get_current_object()
+        first = min(reservations, key=lambda r: (r.date, r.start_time))
+        context = {
+            'count': len(reservations),
+            'court_number': first.court.number,
+            'date': first.date.strftime('%d.%m.%Y'),
+            'start_time': first.start_time.strftime('%H:%M'),
+            'reason': reason or ''
+        }
+        template_key = 'booking_cancelled' if len(reservations) == 1 else 'bookings_cancelled'
+        payload = PushNotificationService._build_payload(template_key, context, 'booking_cancelled')
 
-        # Notify booked_for
-        if reservation.booked_for.push_notifications_enabled and reservation.booked_for.push_notify_court_blocked:
-            if reservation.booked_for.email_verified:
-                tokens = PushNotificationService._get_member_tokens(reservation.booked_for_id)
-                for token in tokens:
-                    PushNotificationService._send_push_async(token, payload, app)
-
-        # Notify booked_by if different
-        if reservation.booked_for_id != reservation.booked_by_id:
-            if reservation.booked_by.push_notifications_enabled and reservation.booked_by.push_notify_court_blocked:
-                if reservation.booked_by.email_verified:
-                    tokens = PushNotificationService._get_member_tokens(reservation.booked_by_id)
-                    for token in tokens:
-                        PushNotificationService._send_push_async(token, payload, app)
+        recipient = recipient or NotificationRecipientService.resolve([member.id]).get(member.id)
+        if recipient:
+            PushNotificationService._push_to(recipient, payload, app)
 
     @staticmethod
     def send_booking_suspended_push(reservation, reason=None):
         """Send push notification for booking suspension."""
-        app = current_app._get_current_object()
-
         context = {
             'court_number': reservation.court.number,
             'date': reservation.date.strftime('%d.%m.%Y'),
             'start_time': reservation.start_time.strftime('%H:%M'),
             'reason': reason or 'Voruebergehende Sperre'
         }
-
         payload = PushNotificationService._build_payload('booking_suspended', context, 'booking_suspended')
-
-        # Notify booked_for
-        if reservation.booked_for.push_notifications_enabled and reservation.booked_for.push_notify_court_blocked:
-            if reservation.booked_for.email_verified:
-                tokens = PushNotificationService._get_member_tokens(reservation.booked_for_id)
-                for token in tokens:
-                    PushNotificationService._send_push_async(token, payload, app)
-
-        # Notify booked_by if different
-        if reservation.booked_for_id != reservation.booked_by_id:
-            if reservation.booked_by.push_notifications_enabled and reservation.booked_by.push_notify_court_blocked:
-                if reservation.booked_by.email_verified:
-                    tokens = PushNotificationService._get_member_tokens(reservation.booked_by_id)
-                    for token in tokens:
-                        PushNotificationService._send_push_async(token, payload, app)
+        PushNotificationService._send_to_parties(reservation, payload, PushNotificationService._wants_block_push)
 
     @staticmethod
     def send_booking_restored_push(reservation):
         """Send push notification for booking restoration."""
-        app = current_app._get_current_object()
-
         context = {
             'court_number': reservation.court.number,
             'date': reservation.date.strftime('%d.%m.%Y'),
             'start_time': reservation.start_time.strftime('%H:%M')
         }
-
         payload = PushNotificationService._build_payload('booking_restored', context, 'booking_restored')
+        PushNotificationService._send_to_parties(reservation, payload, PushNotificationService._push_enabled)
+
+    @staticmethod
+    def send_notification_digest_push(member, changes, recipient=None):
+        """
+        Send one push notification covering several reservation changes to a member.
+
+        Suspensions and cancellations follow push_notify_court_blocked like
+        their single notifications; a single change uses its usual template.
+
+        Args:
+            member: Member object of the recipient
+            changes: List of (kind, Reservation, reason) tuples, kind being
+                     'suspended', 'cancelled' or 'restored'
+            recipient: The member's Recipient if already resolved (loaded otherwise)
+        """
+        if not PushNotificationService._push_enabled(member):
+            logger.info(f"Skipping push to {member.email} (preferences)")
+            return
+        changes = [
+            (kind, r, reason) for kind, r, reason in changes
+            if kind == 'restored' or member.push_notify_court_blocked
+        ]
+        if not changes:
+            logger.info(f"Skipping push to {member.email} (preferences)")
+            return
+
+        app = current_app._get_current_object()
+        kind, first, reason = changes[0]
+        context = {
+            'count': len(changes),
+            'court_number': first.court.number,
+            'date': first.date.strftime('%d.%m.%Y'),
+            'start_time': first.start_time.strftime('%H:%M'),
+            'reason': reason or ('Voruebergehende Sperre' if kind == 'suspended' else '')
+        }
+        if len(changes) == 1:
+            payload = PushNotificationService._build_payload(f'booking_{kind}', context, f'booking_{kind}')
+        else:
+            payload = PushNotificationService._build_payload('bookings_changed', context, 'bookings_changed')
 
-        # Notify booked_for
-        if reservation.booked_for.push_notifications_enabled:
-            if reservation.booked_for.email_verified:
-                tokens = PushNotificationService._get_member_tokens(reservation.booked_for_id)
-                for token in tokens:
-                    PushNotificationService._send_push_async(token, payload, app)
-
-        # Notify booked_by if different
-        if reservation.booked_for_id != reservation.booked_by_id:
-            if reservation.booked_by.push_notifications_enabled:
-                if reservation.booked_by.email_verified:
-                    tokens = PushNotificationService._get_member_tokens(reservation.booked_by_id)
-                    for token in tokens:
-                        PushNotificationService._send_push_async(token, payload, app)
+        recipient = recipient or NotificationRecipientService.resolve([member.id]).get(member.id)
+        if recipient:
+            PushNotificationService._push_to(recipient, payload, app)
@@ -6,6 +6,8 @@ This package splits the original ReservationService into focused sub-services:
 - query_service: All retrieval and query operations
 - creation_service: Creating and updating reservations
 - cancellation_service: Cancelling reservations
+- batch_service: Booking several slots in one transaction
+- bulk_cancellation_service: Administrative cancellation of a date and time range
 
 For backward compatibility, we export a unified ReservationService class that
 delegates to the appropriate sub-service.
@@ -15,6 +17,8 @@ from app.services.reservation.helpers import ReservationHelpers
 from app.services.reservation.query_service import ReservationQueryService
 from app.services.reservation.creation_service import ReservationCreationService
 from app.services.reservation.cancellation_service import ReservationCancellationService
+from app.services.reservation.batch_service import ReservationBatchService
+from app.services.reservation.bulk_cancellation_service import ReservationBulkCancellationService
 
 import logging
 
@@ -103,10 +107,19 @@ class ReservationService:
     # ============================================================================
 
     @staticmethod
-    def create_reservation(court_id, date, start_time, booked_for_id, booked_by_id, current_time=None, booked_for_member=None):
+    def create_reservation(court_id, date, start_time, booked_for_id, booked_by_id, current_time=None, booked_for_member=None,
+                           waitlist_entry_id=None):
         """Create a new reservation."""
         return ReservationCreationService.create_reservation(
-            court_id, date, start_time, booked_for_id, booked_by_id, current_time, booked_for_member
+            court_id, date, start_time, booked_for_id, booked_by_id, current_time, booked_for_member,
+            waitlist_entry_id
+        )
+
+    @staticmethod
+    def create_reservations(slots, booked_for_id, booked_by_id, atomic=True, current_time=None):
+        """Create reservations for several slots in one transaction."""
+        return ReservationBatchService.create_reservations(
+            slots, booked_for_id, booked_by_id, atomic, current_time
         )
 
     @staticmethod
@@ -123,10 +136,56 @@ class ReservationService:
         """Cancel a reservation."""
         return ReservationCancellationService.cancel_reservation(reservation_id, reason, cancelled_by_id)
 
+    @staticmethod
+    def cancel_reservations_bulk(date_from, date_to, reason, cancelled_by_id, court_ids=None,
+                                 start_time=None, end_time=None, current_time=None):
+        """Cancel all active reservations in a date and time range."""
+        return ReservationBulkCancellationService.cancel_matching(
+            date_from, date_to, reason, cancelled_by_id, court_ids, start_time, end_time, current_time
+        )
+
     # ============================================================================
     # Audit Logging
     # ============================================================================
 
+    @staticmethod
+    def build_audit_log(operation, reservation_id, operation_data, performed_by_id=None):
+        """
+        Build an audit log entry for a reservation operation (not added to the session).
+
+        Args:
+            operation: Type of operation ('create', 'cancel')
+            reservation_id: ID of the reservation being operated on
+            operation_data: Dictionary containing operation details
+            performed_by_id: ID of user performing the operation
+
+        Returns:
+            ReservationAuditLog: The unsaved entry
+        """
+        from app.models import ReservationAuditLog, Member
+        from app.utils.serializers import serialize_for_json
+
+        if operation_data is None:
+            operation_data = {}
+
+        if performed_by_id:
+            performer = Member.query.get(performed_by_id)
+            if performer:
+                operation_data['performer_role'] = performer.role
+                # Only mark as admin action if performer has elevated role
+                if 'is_admin_action' in operation_data:
+                    is_elevated_user = performer.role in ['administrator', 'teamster']
+                    operation_data['is_admin_action'] = operation_data['is_admin_action'] and is_elevated_user
+
+        safe_data = serialize_for_json(operation_data) if operation_data else None
+
+        return ReservationAuditLog(
+            reservation_id=str(reservation_id) if reservation_id else None,
+            operation=operation,
+            operation_data=safe_data,
+            performed_by_id=performed_by_id
+        )
+
     @staticmethod
     def log_reservation_operation(operation, reservation_id, operation_data, performed_by_id=None):
         """
@@ -139,29 +198,10 @@ class ReservationService:
             performed_by_id: ID of user performing the operation
         """
         from app import db
-        from app.models import ReservationAuditLog, Member
-        from app.utils.serializers import serialize_for_json
 
         try:
-            if operation_data is None:
-                operation_data = {}
-
-            if performed_by_id:
-                performer = Member.query.get(performed_by_id)
-                if performer:
-                    operation_data['performer_role'] = performer.role
-                    # Only mark as admin action if performer has elevated role
-                    if 'is_admin_action' in operation_data:
-                        is_elevated_user = performer.role in ['administrator', 'teamster']
-                        operation_data['is_admin_action'] = operation_data['is_admin_action'] and is_elevated_user
-
-            safe_data = serialize_for_json(operation_data) if operation_data else None
-
-            audit_log = ReservationAuditLog(
-                reservation_id=str(reservation_id) if reservation_id else None,
-                operation=operation,
-                operation_data=safe_data,
-                performed_by_id=performed_by_id
+            audit_log = ReservationService.build_audit_log(
+                operation, reservation_id, operation_data, performed_by_id
             )
 
             db.session.add(audit_log)
@@ -180,5 +220,6 @@ __all__ = [
     'ReservationHelpers',
     'ReservationQueryService',
     'ReservationCreationService',
-    'ReservationCancellationService'
+    'ReservationCancellationService',
+    'ReservationBatchService'
 ]
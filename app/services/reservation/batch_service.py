@@ -0,0 +1,149 @@
+"""Service for booking several slots in one transaction."""
+import logging
+from datetime import time
+
+from flask import current_app
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Reservation, Member, ReservationAuditLog
+from app.services.validation_service import ValidationService
+from app.services.availability_cache_service import AvailabilityCacheService
+from app.services.availability_stream_service import AvailabilityStreamService, reservation_slots
+from app.services.outbox_service import OutboxService
+from app.services.reservation.creation_service import _lock_booking
+from app.services.reservation.helpers import ReservationHelpers
+from app.utils.serializers import serialize_for_json
+from app.utils.timezone_utils import ensure_berlin_timezone
+from app.constants.messages import ErrorMessages
+
+logger = logging.getLogger(__name__)
+
+
+def _audit_entries(reservations, booked_by_id, batch_size):
+    """Build the 'create' audit log entries for a committed batch."""
+    performer = db.session.get(Member, booked_by_id)
+    is_elevated_user = performer is not None and performer.is_teamster_or_admin()
+    return [
+        ReservationAuditLog(
+            reservation_id=str(reservation.id),
+            operation='create',
+            operation_data=serialize_for_json({
+                'court_id': reservation.court_id,
+                'date': str(reservation.date),
+                'start_time': str(reservation.start_time),
+                'end_time': str(reservation.end_time),
+                'booked_for_id': reservation.booked_for_id,
+                'booked_by_id': booked_by_id,
+                'is_short_notice': reservation.is_short_notice,
+                'is_admin_action': is_elevated_user and booked_by_id != reservation.booked_for_id,
+                'performer_role': performer.role if performer else None,
+                'batch_size': batch_size
+            }),
+            performed_by_id=booked_by_id
+        )
+        for reservation in reservations
+    ]
+
+
+class ReservationBatchService:
+    """Service for booking several slots for one member at once."""
+
+    @staticmethod
+    def create_reservations(slots, booked_for_id, booked_by_id, atomic=True, current_time=None):
+        """
+        Create reservations for several slots in one transaction.
+
+        Each slot is validated like a single booking, counting the slots of
+        the batch booked before it (so a batch can't exceed the limits). All
+        reservations are committed together, and each recipient gets one
+        email and one push notification for the whole batch.
+
+        Args:
+            slots: List of (court_id, date, start_time) tuples
+            booked_for_id: ID of member the reservations are for
+            booked_by_id: ID of member creating the reservations
+            atomic: If True, nothing is booked unless every slot is valid;
+                    if False, the valid slots are booked and the others reported
+            current_time: Current datetime for testing (defaults to now)
+
+        Returns:
+            tuple: (list of Reservation objects, list of (slot index, error message)
+                   for the slots that failed validation, error message or None)
+        """
+        if not slots:
+            return [], [], None
+
+        berlin_time = ensure_berlin_timezone(current_time)
+        logger.info(f"Creating {len(slots)} reservations for {booked_for_id} (atomic={atomic})")
+
+        try:
+            locked = current_app.config.get('BOOKING_CONTENTION_SAFE', True)
+            if locked:
+                try:
+                    _lock_booking(sorted({slot[0] for slot in slots}), booked_for_id)
+                except OperationalError as lock_error:
+                    db.session.rollback()
+                    logger.warning(f"Booking lock not granted: {lock_error}")
+                    return [], [], ErrorMessages.BOOKING_BUSY
+
+            member = db.session.get(Member, booked_for_id)
+            reservations = []
+            failures = []
+            for index, (court_id, date, start_time) in enumerate(slots):
+                is_short_notice = ReservationHelpers.is_short_notice_booking(date, start_time, berlin_time)
+                is_valid, error_msg, _ = ValidationService.validate_all_booking_constraints(
+                    court_id, date, start_time, booked_for_id, is_short_notice, berlin_time,
+                    member=member, booked_by_id=booked_by_id, store_counter=locked
+                )
+                if not is_valid:
+                    failures.append((index, error_msg))
+                    continue
+
+                reservation = Reservation(
+                    court_id=court_id,
+                    date=date,
+                    start_time=start_time,
+                    end_time=time(start_time.hour + 1, start_time.minute),
+                    booked_for_id=booked_for_id,
+                    booked_by_id=booked_by_id,
+                    status='active',
+                    is_short_notice=is_short_notice
+                )
+                db.session.add(reservation)
+                # Flushed so the next slot's validation counts it
+                db.session.flush()
+                reservations.append(reservation)
+
+            if not reservations or (atomic and failures):
+                db.session.rollback()
+                logger.warning(f"Batch reservation rejected: {failures}")
+                return [], failures, None
+
+            db.session.add_all(_audit_entries(reservations, booked_by_id, len(slots)))
+            # Read before the commit expires the objects
+            reservation_ids = [reservation.id for reservation in reservations]
+            booked_slots = reservation_slots(*reservations)
+            OutboxService.enqueue_booking_notifications(reservation_ids)
+            AvailabilityCacheService.invalidate(*{slot[0] for slot in booked_slots})
+            AvailabilityStreamService.publish_slot_changes(booked_slots)
+            db.session.commit()
+
+        except SQLAlchemyError as db_error:
+            db.session.rollback()
+            logger.error(f"Database error creating reservations: {db_error}")
+            return [], [], f"Fehler beim Erstellen der Buchungen: {str(db_error)}"
+
+        OutboxService.dispatch()
+        logger.info(f"Batch reservations created: IDs={reservation_ids}")
+
+        # Eager load relationships for the caller's response
+        reservations = Reservation.query.options(
+            joinedload(Reservation.court),
+            joinedload(Reservation.booked_for),
+            joinedload(Reservation.booked_by)
+        ).filter(
+            Reservation.id.in_(reservation_ids)
+        ).order_by(Reservation.date, Reservation.start_time, Reservation.court_id).all()
+
+        return reservations, failures, None
@@ -0,0 +1,132 @@
+"""Service for cancelling all reservations in a date and time range at once."""
+import logging
+from datetime import datetime
+
+from sqlalchemy import and_, insert, or_, update
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models import Reservation, Member, ReservationAuditLog
+from app.services.availability_cache_service import AvailabilityCacheService
+from app.services.availability_stream_service import AvailabilityStreamService
+from app.services.booking_counter_service import COUNTED_STATUSES, BookingCounterService
+from app.services.outbox_service import OutboxService
+from app.utils.serializers import serialize_for_json
+from app.utils.timezone_utils import ensure_berlin_timezone
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationBulkCancellationService:
+    """Service for administrative cancellation of many reservations (tournaments, rain-outs)."""
+
+    @staticmethod
+    def cancel_matching(date_from, date_to, reason, cancelled_by_id, court_ids=None,
+                        start_time=None, end_time=None, current_time=None):
+        """
+        Cancel the active and suspended reservations in a range with set-based writes.
+
+        Suspended reservations (under a temporary block) are cancelled too,
+        as they still count towards the limits and would come back when the
+        block is lifted. Reservations that have already started are left alone. The matching
+        rows are cancelled with one UPDATE and audited with one multi-row
+        INSERT; each affected member gets one email and one push notification
+        listing all of their cancelled reservations (through the outbox). Freed
+        slots are not offered to the waitlists, as the courts are meant to
+        stay unused.
+
+        Args:
+            date_from: First date (inclusive)
+            date_to: Last date (inclusive)
+            reason: Cancellation reason (shown to the members)
+            cancelled_by_id: ID of the administrator
+            court_ids: Optional list of court IDs (defaults to all courts)
+            start_time: Optional earliest start time
+            end_time: Optional end of the range (reservations must start before it)
+            current_time: Current datetime for testing (defaults to now)
+
+        Returns:
+            tuple: (number of cancelled reservations, error message or None)
+        """
+        berlin_time = ensure_berlin_timezone(current_time)
+
+        filters = [
+            Reservation.status.in_(COUNTED_STATUSES),
+            Reservation.date >= max(date_from, berlin_time.date()),
+            Reservation.date <= date_to,
+            or_(
+                Reservation.date > berlin_time.date(),
+                and_(Reservation.date == berlin_time.date(), Reservation.start_time > berlin_time.time())
+            )
+        ]
+        if court_ids:
+            filters.append(Reservation.court_id.in_(court_ids))
+        if start_time:
+            filters.append(Reservation.start_time >= start_time)
+        if end_time:
+            filters.append(Reservation.start_time < end_time)
+
+        try:
+            rows = db.session.query(
+                Reservation.id, Reservation.court_id, Reservation.date, Reservation.start_time,
+                Reservation.booked_for_id, Reservation.booked_by_id
+            ).filter(*filters).with_for_update().all()
+            if not rows:
+                db.session.rollback()
+                return 0, None
+
+            reservation_ids = [row.id for row in rows]
+            db.session.execute(
+                update(Reservation).where(Reservation.id.in_(reservation_ids)).values(
+                    status='cancelled', reason=reason
+                ),
+                execution_options={'synchronize_session': False}
+            )
+            # The update bypasses the flush that maintains the booking counters
+            BookingCounterService.invalidate(row.booked_for_id for row in rows)
+
+            performer = db.session.get(Member, cancelled_by_id)
+            performer_role = performer.role if performer else None
+            now = datetime.utcnow()
+            db.session.execute(insert(ReservationAuditLog), [
+                {
+                    'reservation_id': str(row.id),
+                    'operation': 'cancel',
+                    'operation_data': serialize_for_json({
+                        'court_id': row.court_id,
+                        'date': str(row.date),
+                        'start_time': str(row.start_time),
+                        'reason': reason,
+                        'booked_for_id': row.booked_for_id,
+                        'cancelled_by_id': cancelled_by_id,
+                        'cancelled_by_admin': True,
+                        'is_admin_action': True,
+                        'performer_role': performer_role,
+                        'batch_size': len(rows)
+                    }),
+                    'performed_by_id': cancelled_by_id,
+                    'timestamp': now
+                }
+                for row in rows
+            ])
+
+            # One notification per member, booked for them or by them
+            by_member = {}
+            for row in rows:
+                by_member.setdefault(row.booked_for_id, set()).add(row.id)
+                by_member.setdefault(row.booked_by_id, set()).add(row.id)
+            OutboxService.enqueue_cancellation_notifications(by_member, reason)
+
+            freed_slots = {(row.date, row.court_id, row.start_time.hour) for row in rows}
+            AvailabilityCacheService.invalidate(*{slot[0] for slot in freed_slots})
+            AvailabilityStreamService.publish_slot_changes(freed_slots)
+            db.session.commit()
+
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Bulk cancellation failed: {e}")
+            return 0, f"Fehler beim Stornieren der Buchungen: {str(e)}"
+
+        OutboxService.dispatch()
+
+        logger.info(f"Bulk cancelled {len(rows)} reservations ({date_from} - {date_to}) by {cancelled_by_id}")
+        return len(rows), None
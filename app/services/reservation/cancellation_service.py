@@ -5,6 +5,9 @@ from app import db
 from app.models import Reservation
 from app.services.validation_service import ValidationService
 from app.services.email_service import EmailService
+from app.services.availability_cache_service import AvailabilityCacheService
+from app.services.availability_stream_service import AvailabilityStreamService, reservation_slots
+from app.services.outbox_service import OutboxService
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -40,7 +43,13 @@ class ReservationCancellationService:
             reservation.reason = reason
 
         try:
+            AvailabilityCacheService.invalidate(reservation.date)
+            AvailabilityStreamService.publish_slot_changes(reservation_slots(reservation))
+            # Offer the freed slot to the waitlist
+            from app.services.waitlist_service import WaitlistService
+            WaitlistService.enqueue_freed_slots(reservation_slots(reservation))
             db.session.commit()
+            OutboxService.dispatch()
 
             # Send email notifications
             EmailService.send_booking_cancelled(reservation, reason)
@@ -1,12 +1,18 @@
 """Service for creating and updating reservations."""
 import logging
-from datetime import time
+from datetime import datetime, time
 
+from flask import current_app
+from sqlalchemy import event, update
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import joinedload
 from app import db
-from app.models import Reservation, Court, Member
+from app.models import Reservation, Court, Member, WaitlistEntry
 from app.services.validation_service import ValidationService
 from app.services.email_service import EmailService
+from app.services.availability_cache_service import AvailabilityCacheService
+from app.services.availability_stream_service import AvailabilityStreamService, reservation_slots
+from app.services.outbox_service import OutboxService
 from app.services.reservation.helpers import ReservationHelpers
 from app.utils.timezone_utils import ensure_berlin_timezone, log_timezone_operation
 from app.utils.error_handling import (
@@ -21,12 +27,107 @@ from app.constants.messages import ErrorMessages
 logger = logging.getLogger(__name__)
 
 
+# Session info key set while the transaction holds flushed, uncommitted writes
+_FLUSHED_WRITES_KEY = 'booking_lock_flushed_writes'
+
+
+def _note_flushed_writes(session, flush_context):
+    """after_flush listener: the transaction now holds writes."""
+    session.info[_FLUSHED_WRITES_KEY] = True
+
+
+def _forget_flushed_writes(session, *args):
+    """after_commit/after_rollback listener: the writes were committed or discarded."""
+    session.info.pop(_FLUSHED_WRITES_KEY, None)
+
+
+class UncommittedChangesError(RuntimeError):
+    """The booking lock was requested while the session held uncommitted changes."""
+
+
+def _is_slot_conflict(error):
+    """
+    Whether an IntegrityError was raised by the unique index on the booked slot.
+
+    Foreign key and NOT NULL violations are IntegrityErrors too, but they are
+    programming errors rather than a slot someone else took.
+    """
+    message = str(getattr(error, 'orig', error))
+    if 'unique_active_booking' in message or 'unique_booking' in message:
+        return True
+    return 'UNIQUE constraint failed' in message and 'reservation.court_id' in message
+
+
+def register_booking_lock_guard():
+    """Track flushed writes of the application session, which _lock_booking refuses to commit."""
+    for name, listener in (
+        ('after_flush', _note_flushed_writes),
+        ('after_commit', _forget_flushed_writes),
+        ('after_rollback', _forget_flushed_writes)
+    ):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+
+
+def _lock_booking(court_ids, booked_for_id):
+    """
+    Serialize bookings for courts and a member until the next commit or rollback.
+
+    The slot has no unique index (cancelled bookings keep their row), so the
+    conflict and limit checks are only safe if no concurrent booking for the
+    same court or member can run between them and the insert. A new
+    transaction is started first so the checks see every booking committed
+    before the lock was granted. That transaction must not hold changes of the
+    caller: they would be committed as a side effect of taking the lock, so a
+    session with pending changes is refused.
+
+    SQLite can only lock the whole database, which BEGIN IMMEDIATE does. Other
+    backends lock the court rows in ID order and then the member row (always
+    in this order, so two bookings can't deadlock).
+
+    Args:
+        court_ids: IDs of the courts to be booked
+        booked_for_id: ID of the member the bookings are for
+
+    Raises:
+        UncommittedChangesError: If the session has pending or flushed changes
+    """
+    if (db.session.new or db.session.dirty or db.session.deleted
+            or db.session.info.get(_FLUSHED_WRITES_KEY)):
+        raise UncommittedChangesError("Cannot lock a booking while the session has uncommitted changes")
+    # Nothing to write; only ends the transaction the checks would otherwise read from
+    db.session.commit()
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+        return
+    db.session.query(Court.id).filter(Court.id.in_(court_ids)).order_by(Court.id).with_for_update().all()
+    db.session.query(Member.id).filter_by(id=booked_for_id).with_for_update().first()
+
+
+def _commit_keeping_state():
+    """
+    Commit without expiring the session's objects.
+
+    The objects still hold what the transaction wrote or read, so a response
+    built from them needs no reloads.
+    """
+    session = db.session()
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
+
+
 class ReservationCreationService:
     """Service for creating and updating reservations."""
 
     @staticmethod
     @monitor_performance("create_reservation", threshold_ms=2000)
-    def create_reservation(court_id, date, start_time, booked_for_id, booked_by_id, current_time=None, booked_for_member=None):
+    def create_reservation(court_id, date, start_time, booked_for_id, booked_by_id, current_time=None, booked_for_member=None,
+                           waitlist_entry_id=None):
         """
         Create a new reservation.
 
@@ -38,6 +139,9 @@ class ReservationCreationService:
             booked_by_id: ID of member creating the reservation
             current_time: Current datetime for testing (defaults to now)
             booked_for_member: Optional pre-loaded Member object (booked_for) to avoid redundant query
+            waitlist_entry_id: Optional ID of the waiting entry the booking promotes; it is marked
+                               promoted in the same transaction, and nothing is booked if it
+                               stopped waiting
 
         Returns:
             tuple: (Reservation object or None, error message or None, active_sessions or None)
@@ -54,69 +158,81 @@ class ReservationCreationService:
             # Log reservation creation
             logger.info(f"Creating reservation - date={date}, start_time={start_time}, is_short_notice={is_short_notice}")
 
+            # Hold the court and member until the booking is committed
+            locked = current_app.config.get('BOOKING_CONTENTION_SAFE', True)
+            if locked:
+                try:
+                    _lock_booking([court_id], booked_for_id)
+                except OperationalError as lock_error:
+                    db.session.rollback()
+                    logger.warning(f"Booking lock not granted: {lock_error}")
+                    return None, ErrorMessages.BOOKING_BUSY, None
+
             # Validate all constraints (pass short notice flag and current_time for proper validation)
             # Pass pre-loaded member to avoid redundant query
             # Pass booked_by_id for personalized error messages
             is_valid, error_msg, active_sessions = ValidationService.validate_all_booking_constraints(
                 court_id, date, start_time, booked_for_id, is_short_notice, berlin_time,
-                member=booked_for_member, booked_by_id=booked_by_id
+                member=booked_for_member, booked_by_id=booked_by_id, store_counter=locked
             )
 
             if not is_valid:
                 logger.warning(f"Reservation validation failed: {error_msg}")
+                if locked:
+                    db.session.rollback()
                 return None, error_msg, active_sessions
 
+            # The response is built from these; the members are usually already
+            # loaded (by the caller or the validation) and cost no query
+            court = db.session.get(Court, court_id)
+            if court is None:
+                if locked:
+                    db.session.rollback()
+                return None, ErrorMessages.COURT_NOT_FOUND, None
+            booked_for = booked_for_member or db.session.get(Member, booked_for_id)
+            booked_by = booked_for if booked_by_id == booked_for_id else db.session.get(Member, booked_by_id)
+
             # Calculate end time (1 hour after start)
             end_time = time(start_time.hour + 1, start_time.minute)
 
             # Create reservation
             reservation = Reservation(
-                court_id=court_id,
+                court=court,
                 date=date,
                 start_time=start_time,
                 end_time=end_time,
-                booked_for_id=booked_for_id,
-                booked_by_id=booked_by_id,
+                booked_for=booked_for,
+                booked_by=booked_by,
                 status='active',
                 is_short_notice=is_short_notice
             )
 
             try:
                 db.session.add(reservation)
-                db.session.commit()
-
-                logger.info(f"Reservation created successfully: ID={reservation.id}")
-
-                # Eager load relationships for email to avoid additional queries
-                # Note: Must use filter_by().first() instead of .get() because
-                # .get() bypasses query options like joinedload
-                reservation = Reservation.query.options(
-                    joinedload(Reservation.court),
-                    joinedload(Reservation.booked_for),
-                    joinedload(Reservation.booked_by)
-                ).filter_by(id=reservation.id).first()
-
-                # Send email notifications (don't fail if email fails)
-                try:
-                    EmailService.send_booking_created(reservation)
-                except Exception as email_error:
-                    logger.warning(f"Email notification failed: {email_error}")
-                    # Don't fail the reservation creation if email fails
-
-                # Send push notifications (don't fail if push fails)
-                try:
-                    from app.services.push_notification_service import PushNotificationService
-                    PushNotificationService.send_booking_created_push(reservation)
-                except Exception as push_error:
-                    logger.warning(f"Push notification failed: {push_error}")
-                    # Don't fail the reservation creation if push fails
-
-                # Log audit trail
-                from app.services.reservation import ReservationService
-                ReservationService.log_reservation_operation(
-                    operation='create',
-                    reservation_id=reservation.id,
-                    operation_data={
+                db.session.flush()
+                reservation_id = reservation.id
+
+                if waitlist_entry_id is not None:
+                    promoted = db.session.execute(
+                        update(WaitlistEntry).where(
+                            WaitlistEntry.id == waitlist_entry_id,
+                            WaitlistEntry.status == 'waiting'
+                        ).values(
+                            status='promoted', reservation_id=reservation_id, promoted_at=datetime.utcnow()
+                        )
+                    )
+                    if promoted.rowcount != 1:
+                        # The member left the waitlist meanwhile
+                        db.session.rollback()
+                        return None, ErrorMessages.WAITLIST_ENTRY_NOT_FOUND, None
+
+                # Notifications and audit trail are delivered by the outbox worker,
+                # committed together with the reservation
+                OutboxService.enqueue_booking_notifications([reservation_id])
+                OutboxService.enqueue('reservation_audit', {
+                    'operation': 'create',
+                    'reservation_id': reservation_id,
+                    'operation_data': {
                         'court_id': court_id,
                         'date': str(date),
                         'start_time': str(start_time),
@@ -126,9 +242,13 @@ class ReservationCreationService:
                         'is_short_notice': is_short_notice,
                         'is_admin_action': booked_by_id != booked_for_id
                     },
-                    performed_by_id=booked_by_id
-                )
+                    'performed_by_id': booked_by_id
+                })
+                AvailabilityCacheService.invalidate(date)
+                AvailabilityStreamService.publish_slot_changes([(date, court_id, start_time.hour)])
+                _commit_keeping_state()
 
+                logger.info(f"Reservation created successfully: ID={reservation_id}")
                 return reservation, None, None
 
             except Exception as db_error:
@@ -136,10 +256,21 @@ class ReservationCreationService:
                 logger.error(f"Database error creating reservation: {db_error}")
 
                 # Check if it's a duplicate booking error
-                if 'Duplicate entry' in str(db_error) and 'unique_booking' in str(db_error):
+                if isinstance(db_error, IntegrityError) and _is_slot_conflict(db_error):
                     return None, ErrorMessages.RESERVATION_ALREADY_BOOKED, None
                 return None, f"Fehler beim Erstellen der Buchung: {str(db_error)}", None
 
+        except UncommittedChangesError as e:
+            # A caller bug, not a booking problem: fail the request loudly
+            log_error_with_context(e, {
+                'court_id': court_id,
+                'date': date,
+                'start_time': start_time,
+                'booked_for_id': booked_for_id,
+                'booked_by_id': booked_by_id
+            }, "create_reservation")
+            raise
+
         except Exception as e:
             # Enhanced error handling with comprehensive logging
             context = {
@@ -151,6 +282,7 @@ class ReservationCreationService:
                 'current_time': current_time
             }
             log_error_with_context(e, context, "create_reservation")
+            db.session.rollback()
 
             # Get system health info for debugging
             health_info = get_system_health_info()
@@ -176,12 +308,17 @@ class ReservationCreationService:
         if not reservation:
             return None, ErrorMessages.RESERVATION_NOT_FOUND
 
+        old_date = reservation.date
+        old_slots = reservation_slots(reservation)
+
         # Update fields
         for key, value in updates.items():
             if hasattr(reservation, key):
                 setattr(reservation, key, value)
 
         try:
+            AvailabilityCacheService.invalidate(old_date, reservation.date)
+            AvailabilityStreamService.publish_slot_changes(old_slots | reservation_slots(reservation))
             db.session.commit()
 
             # Eager load relationships for email to avoid additional queries
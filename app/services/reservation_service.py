@@ -8,6 +8,8 @@ The original 672-line file has been split into focused sub-services:
 - app/services/reservation/query_service.py (ReservationQueryService)
 - app/services/reservation/creation_service.py (ReservationCreationService)
 - app/services/reservation/cancellation_service.py (ReservationCancellationService)
+- app/services/reservation/batch_service.py (ReservationBatchService)
+- app/services/reservation/bulk_cancellation_service.py (ReservationBulkCancellationService)
 
 This file now serves as a backward compatibility layer, re-exporting the
 unified ReservationService class from the package.
@@ -22,7 +24,9 @@ from app.services.reservation import (
     ReservationHelpers,
     ReservationQueryService,
     ReservationCreationService,
-    ReservationCancellationService
+    ReservationCancellationService,
+    ReservationBatchService,
+    ReservationBulkCancellationService
 )
 
 # Export for backward compatibility
@@ -31,5 +35,7 @@ __all__ = [
     'ReservationHelpers',
     'ReservationQueryService',
     'ReservationCreationService',
-    'ReservationCancellationService'
+    'ReservationCancellationService',
+    'ReservationBatchService',
+    'ReservationBulkCancellationService'
 ]
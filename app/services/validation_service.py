@@ -66,8 +66,14 @@ class ValidationService:
             from app.services.reservation_service import ReservationService
             from app.utils.error_handling import handle_time_calculation_error, get_fallback_active_reservations_date_based
 
+            from app.services.booking_counter_service import BookingCounterService
+
             max_reservations = current_app.config.get('MAX_ACTIVE_RESERVATIONS', 2)
 
+            # The booking counter settles the common case without listing the sessions
+            if BookingCounterService.get_counts(member_id, berlin_time)['regular'] < max_reservations:
+                return True, None
+
             # Use the enhanced ReservationService to get active booking sessions
             # This uses time-based logic instead of date-only comparison
             active_booking_sessions = ReservationService.get_member_active_booking_sessions(
@@ -134,6 +140,13 @@ class ValidationService:
 
             from app.services.reservation_service import ReservationService
             from app.utils.error_handling import get_fallback_active_reservations_date_based
+            from app.services.booking_counter_service import BookingCounterService
+
+            max_short_notice = current_app.config.get('MAX_SHORT_NOTICE_BOOKINGS', 1)
+
+            # The booking counter settles the common case without listing the sessions
+            if BookingCounterService.get_counts(member_id, berlin_time)['short_notice'] < max_short_notice:
+                return True, None
 
             # Use the enhanced ReservationService to get active short notice bookings
             # This uses time-based logic instead of date-only comparison
@@ -144,7 +157,7 @@ class ValidationService:
 
             active_short_notice_count = len(active_short_notice_bookings)
 
-            if active_short_notice_count < 1:
+            if active_short_notice_count < max_short_notice:
                 return True, None
             return False, active_short_notice_bookings
 
@@ -172,7 +185,7 @@ class ValidationService:
 
                 fallback_count = len(fallback_short_notice)
                 logger.info(f"Fallback short notice validation successful: {fallback_count} active short notice bookings")
-                if fallback_count < 1:
+                if fallback_count < current_app.config.get('MAX_SHORT_NOTICE_BOOKINGS', 1):
                     return True, None
                 return False, fallback_short_notice
 
@@ -264,10 +277,87 @@ class ValidationService:
         return block is None
     
     @staticmethod
-    def validate_all_booking_constraints(court_id, date, start_time, member_id, is_short_notice=False, current_time=None, member=None, booked_by_id=None):
+    def get_booking_facts(court_id, date, start_time, member_id, current_time=None, store_counter=False):
+        """
+        Gather the database facts a booking attempt is validated against in one statement.
+
+        Uses the same time-based logic as the individual checks: sessions and
+        conflicting reservations count only while they haven't ended. Session
+        counts come from the member's booking counter; if it isn't current,
+        they are recomputed with one more query.
+
+        Args:
+            court_id: ID of the court
+            date: date object
+            start_time: time object
+            member_id: ID of the member the booking is for
+            current_time: Current datetime (defaults to Europe/Berlin now)
+            store_counter: Store recomputed counts (only while holding the booking lock)
+
+        Returns:
+            dict: regular_sessions and short_notice_sessions (active or suspended
+                  bookings for the member), conflict and blocked (bool)
+        """
+        from sqlalchemy import exists, select
+        from app.models import MemberBookingCounter
+        from app.services.booking_counter_service import BookingCounterService
+        from app.utils.query_helpers import build_active_reservation_time_filter
+
+        berlin_time = ensure_berlin_timezone(current_time)
+        time_filter = build_active_reservation_time_filter(berlin_time.date(), berlin_time.time(), Reservation)
+
+        def counter(column):
+            return select(column).where(MemberBookingCounter.member_id == member_id).scalar_subquery()
+
+        conflict = exists().where(
+            Reservation.court_id == court_id,
+            Reservation.date == date,
+            Reservation.start_time == start_time,
+            Reservation.status == 'active',
+            time_filter
+        )
+
+        blocked = exists().where(
+            Block.court_id == court_id,
+            Block.date == date,
+            Block.start_time <= start_time,
+            Block.end_time > start_time
+        )
+
+        row = db.session.execute(
+            select(
+                counter(MemberBookingCounter.regular_count).label('regular'),
+                counter(MemberBookingCounter.short_notice_count).label('short_notice'),
+                counter(MemberBookingCounter.valid_until).label('valid_until'),
+                counter(MemberBookingCounter.computed_at).label('computed_at'),
+                conflict.label('conflict'),
+                blocked.label('blocked')
+            )
+        ).one()
+
+        if BookingCounterService.is_current(row.computed_at, row.valid_until, berlin_time):
+            regular, short_notice = row.regular, row.short_notice
+        else:
+            regular, short_notice, valid_until = BookingCounterService.compute(member_id, berlin_time)
+            if store_counter:
+                BookingCounterService.store(member_id, regular, short_notice, valid_until, berlin_time)
+
+        return {
+            'regular_sessions': int(regular),
+            'short_notice_sessions': int(short_notice),
+            'conflict': bool(row.conflict),
+            'blocked': bool(row.blocked)
+        }
+
+    @staticmethod
+    def validate_all_booking_constraints(court_id, date, start_time, member_id, is_short_notice=False, current_time=None, member=None, booked_by_id=None, store_counter=False):
         """
         Validate all booking constraints.
 
+        Loads the members involved (unless pre-loaded) in one query and all
+        other facts in one statement via get_booking_facts(). The active
+        sessions for the limit error messages are only loaded when a limit is hit.
+
         Args:
             court_id: ID of the court
             date: date object
@@ -277,13 +367,13 @@ class ValidationService:
             current_time: Current datetime for testing (defaults to Europe/Berlin now)
             member: Optional pre-loaded Member object to avoid redundant query
             booked_by_id: ID of the member creating the booking (for personalized error messages)
+            store_counter: Store a recomputed booking counter (only while holding the booking lock)
 
         Returns:
             tuple: (bool, str, list|None) - (is_valid, error_message, active_sessions)
                    active_sessions is only populated when reservation limit is exceeded
         """
         try:
-            from datetime import datetime, timedelta
             from app.utils.error_handling import get_time_based_error_messages, log_error_with_context
             from app.models import Member
             from app.constants.messages import ErrorMessages
@@ -295,81 +385,69 @@ class ValidationService:
             berlin_time = ensure_berlin_timezone(current_time)
             log_timezone_operation("validate_all_booking_constraints", current_time, berlin_time)
 
-            # Validate member can reserve (membership type check)
-            # Use provided member object or fetch from database
-            if member is None:
-                member = Member.query.get(member_id)
-            if not member:
-                return False, ErrorMessages.MEMBER_NOT_FOUND, None
-
             # Determine if this is a self-booking (for correct German verb conjugation)
             is_self_booking = booked_by_id is not None and str(member_id) == str(booked_by_id)
+            books_for_other = bool(booked_by_id) and str(booked_by_id) != str(member_id)
 
-            if not member.can_reserve_courts():
-                return False, ErrorMessages.SUSTAINING_MEMBER_NO_ACCESS, None
-
-            # Check if the booking member (booked_by) is restricted due to unpaid fee
-            # This prevents members with overdue payments from making ANY reservations
-            if booked_by_id and str(booked_by_id) != str(member_id):
-                booked_by_member = Member.query.get(booked_by_id)
-                if booked_by_member and booked_by_member.is_payment_restricted():
-                    if booked_by_member.has_pending_payment_confirmation():
-                        return False, ErrorMessages.BOOKER_PAYMENT_CONFIRMATION_PENDING, None
-                    return False, ErrorMessages.BOOKER_PAYMENT_DEADLINE_PASSED, None
-
-            # Check if member (booked_for) is restricted due to unpaid fee past deadline
-            if member.is_payment_restricted():
-                # Use different message if member has pending confirmation
-                if member.has_pending_payment_confirmation():
-                    if is_self_booking:
-                        return False, ErrorMessages.PAYMENT_CONFIRMATION_PENDING_SELF, None
-                    return False, ErrorMessages.PAYMENT_CONFIRMATION_PENDING.format(name=member.name), None
-                if is_self_booking:
-                    return False, ErrorMessages.PAYMENT_DEADLINE_PASSED_SELF, None
-                return False, ErrorMessages.PAYMENT_DEADLINE_PASSED.format(name=member.name), None
+            # Load the booked-for member (unless provided) and the booking member together
+            member_ids = ([member_id] if member is None else []) + ([booked_by_id] if books_for_other else [])
+            members = {m.id: m for m in Member.query.filter(Member.id.in_(member_ids))} if member_ids else {}
+            if member is None:
+                member = members.get(member_id)
 
-            # Validate not in the past (with special handling for short notice bookings)
-            booking_datetime = datetime.combine(date, start_time)
+            # Membership and payment status of both members
+            booked_by_member = members.get(booked_by_id) if books_for_other else None
+            member_error = ValidationService._member_error(member, booked_by_member, is_self_booking)
+            if member_error:
+                return False, member_error, None
 
-            # Validate not in the past (with special handling for short notice bookings)
-            if is_short_notice:
-                # For short notice bookings, allow as long as the slot hasn't ended yet
-                # (booking end time = start time + 1 hour)
-                booking_end_datetime = datetime.combine(date, time(start_time.hour + 1, start_time.minute))
-                if berlin_time >= booking_end_datetime:
-                    return False, error_messages['BOOKING_PAST_ENDED'], None
-            else:
-                # For regular bookings, don't allow past bookings
-                if booking_datetime < berlin_time:
-                    return False, error_messages['BOOKING_PAST_REGULAR'], None
+            # Not in the past, on a bookable hour
+            time_error = ValidationService._slot_time_error(
+                date, start_time, is_short_notice, berlin_time, error_messages
+            )
+            if time_error:
+                return False, time_error, None
 
-            # Validate booking time
-            if not ValidationService.validate_booking_time(start_time):
-                return False, "Buchungen sind nur zu vollen Stunden zwischen 08:00 und 22:00 Uhr möglich", None
+            # Sessions, conflicts and blocks in one round trip
+            facts = ValidationService.get_booking_facts(
+                court_id, date, start_time, member_id, berlin_time, store_counter=store_counter
+            )
 
             # Validate member reservation limit (short notice bookings are exempt)
-            # Pass berlin_time for time-based validation
-            can_book, active_sessions = ValidationService.validate_member_reservation_limit(member_id, is_short_notice, berlin_time)
-            if not can_book:
-                if is_self_booking:
+            # The sessions are listed for the error message; the list has the final say
+            max_reservations = current_app.config.get('MAX_ACTIVE_RESERVATIONS', 2)
+            if not is_short_notice and facts['regular_sessions'] >= max_reservations:
+                from app.services.reservation_service import ReservationService
+                active_sessions = ReservationService.get_member_active_booking_sessions(
+                    member_id, include_short_notice=False, current_time=berlin_time
+                )
+                if len(active_sessions) < max_reservations:
+                    logger.warning(f"Booking counter of {member_id} was ahead of the reservations")
+                elif is_self_booking:
                     return False, ErrorMessages.RESERVATION_LIMIT_REGULAR_SELF, active_sessions
-                return False, ErrorMessages.RESERVATION_LIMIT_REGULAR.format(name=member.name), active_sessions
+                else:
+                    return False, ErrorMessages.RESERVATION_LIMIT_REGULAR.format(name=member.name), active_sessions
 
             # Validate short notice booking limit (only for short notice bookings)
-            # Pass berlin_time for time-based validation
-            if is_short_notice:
-                can_book_short, short_notice_sessions = ValidationService.validate_member_short_notice_limit(member_id, berlin_time)
-                if not can_book_short:
-                    if is_self_booking:
-                        return False, ErrorMessages.RESERVATION_LIMIT_SHORT_NOTICE_SELF, short_notice_sessions
+            max_short_notice = current_app.config.get('MAX_SHORT_NOTICE_BOOKINGS', 1)
+            if is_short_notice and facts['short_notice_sessions'] >= max_short_notice:
+                from app.services.reservation_service import ReservationService
+                short_notice_sessions = ReservationService.get_member_active_short_notice_bookings(
+                    member_id, current_time=berlin_time
+                )
+                if len(short_notice_sessions) < max_short_notice:
+                    logger.warning(f"Booking counter of {member_id} was ahead of the reservations")
+                elif is_self_booking:
+                    return False, ErrorMessages.RESERVATION_LIMIT_SHORT_NOTICE_SELF, short_notice_sessions
+                else:
                     return False, ErrorMessages.RESERVATION_LIMIT_SHORT_NOTICE.format(name=member.name), short_notice_sessions
 
             # Validate no conflict using time-based logic
-            if not ValidationService.validate_no_conflict_with_time_logic(court_id, date, start_time, berlin_time):
+            if facts['conflict']:
                 return False, "Dieser Platz ist bereits für diese Zeit gebucht", None
 
             # Validate not blocked
-            if not ValidationService.validate_not_blocked(court_id, date, start_time):
+            if facts['blocked']:
                 return False, "Dieser Platz ist für diese Zeit gesperrt", None
 
             return True, "", None
@@ -389,6 +467,173 @@ class ValidationService:
             # Try to provide a more specific error message
             error_messages = get_time_based_error_messages()
             return False, error_messages['TIME_CALCULATION_ERROR'], None
+
+    @staticmethod
+    def _member_error(member, booked_by_member, is_self_booking):
+        """
+        Apply the membership and payment rules to already-loaded members.
+
+        Args:
+            member: Member the booking is for (None if not found)
+            booked_by_member: Member booking for someone else, or None
+            is_self_booking: Whether the member books for themselves
+
+        Returns:
+            str|None: Error message, or None if both may book
+        """
+        from app.constants.messages import ErrorMessages
+
+        # Validate member can reserve (membership type check)
+        if not member:
+            return ErrorMessages.MEMBER_NOT_FOUND
+
+        if not member.can_reserve_courts():
+            return ErrorMessages.SUSTAINING_MEMBER_NO_ACCESS
+
+        # Check if the booking member (booked_by) is restricted due to unpaid fee
+        # This prevents members with overdue payments from making ANY reservations
+        if booked_by_member and booked_by_member.is_payment_restricted():
+            if booked_by_member.has_pending_payment_confirmation():
+                return ErrorMessages.BOOKER_PAYMENT_CONFIRMATION_PENDING
+            return ErrorMessages.BOOKER_PAYMENT_DEADLINE_PASSED
+
+        # Check if member (booked_for) is restricted due to unpaid fee past deadline
+        if member.is_payment_restricted():
+            # Use different message if member has pending confirmation
+            if member.has_pending_payment_confirmation():
+                if is_self_booking:
+                    return ErrorMessages.PAYMENT_CONFIRMATION_PENDING_SELF
+                return ErrorMessages.PAYMENT_CONFIRMATION_PENDING.format(name=member.name)
+            if is_self_booking:
+                return ErrorMessages.PAYMENT_DEADLINE_PASSED_SELF
+            return ErrorMessages.PAYMENT_DEADLINE_PASSED.format(name=member.name)
+
+        return None
+
+    @staticmethod
+    def _slot_time_error(date, start_time, is_short_notice, berlin_time, error_messages):
+        """
+        Apply the time rules (not in the past, full bookable hour) to a slot.
+
+        Args:
+            date: date object
+            start_time: time object
+            is_short_notice: Whether the booking would be short notice
+            berlin_time: Current naive Europe/Berlin datetime
+            error_messages: Messages from get_time_based_error_messages()
+
+        Returns:
+            str|None: Error message, or None if the slot may be booked now
+        """
+        from datetime import datetime
+
+        # Validate booking time first: the end of the slot only exists for bookable hours
+        if not ValidationService.validate_booking_time(start_time):
+            return "Buchungen sind nur zu vollen Stunden zwischen 08:00 und 22:00 Uhr möglich"
+
+        # Validate not in the past (with special handling for short notice bookings)
+        if is_short_notice:
+            # For short notice bookings, allow as long as the slot hasn't ended yet
+            # (booking end time = start time + 1 hour)
+            booking_end_datetime = datetime.combine(date, time(start_time.hour + 1, start_time.minute))
+            if berlin_time >= booking_end_datetime:
+                return error_messages['BOOKING_PAST_ENDED']
+        elif datetime.combine(date, start_time) < berlin_time:
+            # For regular bookings, don't allow past bookings
+            return error_messages['BOOKING_PAST_REGULAR']
+
+        return None
+
+    @staticmethod
+    def validate_booking_candidates(candidates, booked_by_id, current_time=None):
+        """
+        Validate many possible bookings without booking anything.
+
+        Applies the rules of validate_all_booking_constraints() to every
+        candidate, sharing one query each for the members, their active
+        sessions, the conflicting reservations and the blocks across the
+        batch. Candidates are checked independently of each other, as each
+        one stands for a booking the member might make next.
+
+        Args:
+            candidates: List of (court_id, date, start_time, booked_for_id) tuples
+            booked_by_id: ID of the member who would book
+            current_time: Current datetime for testing (defaults to Europe/Berlin now)
+
+        Returns:
+            list: (is_valid, error_message) per candidate, in input order
+        """
+        if not candidates:
+            return []
+
+        from app.models import Member
+        from app.constants.messages import ErrorMessages
+        from app.services.booking_counter_service import BookingCounterService
+        from app.services.reservation.helpers import ReservationHelpers
+        from app.utils.error_handling import get_time_based_error_messages
+        from app.utils.query_helpers import build_active_reservation_time_filter
+
+        error_messages = get_time_based_error_messages()
+        berlin_time = ensure_berlin_timezone(current_time)
+        log_timezone_operation("validate_booking_candidates", current_time, berlin_time)
+
+        member_ids = {candidate[3] for candidate in candidates}
+        court_ids = {candidate[0] for candidate in candidates}
+        dates = {candidate[1] for candidate in candidates}
+
+        members = {m.id: m for m in Member.query.filter(Member.id.in_(member_ids | {booked_by_id}))}
+        booked_by_member = members.get(booked_by_id)
+        sessions = BookingCounterService.compute_many(member_ids, berlin_time)
+
+        # Active reservations and blocks on the requested courts and dates
+        booked = {
+            (row.court_id, row.date, row.start_time)
+            for row in db.session.query(Reservation.court_id, Reservation.date, Reservation.start_time).filter(
+                Reservation.court_id.in_(court_ids),
+                Reservation.date.in_(dates),
+                Reservation.status == 'active',
+                build_active_reservation_time_filter(berlin_time.date(), berlin_time.time(), Reservation)
+            )
+        }
+        blocks = {}
+        for row in db.session.query(Block.court_id, Block.date, Block.start_time, Block.end_time).filter(
+            Block.court_id.in_(court_ids),
+            Block.date.in_(dates)
+        ):
+            blocks.setdefault((row.court_id, row.date), []).append((row.start_time, row.end_time))
+
+        max_reservations = current_app.config.get('MAX_ACTIVE_RESERVATIONS', 2)
+        max_short_notice = current_app.config.get('MAX_SHORT_NOTICE_BOOKINGS', 1)
+
+        results = []
+        for court_id, date, start_time, member_id in candidates:
+            member = members.get(member_id)
+            is_self_booking = str(member_id) == str(booked_by_id)
+            is_short_notice = ReservationHelpers.is_short_notice_booking(date, start_time, berlin_time)
+            regular, short_notice = sessions.get(member_id, (0, 0))
+
+            error = (
+                ValidationService._member_error(
+                    member, None if is_self_booking else booked_by_member, is_self_booking
+                )
+                or ValidationService._slot_time_error(date, start_time, is_short_notice, berlin_time, error_messages)
+            )
+            if error:
+                results.append((False, error))
+            elif not is_short_notice and regular >= max_reservations:
+                results.append((False, ErrorMessages.RESERVATION_LIMIT_REGULAR_SELF if is_self_booking
+                                else ErrorMessages.RESERVATION_LIMIT_REGULAR.format(name=member.name)))
+            elif is_short_notice and short_notice >= max_short_notice:
+                results.append((False, ErrorMessages.RESERVATION_LIMIT_SHORT_NOTICE_SELF if is_self_booking
+                                else ErrorMessages.RESERVATION_LIMIT_SHORT_NOTICE.format(name=member.name)))
+            elif (court_id, date, start_time) in booked:
+                results.append((False, "Dieser Platz ist bereits für diese Zeit gebucht"))
+            elif any(start <= start_time < end for start, end in blocks.get((court_id, date), ())):
+                results.append((False, "Dieser Platz ist für diese Zeit gesperrt"))
+            else:
+                results.append((True, ""))
+
+        return results
     
     @staticmethod
     def validate_cancellation_allowed(reservation_id, current_time=None):
@@ -405,7 +650,6 @@ class ValidationService:
             tuple: (bool, str) - (is_allowed, error_message)
         """
         try:
-            from datetime import datetime, timedelta
             from app.utils.error_handling import get_time_based_error_messages, log_error_with_context
             
             # Get updated error messages
@@ -419,24 +663,9 @@ class ValidationService:
             if not reservation:
                 return False, "Buchung nicht gefunden"
 
-            # Short notice bookings can NEVER be cancelled, even when suspended
-            if reservation.is_short_notice:
-                return False, error_messages['SHORT_NOTICE_NO_CANCEL']
-
-            # Suspended (non-short-notice) reservations can be cancelled at any time
-            if reservation.status == 'suspended':
-                return True, ""
-
-            reservation_datetime = datetime.combine(reservation.date, reservation.start_time)
-            time_until_start = reservation_datetime - berlin_time
-
-            # If reservation has already started
-            if time_until_start <= timedelta(0):
-                return False, error_messages['CANCELLATION_STARTED']
-
-            # If reservation starts in less than 15 minutes
-            if time_until_start < timedelta(minutes=15):
-                return False, error_messages['CANCELLATION_TOO_LATE']
+            violation = ValidationService.get_cancellation_violation(reservation, berlin_time)
+            if violation:
+                return False, error_messages[violation]
 
             return True, ""
 
@@ -452,6 +681,44 @@ class ValidationService:
             error_messages = get_time_based_error_messages()
             return False, error_messages['TIME_CALCULATION_ERROR']
 
+    @staticmethod
+    def get_cancellation_violation(reservation, berlin_time):
+        """
+        Apply the time-based cancellation rules to an already-loaded reservation.
+
+        Does not touch the database, so it can be evaluated against cached
+        reservation data as well as Reservation objects.
+
+        Args:
+            reservation: Object with date, start_time, status and is_short_notice attributes
+            berlin_time: Current naive Europe/Berlin datetime
+
+        Returns:
+            str|None: Error message key blocking the cancellation, or None if allowed
+        """
+        from datetime import datetime, timedelta
+
+        # Short notice bookings can NEVER be cancelled, even when suspended
+        if reservation.is_short_notice:
+            return 'SHORT_NOTICE_NO_CANCEL'
+
+        # Suspended (non-short-notice) reservations can be cancelled at any time
+        if reservation.status == 'suspended':
+            return None
+
+        reservation_datetime = datetime.combine(reservation.date, reservation.start_time)
+        time_until_start = reservation_datetime - berlin_time
+
+        # If reservation has already started
+        if time_until_start <= timedelta(0):
+            return 'CANCELLATION_STARTED'
+
+        # If reservation starts in less than 15 minutes
+        if time_until_start < timedelta(minutes=15):
+            return 'CANCELLATION_TOO_LATE'
+
+        return None
+
     @staticmethod
     def get_cancellation_eligibility(reservation, user_id, current_time=None):
         """
@@ -466,12 +733,34 @@ class ValidationService:
         Returns:
             bool: True if user can cancel, False otherwise
         """
-        # Ownership check - user must be booked_for or booked_by
-        if user_id != reservation.booked_for_id and user_id != reservation.booked_by_id:
-            return False
+        return ValidationService.get_cancellation_eligibility_batch(
+            [reservation], user_id, current_time
+        )[reservation.id]
 
-        # Delegate to existing validation for time-based rules
-        can_cancel, _ = ValidationService.validate_cancellation_allowed(
-            reservation.id, current_time
-        )
-        return can_cancel
+    @staticmethod
+    def get_cancellation_eligibility_batch(reservations, user_id, current_time=None):
+        """
+        Check which of many already-loaded reservations a user can cancel.
+
+        Evaluates ownership and the time-based rules in one pass against a
+        single current time, without reloading the reservations.
+
+        Args:
+            reservations: Reservation objects (or rows with the same fields)
+            user_id: ID of the user attempting to cancel
+            current_time: Current datetime (defaults to Europe/Berlin now)
+
+        Returns:
+            dict: Reservation ID -> True if the user can cancel it
+        """
+        berlin_time = ensure_berlin_timezone(current_time)
+
+        eligibility = {}
+        for reservation in reservations:
+            if user_id != reservation.booked_for_id and user_id != reservation.booked_by_id:
+                eligibility[reservation.id] = False
+            else:
+                eligibility[reservation.id] = (
+                    ValidationService.get_cancellation_violation(reservation, berlin_time) is None
+                )
+        return eligibility
@@ -0,0 +1,235 @@
+"""Waitlist service for taken court slots.
+
+Members join the waitlist of a slot that is booked or blocked. Write paths
+that free slots (cancellations, block removals) add them with
+enqueue_freed_slots() to their transaction as an outbox event, whose handler
+runs process_freed_slots() outside the request: the oldest waiting member
+who may book a freed slot then gets the reservation, with the usual
+notifications.
+"""
+import logging
+from datetime import datetime, time
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import Member, WaitlistEntry
+from app.services.validation_service import ValidationService
+from app.services.reservation.helpers import ReservationHelpers
+from app.utils.timezone_utils import ensure_berlin_timezone
+from app.constants.messages import ErrorMessages
+
+logger = logging.getLogger(__name__)
+
+
+class WaitlistService:
+    """Service for managing waitlists and promoting waiting members."""
+
+    @staticmethod
+    def join(court_id, date, start_time, member_id, current_time=None):
+        """
+        Put a member on the waitlist of a taken slot.
+
+        Args:
+            court_id: ID of the court
+            date: Slot date
+            start_time: Slot start time
+            member_id: ID of the waiting member
+            current_time: Current datetime for testing (defaults to now)
+
+        Returns:
+            tuple: (WaitlistEntry object or None, error message or None)
+        """
+        berlin_time = ensure_berlin_timezone(current_time)
+
+        member = db.session.get(Member, member_id)
+        if not member:
+            return None, ErrorMessages.MEMBER_NOT_FOUND
+        if not member.can_reserve_courts():
+            return None, ErrorMessages.SUSTAINING_MEMBER_NO_ACCESS
+
+        if datetime.combine(date, start_time) < berlin_time:
+            return None, ErrorMessages.BOOKING_PAST_REGULAR
+        if not ValidationService.validate_booking_time(start_time):
+            return None, "Buchungen sind nur zu vollen Stunden zwischen 08:00 und 22:00 Uhr möglich"
+
+        facts = ValidationService.get_booking_facts(court_id, date, start_time, member_id, berlin_time)
+        if not facts['conflict'] and not facts['blocked']:
+            return None, ErrorMessages.WAITLIST_SLOT_FREE
+
+        waiting = WaitlistEntry.query.filter_by(member_id=member_id, status='waiting').all()
+        if any(e.court_id == court_id and e.date == date and e.start_time == start_time for e in waiting):
+            return None, ErrorMessages.WAITLIST_ALREADY_WAITING
+        limit = current_app.config.get('WAITLIST_MAX_ENTRIES_PER_MEMBER', 5)
+        upcoming = [e for e in waiting if datetime.combine(e.date, e.start_time) >= berlin_time]
+        if len(upcoming) >= limit:
+            return None, ErrorMessages.WAITLIST_LIMIT.format(limit=limit)
+
+        entry = WaitlistEntry(court_id=court_id, date=date, start_time=start_time, member_id=member_id)
+        try:
+            db.session.add(entry)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return None, f"Fehler beim Eintragen in die Warteliste: {str(e)}"
+
+        logger.info(f"Member {member_id} joined waitlist: court={court_id}, date={date}, start_time={start_time}")
+        return entry, None
+
+    @staticmethod
+    def leave(entry_id, member_id):
+        """
+        Remove a member from a waitlist.
+
+        Args:
+            entry_id: ID of the waitlist entry
+            member_id: ID of the member (must own the entry)
+
+        Returns:
+            tuple: (success boolean, error message or None)
+        """
+        entry = WaitlistEntry.query.filter_by(id=entry_id, member_id=member_id, status='waiting').first()
+        if not entry:
+            return False, ErrorMessages.WAITLIST_ENTRY_NOT_FOUND
+
+        entry.status = 'cancelled'
+        try:
+            db.session.commit()
+            return True, None
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return False, f"Fehler beim Verlassen der Warteliste: {str(e)}"
+
+    @staticmethod
+    def get_member_entries(member_id, current_time=None):
+        """
+        Get a member's upcoming waitlist entries with their queue positions.
+
+        Args:
+            member_id: ID of the member
+            current_time: Current datetime for testing (defaults to now)
+
+        Returns:
+            list: (WaitlistEntry, position) tuples ordered by slot; position 1 is next in line
+        """
+        berlin_time = ensure_berlin_timezone(current_time)
+        entries = [
+            entry for entry in WaitlistEntry.query.options(joinedload(WaitlistEntry.court)).filter(
+                WaitlistEntry.member_id == member_id,
+                WaitlistEntry.status == 'waiting',
+                WaitlistEntry.date >= berlin_time.date()
+            ).order_by(WaitlistEntry.date, WaitlistEntry.start_time, WaitlistEntry.court_id)
+            if datetime.combine(entry.date, entry.start_time) >= berlin_time
+        ]
+        if not entries:
+            return []
+
+        # Everyone waiting on these dates, to count who is ahead of the member
+        ahead = db.session.query(
+            WaitlistEntry.id, WaitlistEntry.court_id, WaitlistEntry.date, WaitlistEntry.start_time
+        ).filter(
+            WaitlistEntry.status == 'waiting',
+            WaitlistEntry.date.in_({entry.date for entry in entries}),
+            WaitlistEntry.court_id.in_({entry.court_id for entry in entries})
+        ).all()
+
+        return [
+            (entry, 1 + sum(
+                1 for other in ahead
+                if (other.court_id, other.date, other.start_time) == (entry.court_id, entry.date, entry.start_time)
+                and other.id < entry.id
+            ))
+            for entry in entries
+        ]
+
+    @staticmethod
+    def enqueue_freed_slots(slots):
+        """
+        Add the promotion of waiting members for freed slots to the current transaction.
+
+        Args:
+            slots: Iterable of (date, court_id, hour) tuples the write frees
+        """
+        from app.services.outbox_service import OutboxService
+
+        slots = sorted(slot for slot in slots if slot[0] is not None)
+        if slots:
+            OutboxService.enqueue('waitlist_freed_slots', {
+                'slots': [[slot_date.isoformat(), court_id, hour] for slot_date, court_id, hour in slots]
+            })
+
+    @staticmethod
+    def process_freed_slots(slots, current_time=None):
+        """
+        Book freed slots for the first eligible waiting members.
+
+        Runs for committed writes that may have freed slots. The waiting
+        entries of all slots are loaded in one query, so slots nobody waits
+        for cost nothing more. For each remaining slot the waiting members are
+        tried in order through the regular booking path (lock, validation,
+        notifications), which marks the entry promoted in the booking's own
+        transaction; members who may not book it (e.g. at their limit) keep
+        waiting. Slots that would be short notice bookings are left to
+        whoever books first. Other errors propagate, so the outbox retries
+        the event; promotions made until then stay committed.
+
+        Args:
+            slots: Iterable of (date, court_id, hour) tuples
+            current_time: Current datetime for testing (defaults to now)
+
+        Returns:
+            list: Created Reservation objects
+        """
+        from app.services.reservation_service import ReservationService
+
+        berlin_time = ensure_berlin_timezone(current_time)
+        slots = {slot for slot in slots if slot[0] is not None and slot[0] >= berlin_time.date()}
+        if not slots:
+            return []
+
+        promoted = []
+        entries = db.session.query(
+            WaitlistEntry.id, WaitlistEntry.member_id, WaitlistEntry.court_id,
+            WaitlistEntry.date, WaitlistEntry.start_time
+        ).filter(
+            WaitlistEntry.status == 'waiting',
+            WaitlistEntry.date.in_({slot[0] for slot in slots}),
+            WaitlistEntry.court_id.in_({slot[1] for slot in slots})
+        ).order_by(WaitlistEntry.id).all()
+
+        queues = {}
+        for entry in entries:
+            slot = (entry.date, entry.court_id, entry.start_time.hour)
+            if slot in slots:
+                queues.setdefault(slot, []).append((entry.id, entry.member_id))
+
+        for (slot_date, court_id, hour), queue in sorted(queues.items()):
+            start_time = time(hour, 0)
+            if datetime.combine(slot_date, start_time) < berlin_time:
+                continue
+            if ReservationHelpers.is_short_notice_booking(slot_date, start_time, berlin_time):
+                continue
+            facts = ValidationService.get_booking_facts(
+                court_id, slot_date, start_time, queue[0][1], berlin_time
+            )
+            if facts['conflict'] or facts['blocked']:
+                continue
+
+            for entry_id, member_id in queue:
+                reservation, error, _ = ReservationService.create_reservation(
+                    court_id, slot_date, start_time, member_id, member_id, current_time,
+                    waitlist_entry_id=entry_id
+                )
+                if reservation is None:
+                    logger.info(f"Waitlist entry {entry_id} not promoted: {error}")
+                    if error == ErrorMessages.RESERVATION_ALREADY_BOOKED:
+                        break
+                    continue
+
+                promoted.append(reservation)
+                logger.info(f"Waitlist entry {entry_id} promoted to reservation {reservation.id}")
+                break
+
+        return promoted
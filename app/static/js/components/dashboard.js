@@ -78,12 +78,20 @@ export function dashboard() {
         },
 
         // Methods
+        availabilityUrl() {
+            // Anonymous viewers use the publicly cacheable endpoint
+            const path = this.isAuthenticated
+                ? '/api/courts/availability'
+                : '/api/courts/availability/public';
+            return `${path}?date=${this.selectedDate}`;
+        },
+
         async loadAvailability() {
             this.loading = true;
             this.error = null;
 
             try {
-                const response = await fetch(`/api/courts/availability?date=${this.selectedDate}`);
+                const response = await fetch(this.availabilityUrl());
 
                 if (!response.ok) {
                     throw new Error(`HTTP error! status: ${response.status}`);
@@ -300,7 +308,7 @@ export function dashboard() {
         async refreshAvailability() {
             // Refresh availability without showing loading state (prevents table flicker)
             try {
-                const response = await fetch(`/api/courts/availability?date=${this.selectedDate}`);
+                const response = await fetch(this.availabilityUrl());
                 if (!response.ok) {
                     throw new Error(`HTTP error! status: ${response.status}`);
                 }
@@ -88,7 +88,12 @@ class AvailabilityService {
      * @returns {Promise<Object>}
      */
     async _fetchSingle(dateStr) {
-        const response = await fetch(`${this.baseUrl}?date=${dateStr}`);
+        // Anonymous viewers use the publicly cacheable endpoint
+        const url =
+            window.isAuthenticated === false
+                ? `${this.baseUrl}/public?date=${dateStr}`
+                : `${this.baseUrl}?date=${dateStr}`;
+        const response = await fetch(url);
         if (!response.ok) {
             throw new Error(`Failed to fetch availability: ${response.status}`);
         }
@@ -0,0 +1,225 @@
+"""Bitset slot-occupancy index for a single date.
+
+Each court gets one integer bitmask per state, with bit ``h`` set when the
+slot starting at hour ``h`` is in that state:
+
+- reserved: an active reservation starts at the hour
+- blocked: a regular block covers the hour
+- temp_blocked: a temporary block covers the hour
+- suspended: a reservation suspended by a temporary block starts at the hour
+
+Blocks set their whole hour range with one mask operation, so building the
+index is a single pass over the day's reservations and blocks. Free-slot
+queries are bit operations over all courts at once. The objects behind each
+state are kept per court for the (few) occupied slots that need details.
+"""
+from collections import namedtuple
+
+# Hours covered by the court grid (slots 08:00-09:00 ... 21:00-22:00)
+GRID_START_HOUR = 8
+GRID_END_HOUR = 22
+
+# Per-court state masks
+CourtMasks = namedtuple('CourtMasks', ['reserved', 'blocked', 'temp_blocked', 'suspended'])
+
+
+def hour_range_mask(start_hour, end_hour):
+    """Mask with the bits for hours start_hour..end_hour-1 set."""
+    if end_hour <= start_hour:
+        return 0
+    return (1 << end_hour) - (1 << start_hour)
+
+
+def iter_hours(mask):
+    """Yield the hours set in a mask, in ascending order."""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+GRID_MASK = hour_range_mask(GRID_START_HOUR, GRID_END_HOUR)
+
+
+class _CourtOccupancy:
+    """Mutable masks and slot objects of one court."""
+
+    __slots__ = ('reserved', 'blocked', 'temp_blocked', 'suspended',
+                 'reservations', 'suspended_reservations', 'blocks')
+
+    def __init__(self):
+        self.reserved = 0
+        self.blocked = 0
+        self.temp_blocked = 0
+        self.suspended = 0
+        self.reservations = {}            # hour -> Reservation
+        self.suspended_reservations = {}  # hour -> Reservation
+        self.blocks = []                  # Blocks in insertion order
+
+
+class DayOccupancy:
+    """Occupancy of all courts on one date."""
+
+    def __init__(self, query_date, court_ids=()):
+        """
+        Args:
+            query_date: Date the index describes
+            court_ids: Courts to include even if they have no occupied slots
+        """
+        self.date = query_date
+        self._courts = {court_id: _CourtOccupancy() for court_id in court_ids}
+
+    @classmethod
+    def build(cls, query_date, court_ids, reservations=(), blocks=(), suspended_reservations=()):
+        """
+        Build the index in one pass.
+
+        Args:
+            query_date: Date the index describes
+            court_ids: IDs of all courts
+            reservations: Active reservations to index
+            blocks: Blocks of the date; order decides which block a slot shows
+            suspended_reservations: Reservations suspended by temporary blocks
+
+        Returns:
+            DayOccupancy
+        """
+        occupancy = cls(query_date, court_ids)
+        for reservation in reservations:
+            occupancy.add_reservation(reservation)
+        for block in blocks:
+            occupancy.add_block(block)
+        for reservation in suspended_reservations:
+            occupancy.add_suspended_reservation(reservation)
+        return occupancy
+
+    def _court(self, court_id):
+        court = self._courts.get(court_id)
+        if court is None:
+            court = self._courts[court_id] = _CourtOccupancy()
+        return court
+
+    def add_reservation(self, reservation):
+        """Index an active reservation (the first one per slot wins)."""
+        court = self._court(reservation.court_id)
+        hour = reservation.start_time.hour
+        court.reserved |= 1 << hour
+        court.reservations.setdefault(hour, reservation)
+
+    def add_suspended_reservation(self, reservation):
+        """Index a reservation suspended by a temporary block."""
+        court = self._court(reservation.court_id)
+        hour = reservation.start_time.hour
+        court.suspended |= 1 << hour
+        court.suspended_reservations.setdefault(hour, reservation)
+
+    def add_block(self, block):
+        """Index a block over its whole hour range."""
+        court = self._court(block.court_id)
+        mask = hour_range_mask(block.start_time.hour, block.end_time.hour)
+        if block.is_temporary_block:
+            court.temp_blocked |= mask
+        else:
+            court.blocked |= mask
+        court.blocks.append(block)
+
+    # ----- Mask queries -----
+
+    @property
+    def court_ids(self):
+        return list(self._courts)
+
+    def masks(self, court_id):
+        """CourtMasks of a court (all zero for unknown courts)."""
+        court = self._courts.get(court_id)
+        if court is None:
+            return CourtMasks(0, 0, 0, 0)
+        return CourtMasks(court.reserved, court.blocked, court.temp_blocked, court.suspended)
+
+    def occupied_mask(self, court_id, grid_mask=GRID_MASK):
+        """Slots of a court that are reserved or blocked."""
+        masks = self.masks(court_id)
+        return (masks.reserved | masks.blocked | masks.temp_blocked) & grid_mask
+
+    def free_mask(self, court_id, grid_mask=GRID_MASK):
+        """Slots of a court that are neither reserved nor blocked."""
+        return grid_mask & ~self.occupied_mask(court_id, grid_mask)
+
+    def free_masks(self, grid_mask=GRID_MASK):
+        """Dict court_id -> free mask for all courts."""
+        return {court_id: self.free_mask(court_id, grid_mask) for court_id in self._courts}
+
+    def free_slots(self, court_id, grid_mask=GRID_MASK):
+        """Free hours of a court, ascending."""
+        return list(iter_hours(self.free_mask(court_id, grid_mask)))
+
+    def first_free_slot(self, court_id=None, from_hour=0, grid_mask=GRID_MASK):
+        """
+        Earliest free slot at or after from_hour.
+
+        Args:
+            court_id: Court to search, or None to search all courts
+            from_hour: Earliest hour to consider
+            grid_mask: Hours to consider
+
+        Returns:
+            For one court: hour or None.
+            For all courts: (hour, court_id) of the earliest free slot
+            (lowest court ID on ties), or None.
+        """
+        grid_mask &= ~((1 << from_hour) - 1)
+        if court_id is not None:
+            free = self.free_mask(court_id, grid_mask)
+            return (free & -free).bit_length() - 1 if free else None
+
+        best = None
+        for candidate_id, free in self.free_masks(grid_mask).items():
+            if not free:
+                continue
+            hour = (free & -free).bit_length() - 1
+            if best is None or (hour, candidate_id) < best:
+                best = (hour, candidate_id)
+        return best
+
+    # ----- Slot objects -----
+
+    def reservation_at(self, court_id, hour):
+        """Active reservation starting at the slot, or None."""
+        court = self._courts.get(court_id)
+        return court.reservations.get(hour) if court else None
+
+    def suspended_reservation_at(self, court_id, hour):
+        """Suspended reservation starting at the slot, or None."""
+        court = self._courts.get(court_id)
+        return court.suspended_reservations.get(hour) if court else None
+
+    def blocks_at(self, court_id, hour):
+        """
+        Blocks covering the slot.
+
+        Returns:
+            tuple: (first temporary block or None, first regular block or None)
+        """
+        court = self._courts.get(court_id)
+        bit = 1 << hour
+        if court is None or not (court.blocked | court.temp_blocked) & bit:
+            return None, None
+
+        temp_block = regular_block = None
+        for block in court.blocks:
+            if block.start_time.hour <= hour < block.end_time.hour:
+                if block.is_temporary_block:
+                    temp_block = temp_block or block
+                else:
+                    regular_block = regular_block or block
+        return temp_block, regular_block
+
+    def first_block_at(self, court_id, hour):
+        """First indexed block covering the slot, regardless of type, or None."""
+        court = self._courts.get(court_id)
+        if court is None or not (court.blocked | court.temp_blocked) & (1 << hour):
+            return None
+        return next(
+            (block for block in court.blocks if block.start_time.hour <= hour < block.end_time.hour),
+            None
+        )
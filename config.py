@@ -78,6 +78,17 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or 'noreply@tennisclub.de'
+    # Mail worker pool: threads sending queued emails, each reusing its SMTP session
+    MAIL_WORKERS = 2
+    MAIL_QUEUE_SIZE = 1000
+    # How long a caller waits for room in a full queue before the email is dropped
+    MAIL_ENQUEUE_TIMEOUT_SECONDS = 5
+    # A session is closed after this many messages or this long without one
+    MAIL_MESSAGES_PER_CONNECTION = 50
+    MAIL_IDLE_SECONDS = 30
+    # Attempts per email; retries wait MAIL_RETRY_SECONDS, doubling each time
+    MAIL_MAX_ATTEMPTS = 3
+    MAIL_RETRY_SECONDS = 2
 
     # Development email redirect - all emails in dev mode go to this address
     DEV_EMAIL_RECIPIENT = os.environ.get('DEV_EMAIL_RECIPIENT')
@@ -92,6 +103,15 @@ class Config:
     APNS_TEAM_ID = os.environ.get('APNS_TEAM_ID')  # Team ID from portal
     APNS_KEY_PATH = os.environ.get('APNS_KEY_PATH')  # Path to .p8 private key file
     APNS_BUNDLE_ID = os.environ.get('APNS_BUNDLE_ID', 'com.tcz.tennisapp')
+    # Concurrent sends (HTTP/2 streams) over the one APNs connection per process
+    PUSH_WORKERS = 4
+    # Pushes waiting to be sent; when full, callers wait up to PUSH_ENQUEUE_TIMEOUT_SECONDS
+    # before the push is dropped
+    PUSH_QUEUE_SIZE = 1000
+    PUSH_ENQUEUE_TIMEOUT_SECONDS = 2
+    # Delivery results (last use, gone tokens) written per transaction; pending
+    # results are also written whenever the push queue runs empty
+    PUSH_RESULT_BATCH_SIZE = 100
 
     # Application settings
     COURTS_COUNT = 6
@@ -99,6 +119,64 @@ class Config:
     BOOKING_END_HOUR = 22  # Last slot starts at 21:00, ends at 22:00
     BOOKING_DURATION_HOURS = 1
     MAX_ACTIVE_RESERVATIONS = 2
+    MAX_SHORT_NOTICE_BOOKINGS = 1
+    # How long a process may show a member's cached booking counts (reservation status)
+    BOOKING_COUNTS_CACHE_SECONDS = 30
+    # Lock the court and member while a booking is validated and inserted, so
+    # concurrent requests (e.g. when new slots are released) can't over-book
+    BOOKING_CONTENTION_SAFE = os.environ.get('BOOKING_CONTENTION_SAFE', 'true').lower() in ['true', 'on', '1']
+    # Most slots one batch request (POST /api/reservations/batch) may book, repetitions included
+    BOOKING_BATCH_MAX_SLOTS = 20
+    # Most candidates one pre-validation request (POST /api/reservations/check) may contain
+    BOOKING_CHECK_MAX_CANDIDATES = 100
+    # Slots a member may be waiting for at the same time
+    WAITLIST_MAX_ENTRIES_PER_MEMBER = 5
+    # Longest date range one administrative bulk cancellation may cover
+    BULK_CANCEL_MAX_DAYS = 31
+
+    # Transactional outbox for post-commit side effects (emails, pushes, audit log).
+    # The worker thread drains it after each commit and every POLL_SECONDS (for
+    # retries); failed events are retried after RETRY_SECONDS, doubling each time,
+    # and a claimed event whose worker died is picked up again after CLAIM_SECONDS
+    OUTBOX_WORKER_ENABLED = os.environ.get('OUTBOX_WORKER_ENABLED', 'true').lower() in ['true', 'on', '1']
+    OUTBOX_POLL_SECONDS = 10
+    OUTBOX_BATCH_SIZE = 50
+    OUTBOX_MAX_ATTEMPTS = 5
+    OUTBOX_RETRY_SECONDS = 30
+    OUTBOX_CLAIM_SECONDS = 300
+    OUTBOX_RETENTION_DAYS = 7
+    # Block changes to a member's reservations within this many seconds of the first
+    # are sent as one digest email and push notification
+    NOTIFICATION_DIGEST_SECONDS = 60
+
+    # Successful responses to requests with an Idempotency-Key header are replayed
+    # to retries for TTL_SECONDS (stored in the database, shared by all processes)
+    IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+    # Keys of requests still running are held this long (PythonAnywhere ends requests
+    # after 5 minutes), so a key whose request died can be retried soon
+    IDEMPOTENCY_LEASE_SECONDS = 6 * 60
+
+    # Availability snapshot cache (per date, invalidated by reservation/block writes)
+    # The TTL bounds staleness across worker processes, which don't share invalidations
+    AVAILABILITY_CACHE_ENABLED = os.environ.get('AVAILABILITY_CACHE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    AVAILABILITY_CACHE_TTL_SECONDS = int(os.environ.get('AVAILABILITY_CACHE_TTL_SECONDS') or 30)
+    # How long browsers and shared caches may reuse the public (anonymous) availability
+    AVAILABILITY_PUBLIC_MAX_AGE_SECONDS = int(os.environ.get('AVAILABILITY_PUBLIC_MAX_AGE_SECONDS') or 30)
+
+    # Availability event stream (SSE); connections are closed after MAX_SECONDS
+    # and clients resume from their last event ID
+    AVAILABILITY_STREAM_BUFFER_SIZE = 1000
+    AVAILABILITY_STREAM_HEARTBEAT_SECONDS = 15
+    AVAILABILITY_STREAM_MAX_SECONDS = int(os.environ.get('AVAILABILITY_STREAM_MAX_SECONDS') or 300)
+    # Every open stream holds a worker thread, which needs threaded or async workers
+    # (e.g. gunicorn --worker-class gthread); the caps keep streams from taking them all
+    AVAILABILITY_STREAM_MAX_CONNECTIONS = int(os.environ.get('AVAILABILITY_STREAM_MAX_CONNECTIONS') or 50)
+    AVAILABILITY_STREAM_MAX_PER_CLIENT = 3
+
+    # Availability changes feed (?since=cursor): log entries are kept for RETENTION_DAYS;
+    # entries younger than SETTLE_SECONDS are held back so concurrent commits can't be skipped
+    AVAILABILITY_CHANGES_RETENTION_DAYS = 30
+    AVAILABILITY_CHANGES_SETTLE_SECONDS = 2
 
     # Profile picture settings
     PROFILE_PICTURE_UPLOAD_FOLDER = os.path.join(
@@ -159,6 +237,20 @@ class TestingConfig(Config):
     BOOKING_START_HOUR = 6
     BOOKING_END_HOUR = 22  # Last slot starts at 21:00, ends at 22:00
 
+    # Serve availability changes immediately
+    AVAILABILITY_CHANGES_SETTLE_SECONDS = 0
+
+    # Build availability from the database on every request, unless a test
+    # enables the snapshot cache (see the availability_cache fixture)
+    AVAILABILITY_CACHE_ENABLED = False
+
+    # Deliver outbox events in the request that wrote them (in-memory databases
+    # aren't shared with a worker thread)
+    OUTBOX_WORKER_ENABLED = False
+
+    # Send notification digests on the next dispatch
+    NOTIFICATION_DIGEST_SECONDS = 0
+
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,45 @@
+"""Add idempotency key table
+
+Revision ID: a9b0c1d2e3f4
+Revises: f8a9b0c1d2e3
+Create Date: 2026-03-09 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9b0c1d2e3f4'
+down_revision = 'f8a9b0c1d2e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('idempotency_key',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('member_id', sa.String(length=36), nullable=False),
+        sa.Column('method', sa.String(length=10), nullable=False),
+        sa.Column('path', sa.String(length=255), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('body', sa.LargeBinary(), nullable=True),
+        sa.Column('mimetype', sa.String(length=100), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['member_id'], ['member.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('idempotency_key', schema=None) as batch_op:
+        batch_op.create_index('uq_idempotency_key_scope', ['member_id', 'method', 'path', 'key'], unique=True)
+        batch_op.create_index('idx_idempotency_key_expires', ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('idempotency_key', schema=None) as batch_op:
+        batch_op.drop_index('idx_idempotency_key_expires')
+        batch_op.drop_index('uq_idempotency_key_scope')
+
+    op.drop_table('idempotency_key')
@@ -0,0 +1,37 @@
+"""Add availability change log table
+
+Revision ID: b3c4d5e6f7a8
+Revises: f7a8b9c0d1e2
+Create Date: 2026-02-09 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3c4d5e6f7a8'
+down_revision = 'f7a8b9c0d1e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('availability_change',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('court_id', sa.Integer(), nullable=False),
+        sa.Column('hour', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['court_id'], ['court.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('availability_change', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_availability_change_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('availability_change', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_availability_change_created_at'))
+
+    op.drop_table('availability_change')
@@ -0,0 +1,45 @@
+"""Add waitlist entry table
+
+Revision ID: c4d5e6f7a8b9
+Revises: b3c4d5e6f7a8
+Create Date: 2026-02-10 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d5e6f7a8b9'
+down_revision = 'b3c4d5e6f7a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('waitlist_entry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('court_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('start_time', sa.Time(), nullable=False),
+        sa.Column('member_id', sa.String(length=36), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('reservation_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('promoted_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['court_id'], ['court.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['member_id'], ['member.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['reservation_id'], ['reservation.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('waitlist_entry', schema=None) as batch_op:
+        batch_op.create_index('idx_waitlist_slot', ['date', 'court_id', 'start_time', 'status'], unique=False)
+        batch_op.create_index('idx_waitlist_member', ['member_id', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('waitlist_entry', schema=None) as batch_op:
+        batch_op.drop_index('idx_waitlist_member')
+        batch_op.drop_index('idx_waitlist_slot')
+
+    op.drop_table('waitlist_entry')
@@ -0,0 +1,33 @@
+"""Add member booking counter table
+
+Revision ID: d6e7f8a9b0c1
+Revises: c4d5e6f7a8b9
+Create Date: 2026-02-11 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6e7f8a9b0c1'
+down_revision = 'c4d5e6f7a8b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows are created on demand (the first booking attempt recomputes them)
+    op.create_table('member_booking_counter',
+        sa.Column('member_id', sa.String(length=36), nullable=False),
+        sa.Column('regular_count', sa.Integer(), nullable=False),
+        sa.Column('short_notice_count', sa.Integer(), nullable=False),
+        sa.Column('valid_until', sa.DateTime(), nullable=True),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['member_id'], ['member.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('member_id')
+    )
+
+
+def downgrade():
+    op.drop_table('member_booking_counter')
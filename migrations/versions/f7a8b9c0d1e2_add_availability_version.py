@@ -0,0 +1,29 @@
+"""Add availability version table
+
+Revision ID: f7a8b9c0d1e2
+Revises: 328dba4efb56
+Create Date: 2026-02-02 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7a8b9c0d1e2'
+down_revision = '328dba4efb56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('availability_version',
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('date')
+    )
+
+
+def downgrade():
+    op.drop_table('availability_version')
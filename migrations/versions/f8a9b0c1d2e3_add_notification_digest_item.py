@@ -0,0 +1,43 @@
+"""Add notification digest item table
+
+Revision ID: f8a9b0c1d2e3
+Revises: e7f8a9b0c1d2
+Create Date: 2026-03-02 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8a9b0c1d2e3'
+down_revision = 'e7f8a9b0c1d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_digest_item',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('member_id', sa.String(length=36), nullable=False),
+        sa.Column('reservation_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('reason', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['outbox_event.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['member_id'], ['member.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['reservation_id'], ['reservation.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('notification_digest_item', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_notification_digest_item_event_id'), ['event_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_notification_digest_item_member_id'), ['member_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notification_digest_item', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_notification_digest_item_member_id'))
+        batch_op.drop_index(batch_op.f('ix_notification_digest_item_event_id'))
+
+    op.drop_table('notification_digest_item')
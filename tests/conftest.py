@@ -10,7 +10,11 @@ Example usage in tests:
     admin = MemberFactory(admin=True)           # Admin user
     member = MemberFactory(email='custom@x.com') # Override fields
 """
+from contextlib import contextmanager
+
 import pytest
+from sqlalchemy import event
+
 from app import create_app, db
 from app.models import Member, Court, BlockReason
 from flask_mailman import Mail
@@ -64,6 +68,13 @@ def app():
         db.drop_all()
 
 
+@pytest.fixture
+def availability_cache(app):
+    """Enable the availability snapshot cache (off in TestingConfig)."""
+    app.config['AVAILABILITY_CACHE_ENABLED'] = True
+    return app
+
+
 @pytest.fixture
 def client(app):
     """Create test client."""
@@ -155,3 +166,31 @@ def mail(app):
 def database(app):
     """Provide database access within app context."""
     return db
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager collecting the SQL statements executed inside its block.
+
+    Works inside and outside an application context:
+
+        with count_queries() as statements:
+            ...
+        assert len(statements) == 1
+    """
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
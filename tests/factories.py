@@ -1,6 +1,6 @@
 """Factory Boy factories for test data generation."""
 import uuid
-from datetime import date, time
+from datetime import date, time, timedelta
 
 import factory
 from factory.alchemy import SQLAlchemyModelFactory
@@ -195,3 +195,28 @@ class DeviceTokenFactory(BaseFactory):
     def member_id(self):
         """Get member_id from member relation."""
         return self.member.id if self.member else None
+
+
+# Helpers for tests booking through the regular booking path
+
+FUTURE_DATE = date.today() + timedelta(days=3)
+
+
+def get_court_id(number):
+    """ID of one of the courts created by the app fixture."""
+    return Court.query.filter_by(number=number).first().id
+
+
+def book(court_number, hour, member, booking_date=FUTURE_DATE, current_time=None):
+    """Book a court for a member through ReservationService, failing the test on a booking error.
+
+    Returns:
+        Reservation: The created reservation
+    """
+    from app.services.reservation_service import ReservationService
+
+    reservation, error, _ = ReservationService.create_reservation(
+        get_court_id(court_number), booking_date, time(hour, 0), member.id, member.id, current_time=current_time
+    )
+    assert error is None, error
+    return reservation
@@ -6,6 +6,7 @@ from app.models import Member, Court, Reservation
 from app.services.reservation_service import ReservationService
 from app.services.validation_service import ValidationService
 from app.services.email_service import EmailService
+from app.services.outbox_service import OutboxService
 from unittest.mock import patch, MagicMock
 
 
@@ -272,8 +273,9 @@ class TestActiveBookingSessionIntegration:
                 current_time=current_time
             )
             
-            # Verify reservation was created and email was called
+            # Verify reservation was created and email was sent by the outbox
             assert reservation is not None
+            OutboxService.process_pending()
             assert mock_email.called
             
             # Verify the reservation object passed to email has correct status
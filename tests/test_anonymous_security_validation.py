@@ -313,6 +313,48 @@ class TestPerformanceValidation:
         # Note: In test environments, small timing variations can cause flaky results
         assert anonymous_time <= authenticated_time * 5.0
 
+    @pytest.mark.usefixtures('availability_cache')
+    def test_data_filtering_performance_impact_with_warm_cache(self, client, test_member, app):
+        """Test that anonymous projections of a cached snapshot are not slower than member ones."""
+        with app.app_context():
+            court = Court.query.first()
+            db.session.add_all([
+                Reservation(
+                    court_id=court.id,
+                    date=date(2026, 12, 5),
+                    start_time=dt_time(hour, 0),
+                    end_time=dt_time(hour + 1, 0),
+                    booked_for_id=test_member.id,
+                    booked_by_id=test_member.id,
+                    status='active'
+                )
+                for hour in range(8, 18)
+            ])
+            db.session.commit()
+
+        # Warm the availability snapshot cache so both measurements compare projections
+        url = '/api/courts/availability?date=2026-12-05'
+        assert client.get(url).status_code == 200
+
+        def average_response_time():
+            times = []
+            for _ in range(3):
+                start_time = time.time()
+                response = client.get(url)
+                times.append(time.time() - start_time)
+                assert response.status_code == 200
+            return sum(times) / len(times)
+
+        anonymous_time = average_response_time()
+        with client:
+            client.post('/auth/login', data={
+                'email': test_member.email,
+                'password': 'password123'
+            })
+            authenticated_time = average_response_time()
+
+        assert anonymous_time <= authenticated_time * 5.0
+
     def test_concurrent_anonymous_requests_performance(self, client, app):
         """Test performance under concurrent anonymous requests."""
         # Simplified test that doesn't use threading to avoid Flask context issues
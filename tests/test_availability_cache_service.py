@@ -0,0 +1,218 @@
+"""Tests for the per-date availability snapshot cache."""
+from datetime import date, time, timedelta
+
+import pytest
+
+from app import db
+from app.models import Court, BlockReason
+from app.services.availability_cache_service import AvailabilityCacheService
+from app.services.block_service import BlockService
+from app.services.reservation_service import ReservationService
+from tests.factories import MemberFactory
+
+
+FUTURE_DATE = date.today() + timedelta(days=3)
+
+pytestmark = pytest.mark.usefixtures('availability_cache')
+
+
+def _login(client, email):
+    client.post('/auth/login', data={'email': email, 'password': 'password123'})
+
+
+def _occupied(data, court_id):
+    court = next(c for c in data['courts'] if c['court_id'] == court_id)
+    return {slot['time']: slot for slot in court['occupied']}
+
+
+class TestSnapshotReuse:
+    """Repeat reads are served from the snapshot."""
+
+    def test_repeat_read_runs_no_queries(self, app, client, count_queries):
+        """A second anonymous read of the same date does not touch the database."""
+        url = f'/api/courts/availability?date={FUTURE_DATE.isoformat()}'
+        client.get(url)
+
+        with count_queries() as statements:
+            response = client.get(url)
+
+        assert response.status_code == 200
+        assert statements == []
+
+    def test_range_reuses_cached_days(self, app, client, count_queries):
+        """Days cached by the single-day endpoint are reused by the range endpoint."""
+        for offset in range(3):
+            client.get(f'/api/courts/availability?date={(FUTURE_DATE + timedelta(days=offset)).isoformat()}')
+
+        with count_queries() as statements:
+            response = client.get(f'/api/courts/availability/range?start={FUTURE_DATE.isoformat()}&days=3')
+
+        assert response.status_code == 200
+        assert len(response.get_json()['days']) == 3
+        assert statements == []
+
+    def test_stale_build_is_not_stored(self, app):
+        """A snapshot built before an invalidation is discarded."""
+        from app.services.availability_cache_service import AvailabilitySnapshot
+
+        with app.app_context():
+            generation = AvailabilityCacheService.get_generation(FUTURE_DATE)
+            AvailabilityCacheService.invalidate(FUTURE_DATE)
+            db.session.commit()
+
+            stored = AvailabilityCacheService.store_snapshot(
+                AvailabilitySnapshot(FUTURE_DATE, []), generation
+            )
+
+            assert stored is False
+            assert AvailabilityCacheService.get_snapshot(FUTURE_DATE) is None
+
+
+class TestVersionRecording:
+    """Change versions are written by the transaction of the change."""
+
+    def test_versions_are_committed_with_the_write(self, app):
+        """The first change creates the version row, later ones bump it."""
+        with app.app_context():
+            before = AvailabilityCacheService.get_versions([FUTURE_DATE])[FUTURE_DATE]
+
+            AvailabilityCacheService.invalidate(FUTURE_DATE)
+            db.session.commit()
+            once = AvailabilityCacheService.get_versions([FUTURE_DATE])[FUTURE_DATE]
+            AvailabilityCacheService.invalidate(FUTURE_DATE, FUTURE_DATE + timedelta(days=1))
+            db.session.commit()
+            versions = AvailabilityCacheService.get_versions([FUTURE_DATE, FUTURE_DATE + timedelta(days=1)])
+
+            assert (before, once) == ('0-0', '0-1')
+            assert versions == {FUTURE_DATE: '0-2', FUTURE_DATE + timedelta(days=1): '0-1'}
+
+    def test_rolled_back_write_changes_nothing(self, app, client):
+        """Neither the version nor the cached snapshot change without a commit."""
+        url = f'/api/courts/availability?date={FUTURE_DATE.isoformat()}'
+        etag = client.get(url).headers['ETag']
+
+        with app.app_context():
+            AvailabilityCacheService.invalidate(FUTURE_DATE)
+            db.session.rollback()
+
+            assert AvailabilityCacheService.get_versions([FUTURE_DATE])[FUTURE_DATE] == '0-0'
+            assert AvailabilityCacheService.get_snapshot(FUTURE_DATE) is not None
+        assert client.get(url).headers['ETag'] == etag
+
+
+class TestWriteInvalidation:
+    """Service write paths invalidate the affected date."""
+
+    def test_created_reservation_is_visible(self, app, client):
+        """Creating a reservation invalidates the cached date."""
+        url = f'/api/courts/availability?date={FUTURE_DATE.isoformat()}'
+        with app.app_context():
+            member = MemberFactory()
+            court = Court.query.filter_by(number=1).first()
+            member_id, court_id = member.id, court.id
+
+        client.get(url)
+
+        with app.app_context():
+            reservation, error, _ = ReservationService.create_reservation(
+                court_id, FUTURE_DATE, time(10, 0), member_id, member_id
+            )
+            assert error is None
+
+        slots = _occupied(client.get(url).get_json(), court_id)
+        assert slots['10:00']['status'] == 'reserved'
+
+    def test_cancelled_reservation_disappears(self, app, client):
+        """Cancelling a reservation invalidates the cached date."""
+        url = f'/api/courts/availability?date={FUTURE_DATE.isoformat()}'
+        with app.app_context():
+            member = MemberFactory()
+            court = Court.query.filter_by(number=2).first()
+            reservation, error, _ = ReservationService.create_reservation(
+                court.id, FUTURE_DATE, time(11, 0), member.id, member.id
+            )
+            reservation_id, court_id = reservation.id, court.id
+
+        assert '11:00' in _occupied(client.get(url).get_json(), court_id)
+
+        with app.app_context():
+            success, error = ReservationService.cancel_reservation(reservation_id)
+            assert success, error
+
+        assert '11:00' not in _occupied(client.get(url).get_json(), court_id)
+
+    def test_block_creation_and_deletion_are_visible(self, app, client, test_admin):
+        """Creating and deleting blocks invalidates the cached date."""
+        url = f'/api/courts/availability?date={FUTURE_DATE.isoformat()}'
+        with app.app_context():
+            court = Court.query.filter_by(number=3).first()
+            reason = BlockReason.query.filter_by(name='Maintenance').first()
+            court_id, reason_id = court.id, reason.id
+
+        client.get(url)
+
+        with app.app_context():
+            blocks, error = BlockService.create_multi_court_blocks(
+                [court_id], FUTURE_DATE, time(14, 0), time(16, 0), reason_id, None, test_admin.id
+            )
+            assert error is None
+            batch_id = blocks[0].batch_id
+
+        slots = _occupied(client.get(url).get_json(), court_id)
+        assert slots['14:00']['status'] == 'blocked'
+        assert slots['15:00']['status'] == 'blocked'
+
+        with app.app_context():
+            success, error = BlockService.delete_batch(batch_id, test_admin.id)
+            assert success, error
+
+        assert _occupied(client.get(url).get_json(), court_id) == {}
+
+
+class TestViewerOverlay:
+    """Viewer-specific data is overlaid on the shared snapshot."""
+
+    def test_can_cancel_depends_on_viewer(self, app, client):
+        """Owner and other members see different can_cancel flags for the same slot."""
+        url = f'/api/courts/availability?date={FUTURE_DATE.isoformat()}'
+        with app.app_context():
+            owner = MemberFactory()
+            other = MemberFactory()
+            court = Court.query.filter_by(number=4).first()
+            ReservationService.create_reservation(
+                court.id, FUTURE_DATE, time(9, 0), owner.id, owner.id
+            )
+            owner_email, other_email, court_id = owner.email, other.email, court.id
+
+        _login(client, owner_email)
+        owner_slot = _occupied(client.get(url).get_json(), court_id)['09:00']
+        client.get('/auth/logout')
+
+        _login(client, other_email)
+        other_slot = _occupied(client.get(url).get_json(), court_id)['09:00']
+        client.get('/auth/logout')
+
+        anonymous_slot = _occupied(client.get(url).get_json(), court_id)['09:00']
+
+        assert owner_slot['details']['can_cancel'] is True
+        assert other_slot['details']['can_cancel'] is False
+        assert anonymous_slot == {'time': '09:00', 'status': 'reserved', 'details': None}
+
+    def test_snapshot_is_not_mutated_by_overlay(self, app, client):
+        """Projecting for a viewer leaves the cached slot without can_cancel."""
+        with app.app_context():
+            owner = MemberFactory()
+            court = Court.query.filter_by(number=5).first()
+            ReservationService.create_reservation(
+                court.id, FUTURE_DATE, time(12, 0), owner.id, owner.id
+            )
+            owner_email = owner.email
+
+        _login(client, owner_email)
+        client.get(f'/api/courts/availability?date={FUTURE_DATE.isoformat()}')
+
+        with app.app_context():
+            snapshot = AvailabilityCacheService.get_snapshot(FUTURE_DATE)
+            slots = [entry.slot for _, _, entries in snapshot.courts for entry in entries]
+            assert slots
+            assert all('can_cancel' not in slot['details'] for slot in slots)
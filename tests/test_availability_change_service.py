@@ -0,0 +1,136 @@
+"""Tests for the availability change log and the changes feed."""
+from datetime import date, time, timedelta
+
+from app import db
+from app.models import AvailabilityChange, Court
+from app.services.availability_stream_service import AvailabilityStreamService
+from app.services.block_service import BlockService
+from app.services.reservation_service import ReservationService
+from tests.factories import MemberFactory, BlockReasonFactory
+
+
+FUTURE_DATE = date.today() + timedelta(days=3)
+
+
+def _cursor(client):
+    return client.get('/api/courts/availability/changes').get_json()['cursor']
+
+
+class TestChangeLog:
+    """Write paths append touched slots to the log."""
+
+    def test_reservation_writes_are_logged(self, app):
+        """Booking and cancelling record the slot each time."""
+        with app.app_context():
+            member = MemberFactory()
+            court = Court.query.filter_by(number=1).first()
+            reservation, error, _ = ReservationService.create_reservation(
+                court.id, FUTURE_DATE, time(10, 0), member.id, member.id
+            )
+            assert error is None
+            ReservationService.cancel_reservation(reservation.id)
+
+            entries = AvailabilityChange.query.order_by(AvailabilityChange.id).all()
+            assert [(e.date, e.court_id, e.hour) for e in entries] == [
+                (FUTURE_DATE, court.id, 10),
+                (FUTURE_DATE, court.id, 10)
+            ]
+
+    def test_block_writes_log_every_covered_slot(self, app):
+        """Blocks record each hour they cover."""
+        with app.app_context():
+            admin = MemberFactory(admin=True)
+            reason = BlockReasonFactory()
+            court = Court.query.filter_by(number=2).first()
+            _, error = BlockService.create_multi_court_blocks(
+                [court.id], FUTURE_DATE, time(14, 0), time(17, 0), reason.id, None, admin.id
+            )
+            assert error is None
+
+            hours = [e.hour for e in AvailabilityChange.query.order_by(AvailabilityChange.id)]
+            assert hours == [14, 15, 16]
+
+    def test_entries_roll_back_with_the_write(self, app):
+        """Entries are part of the write's transaction, not committed on their own."""
+        with app.app_context():
+            court = Court.query.filter_by(number=3).first()
+
+            AvailabilityStreamService.publish_slot_changes([(FUTURE_DATE, court.id, 10)])
+            db.session.rollback()
+
+            assert AvailabilityChange.query.count() == 0
+
+
+class TestChangesFeed:
+    """GET /api/courts/availability/changes."""
+
+    def test_without_since_returns_current_cursor(self, client):
+        """A first call only hands out the cursor to start from."""
+        data = client.get('/api/courts/availability/changes').get_json()
+        assert data == {'cursor': '0', 'changes': [], 'has_more': False}
+
+    def test_returns_changed_slots_with_current_state(self, app, client):
+        """Changes after the cursor are reported once per slot, in their current state."""
+        cursor = _cursor(client)
+
+        with app.app_context():
+            member = MemberFactory()
+            court = Court.query.filter_by(number=3).first()
+            kept, _, _ = ReservationService.create_reservation(
+                court.id, FUTURE_DATE, time(9, 0), member.id, member.id
+            )
+            cancelled, _, _ = ReservationService.create_reservation(
+                court.id, FUTURE_DATE, time(11, 0), member.id, member.id
+            )
+            ReservationService.cancel_reservation(cancelled.id)
+
+        data = client.get(f'/api/courts/availability/changes?since={cursor}').get_json()
+
+        assert [(c['time'], c['status']) for c in data['changes']] == [
+            ('09:00', 'reserved'),
+            ('11:00', 'available')
+        ]
+        assert data['changes'][0]['date'] == FUTURE_DATE.isoformat()
+        assert data['changes'][0]['court_number'] == 3
+        assert data['changes'][0]['details'] is None  # anonymous viewer
+        assert data['has_more'] is False
+
+        # Polling with the new cursor returns nothing until the next write
+        again = client.get(f"/api/courts/availability/changes?since={data['cursor']}").get_json()
+        assert again == {'cursor': data['cursor'], 'changes': [], 'has_more': False}
+
+    def test_changes_from_other_processes_are_not_served_stale(self, app, client):
+        """A cached snapshot older than the logged change is rebuilt."""
+        with app.app_context():
+            member = MemberFactory()
+            court = Court.query.filter_by(number=4).first()
+            court_id, member_id = court.id, member.id
+
+        # Warm the snapshot cache, then write behind its back like another process
+        client.get(f'/api/courts/availability?date={FUTURE_DATE.isoformat()}')
+        cursor = _cursor(client)
+        with app.app_context():
+            from app.models import Reservation
+            from app.services.availability_cache_service import _record_changes
+            db.session.add(Reservation(
+                court_id=court_id, date=FUTURE_DATE, start_time=time(12, 0), end_time=time(13, 0),
+                booked_for_id=member_id, booked_by_id=member_id, status='active'
+            ))
+            db.session.commit()
+            _record_changes({FUTURE_DATE})
+            db.session.add(AvailabilityChange(date=FUTURE_DATE, court_id=court_id, hour=12))
+            db.session.commit()
+
+        data = client.get(f'/api/courts/availability/changes?since={cursor}').get_json()
+        assert [(c['time'], c['status']) for c in data['changes']] == [('12:00', 'reserved')]
+
+    def test_unknown_cursor_is_gone(self, client):
+        """A cursor beyond the log can't be continued."""
+        response = client.get('/api/courts/availability/changes?since=999')
+        assert response.status_code == 410
+        assert response.get_json()['cursor'] == '0'
+
+    def test_malformed_cursor_is_rejected(self, client):
+        """Non-numeric cursors are a client error."""
+        response = client.get('/api/courts/availability/changes?since=abc')
+        assert response.status_code == 400
@@ -0,0 +1,149 @@
+"""Tests for the shared availability engine."""
+from datetime import date, datetime, time
+
+from app import db
+from app.models import Block, BlockReason, Court, Reservation
+from app.services.availability_service import AvailabilityService
+
+
+DAY = date(2026, 12, 5)
+BEFORE_DAY = datetime(2026, 12, 1, 12, 0)
+
+
+def _add_reservation(court_id, member_id, hour, **fields):
+    reservation = Reservation(
+        court_id=court_id,
+        date=DAY,
+        start_time=time(hour, 0),
+        end_time=time(hour + 1, 0),
+        booked_for_id=member_id,
+        booked_by_id=member_id,
+        status=fields.pop('status', 'active'),
+        **fields
+    )
+    db.session.add(reservation)
+    return reservation
+
+
+def _slot(grid, court_id, slot_time):
+    court = next(court for court in grid if court['court_id'] == court_id)
+    return next(slot for slot in court['slots'] if slot['time'] == slot_time)
+
+
+class TestBuildGrid:
+    """Full web grid rendered from a snapshot."""
+
+    def test_grid_has_every_slot_of_every_court(self, app):
+        """Test each court gets the 14 slots 08:00-21:00."""
+        with app.app_context():
+            snapshot = AvailabilityService.get_day_snapshot(DAY, BEFORE_DAY)
+            grid = AvailabilityService.build_grid(snapshot, True, BEFORE_DAY)
+
+            assert [court['court_number'] for court in grid] == [1, 2, 3, 4, 5, 6]
+            times = [slot['time'] for slot in grid[0]['slots']]
+            assert times == [f'{hour:02d}:00' for hour in range(8, 22)]
+            assert all(slot['status'] == 'available' for slot in grid[0]['slots'])
+
+    def test_member_and_anonymous_views(self, app, test_member):
+        """Test members see booking details and anonymous viewers only 'reserved'."""
+        with app.app_context():
+            court_id = Court.query.filter_by(number=1).first().id
+            reservation = _add_reservation(court_id, test_member.id, 10, is_short_notice=True)
+            db.session.commit()
+
+            snapshot = AvailabilityService.get_day_snapshot(DAY, BEFORE_DAY)
+            member_slot = _slot(AvailabilityService.build_grid(snapshot, True, BEFORE_DAY), court_id, '10:00')
+            anonymous_slot = _slot(AvailabilityService.build_grid(snapshot, False, BEFORE_DAY), court_id, '10:00')
+
+            assert member_slot['status'] == 'short_notice'
+            assert member_slot['details']['reservation_id'] == reservation.id
+            assert member_slot['details']['booked_for_id'] == test_member.id
+            assert anonymous_slot == {'time': '10:00', 'status': 'reserved', 'details': None}
+
+    def test_ended_reservations_are_shown_as_available(self, app, test_member):
+        """Test a reservation that has ended leaves its slot available."""
+        with app.app_context():
+            court_id = Court.query.filter_by(number=2).first().id
+            _add_reservation(court_id, test_member.id, 9)
+            _add_reservation(court_id, test_member.id, 15)
+            db.session.commit()
+
+            during_day = datetime(2026, 12, 5, 12, 30)
+            snapshot = AvailabilityService.get_day_snapshot(DAY, during_day)
+            grid = AvailabilityService.build_grid(snapshot, True, during_day)
+
+            assert _slot(grid, court_id, '09:00')['status'] == 'available'
+            assert _slot(grid, court_id, '15:00')['status'] == 'reserved'
+
+    def test_temporary_block_is_shown_as_blocked(self, app, test_member, test_admin):
+        """Test temporary blocks render as blocked without the suspended booking."""
+        with app.app_context():
+            court_id = Court.query.filter_by(number=3).first().id
+            reason = BlockReason.query.filter_by(name='Weather').first()
+            reason.is_temporary = True
+            _add_reservation(court_id, test_member.id, 11, status='suspended')
+            db.session.add(Block(
+                court_id=court_id, date=DAY, start_time=time(11, 0), end_time=time(12, 0),
+                reason_id=reason.id, details='Regen', created_by_id=test_admin.id
+            ))
+            db.session.commit()
+
+            snapshot = AvailabilityService.get_day_snapshot(DAY, BEFORE_DAY)
+            slot = _slot(AvailabilityService.build_grid(snapshot, True, BEFORE_DAY), court_id, '11:00')
+
+            assert slot['status'] == 'blocked'
+            assert slot['details']['reason'] == 'Weather'
+            assert slot['details']['details'] == 'Regen'
+            assert 'suspended_reservation' not in slot['details']
+
+
+class TestSummarize:
+    """Real-time slot counts."""
+
+    def test_counts_slots_by_state(self, app, test_member, test_admin):
+        """Test bookings are split into active and past, blocks counted per slot."""
+        with app.app_context():
+            court_1 = Court.query.filter_by(number=1).first().id
+            court_2 = Court.query.filter_by(number=2).first().id
+            reason = BlockReason.query.filter_by(name='Maintenance').first()
+            _add_reservation(court_1, test_member.id, 9)
+            _add_reservation(court_1, test_member.id, 16, is_short_notice=True)
+            db.session.add(Block(
+                court_id=court_2, date=DAY, start_time=time(8, 0), end_time=time(11, 0),
+                reason_id=reason.id, created_by_id=test_admin.id
+            ))
+            db.session.commit()
+
+            during_day = datetime(2026, 12, 5, 12, 30)
+            snapshot = AvailabilityService.get_day_snapshot(DAY, during_day)
+            summary = AvailabilityService.summarize(snapshot, during_day)
+
+        assert summary == {
+            'total_slots': 84,
+            'available_slots': 80,
+            'active_reservations': 1,
+            'past_reservations': 1,
+            'short_notice_active': 1,
+            'blocked_slots': 3
+        }
+
+
+class TestWebAvailabilityRoute:
+    """The web grid endpoint uses the engine."""
+
+    def test_anonymous_grid_has_no_member_data(self, app, client, test_member):
+        """Test the anonymous overview hides bookers but keeps rendering fields."""
+        with app.app_context():
+            court_id = Court.query.filter_by(number=4).first().id
+            _add_reservation(court_id, test_member.id, 10)
+            db.session.commit()
+
+        response = client.get('/courts/availability?date=2026-12-05')
+        assert response.status_code == 200
+        slot = _slot(response.get_json()['grid'], court_id, '10:00')
+
+        assert slot['status'] == 'reserved'
+        assert slot['details'] is None
+        assert slot['content'] == 'Gebucht'
+        assert slot['canCancel'] is False
+        assert test_member.id not in response.get_data(as_text=True)
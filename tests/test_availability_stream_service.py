@@ -0,0 +1,188 @@
+"""Tests for the availability change stream."""
+import json
+from datetime import date, time, timedelta
+
+from app import db
+from app.models import Court
+from app.services.availability_stream_service import AvailabilityStreamService
+from app.services.block_service import BlockService
+from app.services.reservation_service import ReservationService
+from tests.factories import MemberFactory, BlockReasonFactory
+
+
+FUTURE_DATE = date.today() + timedelta(days=3)
+
+
+def _events_since(app, sequence):
+    """Payloads published after the given sequence number."""
+    with app.app_context():
+        broadcaster, _, _ = AvailabilityStreamService.subscribe()
+        return [payload for _, payload in broadcaster.wait(sequence, timeout=0)]
+
+
+def _subscribe(app):
+    """Create the broadcaster and return its current sequence number."""
+    with app.app_context():
+        _, sequence, _ = AvailabilityStreamService.subscribe()
+        return sequence
+
+
+def _read_messages(response, count):
+    """Read the first `count` SSE messages (comments and retry lines skipped)."""
+    messages = []
+    for chunk in response.response:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if not text.startswith('id:'):
+            continue
+        fields = dict(line.split(': ', 1) for line in text.strip().split('\n'))
+        messages.append({
+            'id': fields['id'],
+            'event': fields['event'],
+            'data': json.loads(fields['data'])
+        })
+        if len(messages) == count:
+            break
+    response.close()
+    return messages
+
+
+class TestPublishing:
+    """Write paths publish slot-level changes."""
+
+    def test_nothing_is_published_without_subscribers(self, app):
+        """Writes don't create the broadcaster."""
+        with app.app_context():
+            member = MemberFactory()
+            court = Court.query.filter_by(number=1).first()
+            ReservationService.create_reservation(court.id, FUTURE_DATE, time(10, 0), member.id, member.id)
+
+        assert 'availability_stream' not in app.extensions
+
+    def test_reservation_create_and_cancel(self, app):
+        """Booking and cancelling publish reserved and available."""
+        sequence = _subscribe(app)
+
+        with app.app_context():
+            member = MemberFactory()
+            court = Court.query.filter_by(number=2).first()
+            reservation, error, _ = ReservationService.create_reservation(
+                court.id, FUTURE_DATE, time(10, 0), member.id, member.id
+            )
+            assert error is None
+            ReservationService.cancel_reservation(reservation.id)
+
+        events = _events_since(app, sequence)
+        assert [(e['court_number'], e['time'], e['status']) for e in events] == [
+            (2, '10:00', 'reserved'),
+            (2, '10:00', 'available')
+        ]
+        assert events[0]['date'] == FUTURE_DATE.isoformat()
+
+    def test_events_wait_for_the_commit(self, app):
+        """Slots are streamed once the write commits, and not at all if it rolls back."""
+        sequence = _subscribe(app)
+
+        with app.app_context():
+            court = Court.query.filter_by(number=3).first()
+            AvailabilityStreamService.publish_slot_changes([(FUTURE_DATE, court.id, 10)])
+            assert _events_since(app, sequence) == []
+            db.session.rollback()
+
+            AvailabilityStreamService.publish_slot_changes([(FUTURE_DATE, court.id, 11)])
+            db.session.commit()
+
+        assert [e['time'] for e in _events_since(app, sequence)] == ['11:00']
+
+    def test_temporary_block_suspends_and_restores(self, app):
+        """A temporary block and its removal publish the covered slots."""
+        with app.app_context():
+            member = MemberFactory()
+            admin = MemberFactory(admin=True)
+            reason = BlockReasonFactory(is_temporary=True)
+            court = Court.query.filter_by(number=3).first()
+            ReservationService.create_reservation(court.id, FUTURE_DATE, time(10, 0), member.id, member.id)
+            court_id, reason_id, admin_id = court.id, reason.id, admin.id
+
+        sequence = _subscribe(app)
+
+        with app.app_context():
+            blocks, error = BlockService.create_multi_court_blocks(
+                [court_id], FUTURE_DATE, time(10, 0), time(12, 0), reason_id, None, admin_id
+            )
+            assert error is None
+            batch_id = blocks[0].batch_id
+
+        events = _events_since(app, sequence)
+        assert [(e['time'], e['status']) for e in events] == [
+            ('10:00', 'blocked_temporary'),
+            ('11:00', 'blocked_temporary')
+        ]
+
+        sequence = _subscribe(app)
+        with app.app_context():
+            success, error = BlockService.delete_batch(batch_id, admin_id)
+            assert success, error
+
+        events = _events_since(app, sequence)
+        assert [(e['time'], e['status']) for e in events] == [
+            ('10:00', 'reserved'),
+            ('11:00', 'available')
+        ]
+
+
+class TestStreamEndpoint:
+    """SSE endpoint with replay cursor."""
+
+    def test_stream_starts_with_ready_event(self, client):
+        """A fresh connection gets a ready event carrying a cursor."""
+        response = client.get('/api/courts/availability/stream', buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+
+        ready = _read_messages(response, 1)[0]
+        assert ready['event'] == 'ready'
+        assert ready['data'] == {'replayed': False}
+        assert ready['id']
+
+    def test_reconnect_replays_missed_events(self, app, client):
+        """Events published while disconnected are replayed from Last-Event-ID."""
+        response = client.get('/api/courts/availability/stream', buffered=False)
+        cursor = _read_messages(response, 1)[0]['id']
+
+        with app.app_context():
+            member = MemberFactory()
+            court = Court.query.filter_by(number=4).first()
+            ReservationService.create_reservation(court.id, FUTURE_DATE, time(9, 0), member.id, member.id)
+            ReservationService.create_reservation(court.id, FUTURE_DATE, time(11, 0), member.id, member.id)
+
+        response = client.get('/api/courts/availability/stream', buffered=False,
+                              headers={'Last-Event-ID': cursor})
+        messages = _read_messages(response, 3)
+
+        assert messages[0] == {'id': cursor, 'event': 'ready', 'data': {'replayed': True}}
+        assert [m['event'] for m in messages[1:]] == ['slot', 'slot']
+        assert [m['data']['time'] for m in messages[1:]] == ['09:00', '11:00']
+
+    def test_unknown_cursor_triggers_reset(self, client):
+        """A cursor from another process or restart cannot be replayed."""
+        response = client.get('/api/courts/availability/stream?cursor=deadbeef-42', buffered=False)
+        ready, reset = _read_messages(response, 2)
+
+        assert ready['data'] == {'replayed': False}
+        assert reset['event'] == 'reset'
+        assert reset['data'] == {'reason': 'cursor_expired'}
+
+    def test_concurrent_streams_are_capped(self, app, client):
+        """A client can't hold more streams than allowed; closed ones free their place."""
+        app.config['AVAILABILITY_STREAM_MAX_PER_CLIENT'] = 1
+        first = client.get('/api/courts/availability/stream', buffered=False)
+        assert first.status_code == 200
+
+        refused = client.get('/api/courts/availability/stream', buffered=False)
+        assert refused.status_code == 503
+        assert refused.headers['Retry-After']
+
+        first.close()
+        second = client.get('/api/courts/availability/stream', buffered=False)
+        assert second.status_code == 200
+        second.close()
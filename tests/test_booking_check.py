@@ -0,0 +1,147 @@
+"""Tests for checking possible bookings in a batch without booking."""
+from datetime import datetime, time, timedelta
+from unittest.mock import patch
+
+from app import db
+from app.models import Block, BlockReason, Reservation
+from app.services.reservation_service import ReservationService
+from app.services.validation_service import ValidationService
+from tests.factories import FUTURE_DATE, MemberFactory, get_court_id
+
+
+NOW = datetime.combine(FUTURE_DATE - timedelta(days=1), time(12, 0))
+
+
+class TestValidateBookingCandidates:
+    """ValidationService.validate_booking_candidates."""
+
+    def test_outcomes_match_single_validation(self, app):
+        """Each candidate gets the outcome a booking attempt would get."""
+        with app.app_context():
+            member, other, admin = MemberFactory(), MemberFactory(), MemberFactory(admin=True)
+            for court, hour in ((1, 10), (2, 10)):
+                ReservationService.create_reservation(
+                    get_court_id(court), FUTURE_DATE, time(hour, 0), other.id, other.id, current_time=NOW
+                )
+            reason = BlockReason.query.first()
+            db.session.add(Block(
+                court_id=get_court_id(3), date=FUTURE_DATE, start_time=time(14, 0), end_time=time(16, 0),
+                reason_id=reason.id, created_by_id=admin.id
+            ))
+            db.session.commit()
+
+            candidates = [
+                (get_court_id(4), FUTURE_DATE, time(10, 0), member.id),
+                (get_court_id(1), FUTURE_DATE, time(10, 0), member.id),
+                (get_court_id(3), FUTURE_DATE, time(15, 0), member.id),
+                (get_court_id(4), FUTURE_DATE, time(11, 0), other.id),
+                (get_court_id(4), NOW.date(), time(9, 0), member.id),
+            ]
+            results = ValidationService.validate_booking_candidates(candidates, member.id, current_time=NOW)
+
+            expected = [
+                ValidationService.validate_all_booking_constraints(
+                    court_id, slot_date, start_time, member_id, current_time=NOW, booked_by_id=member.id
+                )[:2]
+                for court_id, slot_date, start_time, member_id in candidates
+            ]
+            assert results == expected
+            assert [is_valid for is_valid, _ in results] == [True, False, False, False, False]
+
+    def test_queries_are_shared_across_the_batch(self, app, count_queries):
+        """The number of statements does not grow with the candidates."""
+        with app.app_context():
+            members = [MemberFactory() for _ in range(3)]
+            few = [(get_court_id(1), FUTURE_DATE, time(10, 0), members[0].id)]
+            many = [
+                (get_court_id(court), FUTURE_DATE + timedelta(days=day), time(hour, 0), member.id)
+                for court in (1, 2, 3) for day in (0, 1) for hour in (9, 17) for member in members
+            ]
+
+            def check(candidates):
+                with count_queries() as statements:
+                    ValidationService.validate_booking_candidates(candidates, members[0].id, current_time=NOW)
+                return len(statements)
+
+            assert check(many) == check(few)
+
+    def test_late_evening_candidate_gets_the_booking_hours_error(self, app):
+        """A 23:00 slot checked at 23:10 is outside the bookable hours, not a calculation error."""
+        with app.app_context():
+            member = MemberFactory()
+            late_evening = datetime.combine(FUTURE_DATE, time(23, 10))
+            candidates = [
+                (get_court_id(1), FUTURE_DATE, time(23, 0), member.id),
+                (get_court_id(1), FUTURE_DATE + timedelta(days=1), time(10, 0), member.id),
+            ]
+
+            results = ValidationService.validate_booking_candidates(candidates, member.id, current_time=late_evening)
+
+            assert results == [
+                (False, "Buchungen sind nur zu vollen Stunden zwischen 08:00 und 22:00 Uhr möglich"),
+                (True, ""),
+            ]
+
+    def test_nothing_is_booked(self, app):
+        """Checking leaves the reservations untouched."""
+        with app.app_context():
+            member = MemberFactory()
+            ValidationService.validate_booking_candidates(
+                [(get_court_id(5), FUTURE_DATE, time(10, 0), member.id)], member.id, current_time=NOW
+            )
+            assert Reservation.query.count() == 0
+
+
+class TestCheckRoute:
+    """POST /api/reservations/check."""
+
+    def test_results_per_candidate(self, app, client, test_member):
+        """Every candidate is answered in order."""
+        with app.app_context():
+            other = MemberFactory()
+            ReservationService.create_reservation(get_court_id(1), FUTURE_DATE, time(10, 0), other.id, other.id)
+
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+        response = client.post('/api/reservations/check', json={'candidates': [
+            {'court_id': 1, 'date': FUTURE_DATE.isoformat(), 'start_time': '10:00'},
+            {'court_id': 2, 'date': FUTURE_DATE.isoformat(), 'start_time': '10:00'},
+        ]})
+
+        assert response.status_code == 200
+        results = response.get_json()['results']
+        assert [(r['court_id'], r['can_book']) for r in results] == [(1, False), (2, True)]
+        assert results[0]['error'] == 'Dieser Platz ist bereits für diese Zeit gebucht'
+        assert results[1]['error'] is None
+        assert results[1]['booked_for_id'] == test_member.id
+
+    def test_batch_size_is_limited(self, app, client, test_member):
+        """Oversized batches are rejected."""
+        app.config['BOOKING_CHECK_MAX_CANDIDATES'] = 1
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+
+        candidate = {'court_id': 1, 'date': FUTURE_DATE.isoformat(), 'start_time': '10:00'}
+        response = client.post('/api/reservations/check', json={'candidates': [candidate, candidate]})
+        assert response.status_code == 400
+
+    def test_unknown_court_is_rejected(self, client, test_member):
+        """Court IDs are checked against the courts that exist."""
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+
+        response = client.post('/api/reservations/check', json={
+            'candidates': [{'court_id': 99, 'date': FUTURE_DATE.isoformat(), 'start_time': '10:00'}]
+        })
+
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Platz nicht gefunden'
+
+    def test_unexpected_error_is_logged(self, client, test_member, caplog):
+        """Failures are logged before the generic error is returned."""
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+
+        with patch.object(ValidationService, 'validate_booking_candidates', side_effect=RuntimeError('kaputt')):
+            response = client.post('/api/reservations/check', json={
+                'candidates': [{'court_id': 1, 'date': FUTURE_DATE.isoformat(), 'start_time': '10:00'}]
+            })
+
+        assert response.status_code == 500
+        assert 'check_reservations: kaputt' in caplog.text
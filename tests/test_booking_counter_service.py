@@ -0,0 +1,130 @@
+"""Tests for the per-member active booking counters."""
+from datetime import datetime, time, timedelta
+
+from app import db
+from app.models import MemberBookingCounter
+from app.services.booking_counter_service import BookingCounterService
+from app.services.reservation_service import ReservationService
+from app.services.validation_service import ValidationService
+from tests.factories import FUTURE_DATE, MemberFactory, get_court_id
+
+
+def _stored_counts(member_id):
+    counter = db.session.get(MemberBookingCounter, member_id)
+    db.session.refresh(counter)
+    return counter.regular_count, counter.short_notice_count
+
+
+class TestCounterMaintenance:
+    """Counters follow the reservation writes."""
+
+    def test_booking_stores_and_updates_the_counter(self, app):
+        """The locked booking path stores the counter, later writes keep it in step."""
+        with app.app_context():
+            member = MemberFactory()
+            first, error, _ = ReservationService.create_reservation(
+                get_court_id(1), FUTURE_DATE, time(10, 0), member.id, member.id
+            )
+            assert error is None
+            assert _stored_counts(member.id) == (1, 0)
+
+            ReservationService.create_reservation(get_court_id(2), FUTURE_DATE, time(12, 0), member.id, member.id)
+            assert _stored_counts(member.id) == (2, 0)
+
+            success, error = ReservationService.cancel_reservation(first.id)
+            assert success, error
+            assert _stored_counts(member.id) == (1, 0)
+
+            regular, short_notice, _ = BookingCounterService.compute(member.id, datetime.now())
+            assert (regular, short_notice) == (1, 0)
+
+    def test_ended_booking_expires_the_counter(self, app):
+        """After the earliest counted booking ended the counts are recomputed."""
+        with app.app_context():
+            member = MemberFactory()
+            now = datetime.combine(FUTURE_DATE - timedelta(days=2), time(9, 0))
+            for hour in (10, 11):
+                _, error, _ = ReservationService.create_reservation(
+                    get_court_id(3), FUTURE_DATE, time(hour, 0), member.id, member.id, current_time=now
+                )
+                assert error is None
+
+            counter = db.session.get(MemberBookingCounter, member.id)
+            assert counter.valid_until == datetime.combine(FUTURE_DATE, time(11, 0))
+            assert BookingCounterService.get_counts(member.id, now) == {'regular': 2, 'short_notice': 0}
+
+            later = datetime.combine(FUTURE_DATE, time(11, 30))
+            assert BookingCounterService.get_counts(member.id, later) == {'regular': 1, 'short_notice': 0}
+
+    def test_overcounted_counter_does_not_block(self, app):
+        """The session list has the final say when the counter reports the limit."""
+        with app.app_context():
+            member = MemberFactory()
+            now = datetime.now()
+            BookingCounterService.store(member.id, 2, 1, None, now)
+            db.session.commit()
+
+            is_valid, error, _ = ValidationService.validate_all_booking_constraints(
+                get_court_id(4), FUTURE_DATE, time(10, 0), member.id, current_time=now
+            )
+            assert is_valid, error
+
+
+class TestCachedCounts:
+    """Display counts cached per member."""
+
+    def test_cached_counts_need_no_query_until_a_booking_commits(self, app, count_queries):
+        """A committed booking drops the member's cached counts."""
+        with app.app_context():
+            member = MemberFactory()
+
+            assert BookingCounterService.get_counts(member.id, cached=True) == {'regular': 0, 'short_notice': 0}
+            with count_queries() as statements:
+                assert BookingCounterService.get_counts(member.id, cached=True) == {'regular': 0, 'short_notice': 0}
+            assert statements == []
+
+            ReservationService.create_reservation(get_court_id(6), FUTURE_DATE, time(9, 0), member.id, member.id)
+            assert BookingCounterService.get_counts(member.id, cached=True) == {'regular': 1, 'short_notice': 0}
+
+    def test_compute_takes_one_statement(self, app, count_queries):
+        """Counts and the earliest end come from one aggregate query."""
+        with app.app_context():
+            member = MemberFactory()
+            now = datetime.combine(FUTURE_DATE - timedelta(days=2), time(9, 0))
+            for hour in (14, 11):
+                ReservationService.create_reservation(
+                    get_court_id(1), FUTURE_DATE, time(hour, 0), member.id, member.id, current_time=now
+                )
+            with count_queries() as statements:
+                result = BookingCounterService.compute(member.id, now)
+
+            assert result == (2, 0, datetime.combine(FUTURE_DATE, time(12, 0)))
+            assert len(statements) == 1
+
+
+class TestStatusRoute:
+    """GET /api/reservations/status."""
+
+    def test_counts_come_from_the_counter(self, app, client, test_member):
+        """Active bookings are reported with the remaining allowance."""
+        with app.app_context():
+            ReservationService.create_reservation(
+                get_court_id(5), FUTURE_DATE, time(10, 0), test_member.id, test_member.id
+            )
+
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+        data = client.get('/api/reservations/status').get_json()
+
+        assert data['limits']['regular_reservations']['current'] == 1
+        assert data['limits']['regular_reservations']['available'] == 1
+        assert data['active_reservations'] == {'total': 1, 'regular': 1, 'short_notice': 0}
+
+    def test_limits_come_from_config(self, app, client, test_member):
+        """The reported limits follow the configured ones."""
+        app.config['MAX_ACTIVE_RESERVATIONS'] = 3
+
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+        data = client.get('/api/reservations/status').get_json()
+
+        assert data['limits']['regular_reservations'] == {'limit': 3, 'current': 0, 'available': 3, 'can_book': True}
+        assert data['limits']['short_notice_bookings']['limit'] == 1
@@ -1,4 +1,5 @@
 """Tests for court routes."""
+import json
 import pytest
 from datetime import date, time
 from app import db
@@ -510,3 +511,276 @@ class TestGetAvailabilityRange:
 
         assert data['range']['days_requested'] == 30
         assert len(data['days']) == 30
+
+    def test_range_shows_temporary_block_over_suspended_reservation(self, client, test_member, app):
+        """Test temp blocks show underlying block and suspended reservation to members."""
+        from tests.factories import BlockReasonFactory
+        from app.services.block_service import BlockService
+        from app.services.reservation_service import ReservationService
+
+        with app.app_context():
+            court = Court.query.filter_by(number=2).first()
+            court_id = court.id
+            ReservationService.create_reservation(
+                court.id, date(2026, 12, 6), time(10, 0), test_member.id, test_member.id
+            )
+            maintenance = BlockReason.query.filter_by(name='Maintenance').first()
+            db.session.add(Block(
+                court_id=court.id, date=date(2026, 12, 6), start_time=time(11, 0),
+                end_time=time(12, 0), reason_id=maintenance.id, created_by_id=test_member.id
+            ))
+            db.session.commit()
+            temp_reason = BlockReasonFactory(name='Regen', is_temporary=True)
+            blocks, error = BlockService.create_multi_court_blocks(
+                [court_id], date(2026, 12, 6), time(10, 0), time(12, 0),
+                temp_reason.id, 'Platz nass', test_member.id
+            )
+            assert error is None
+
+        with client:
+            client.post('/auth/login', data={
+                'email': test_member.email,
+                'password': 'password123'
+            })
+            data = client.get('/api/courts/availability/range?start=2026-12-05&days=3').get_json()
+
+        court_data = next(c for c in data['days']['2026-12-06']['courts'] if c['court_id'] == court_id)
+        slots = {slot['time']: slot for slot in court_data['occupied']}
+
+        assert slots['10:00']['status'] == 'blocked_temporary'
+        assert slots['10:00']['details']['reason'] == 'Regen'
+        assert slots['10:00']['details']['details'] == 'Platz nass'
+        suspended = slots['10:00']['details']['suspended_reservation']
+        assert suspended['booked_for_id'] == test_member.id
+        assert suspended['can_cancel'] is True
+
+        assert slots['11:00']['status'] == 'blocked_temporary'
+        assert slots['11:00']['details']['underlying_block']['reason'] == 'Maintenance'
+
+
+class TestAvailabilityConditionalRequests:
+    """Test ETag / If-None-Match support of the availability API."""
+
+    def _book(self, app, member_id, court_number, booking_date, hour):
+        from app.services.reservation_service import ReservationService
+        with app.app_context():
+            court = Court.query.filter_by(number=court_number).first()
+            reservation, error, _ = ReservationService.create_reservation(
+                court.id, booking_date, time(hour, 0), member_id, member_id
+            )
+            assert error is None
+            return reservation.id
+
+    def test_day_returns_etag_and_revalidation_headers(self, client):
+        """Test day endpoint sends an ETag that clients must revalidate."""
+        response = client.get('/api/courts/availability?date=2026-12-05')
+        assert response.status_code == 200
+        assert response.headers.get('ETag')
+        assert response.headers['Cache-Control'] == 'private, max-age=0, must-revalidate'
+        assert 'no-store' not in response.headers['Cache-Control']
+
+    def test_day_answers_matching_if_none_match_with_304(self, client):
+        """Test unchanged day returns 304 without a body."""
+        first = client.get('/api/courts/availability?date=2026-12-05')
+        etag = first.headers['ETag']
+
+        response = client.get('/api/courts/availability?date=2026-12-05',
+                              headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+    def test_day_etag_changes_after_reservation(self, app, client, test_member):
+        """Test a reservation on the date invalidates the ETag."""
+        etag = client.get('/api/courts/availability?date=2026-12-05').headers['ETag']
+
+        self._book(app, test_member.id, 1, date(2026, 12, 5), 10)
+
+        response = client.get('/api/courts/availability?date=2026-12-05',
+                              headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_day_etag_differs_between_viewers(self, app, client, test_member):
+        """Test anonymous and member views of the same date have different ETags."""
+        self._book(app, test_member.id, 1, date(2026, 12, 5), 10)
+        anonymous_etag = client.get('/api/courts/availability?date=2026-12-05').headers['ETag']
+
+        with client:
+            client.post('/auth/login', data={
+                'email': test_member.email,
+                'password': 'password123'
+            })
+            response = client.get('/api/courts/availability?date=2026-12-05',
+                                  headers={'If-None-Match': anonymous_etag})
+            assert response.status_code == 200
+            assert response.headers['ETag'] != anonymous_etag
+
+    def test_version_is_bumped_per_date(self, app, test_member):
+        """Test writes bump only the versions of the affected date."""
+        from app.services.availability_cache_service import AvailabilityCacheService
+
+        with app.app_context():
+            before = AvailabilityCacheService.get_versions([date(2026, 12, 5), date(2026, 12, 6)])
+
+        self._book(app, test_member.id, 1, date(2026, 12, 5), 10)
+
+        with app.app_context():
+            after = AvailabilityCacheService.get_versions([date(2026, 12, 5), date(2026, 12, 6)])
+
+        assert after[date(2026, 12, 5)] != before[date(2026, 12, 5)]
+        assert after[date(2026, 12, 6)] == before[date(2026, 12, 6)]
+
+    def test_range_answers_matching_if_none_match_with_304(self, client):
+        """Test unchanged range returns 304."""
+        url = '/api/courts/availability/range?start=2026-12-05&days=3'
+        etag = client.get(url).headers['ETag']
+
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_range_reports_changed_days(self, app, client, test_member):
+        """Test range with known day tags returns only the changed days in full."""
+        url = '/api/courts/availability/range?start=2026-12-05&days=3'
+        data = client.get(url).get_json()
+        assert data['changed_days'] == ['2026-12-05', '2026-12-06', '2026-12-07']
+        known = ','.join(day['etag'] for day in data['days'].values())
+
+        self._book(app, test_member.id, 1, date(2026, 12, 6), 10)
+
+        data = client.get(f'{url}&known={known}').get_json()
+        assert data['changed_days'] == ['2026-12-06']
+        assert data['days']['2026-12-05'] == {
+            'etag': data['days']['2026-12-05']['etag'], 'unchanged': True
+        }
+        assert 'courts' in data['days']['2026-12-06']
+        assert data['days']['2026-12-06']['etag'] not in known.split(',')
+
+
+@pytest.mark.usefixtures('availability_cache')
+class TestPublicAvailability:
+    """Test the publicly cacheable anonymous availability endpoint."""
+
+    def _book(self, app, member_id, hour):
+        from app.services.reservation_service import ReservationService
+        with app.app_context():
+            court = Court.query.filter_by(number=1).first()
+            _, error, _ = ReservationService.create_reservation(
+                court.id, date(2026, 12, 5), time(hour, 0), member_id, member_id
+            )
+            assert error is None
+
+    def test_public_availability_is_cacheable(self, client):
+        """Test the response may be stored by shared caches."""
+        response = client.get('/api/courts/availability/public?date=2026-12-05')
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'public, max-age=30'
+        assert 'Pragma' not in response.headers
+        assert response.headers.get('ETag')
+        assert 'Cookie' not in response.headers.get('Vary', '')
+
+    def test_public_availability_hides_member_details(self, app, client, test_member):
+        """Test bookings are shown as reserved without details."""
+        self._book(app, test_member.id, 10)
+
+        data = client.get('/api/courts/availability/public?date=2026-12-05').get_json()
+        court_data = next(c for c in data['courts'] if c['court_number'] == 1)
+        assert court_data['occupied'] == [{'time': '10:00', 'status': 'reserved', 'details': None}]
+        assert test_member.id not in json.dumps(data)
+
+    def test_public_body_is_shared_until_date_changes(self, app, client, test_member):
+        """Test the pre-rendered body is reused and rebuilt after a write."""
+        url = '/api/courts/availability/public?date=2026-12-05'
+        first = client.get(url)
+        assert client.get(url).data == first.data
+
+        response = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+        assert response.status_code == 304
+        assert response.headers['Cache-Control'] == 'public, max-age=30'
+
+        self._book(app, test_member.id, 11)
+
+        response = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != first.headers['ETag']
+        assert '"11:00"' in response.get_data(as_text=True)
+
+    def test_public_availability_validates_date(self, client):
+        """Test invalid dates are rejected."""
+        response = client.get('/api/courts/availability/public?date=invalid')
+        assert response.status_code == 400
+
+
+class TestCompactRangeFormat:
+    """Test the compact columnar format of the range endpoint."""
+
+    URL = '/api/courts/availability/range?start=2026-12-05&days=3'
+
+    def _setup(self, app, member_id, admin_id):
+        with app.app_context():
+            court_1 = Court.query.filter_by(number=1).first()
+            court_2 = Court.query.filter_by(number=2).first()
+            reason = BlockReason.query.filter_by(name='Maintenance').first()
+            for day in (5, 6):
+                db.session.add(Reservation(
+                    court_id=court_1.id, date=date(2026, 12, day), start_time=time(10, 0),
+                    end_time=time(11, 0), booked_for_id=member_id, booked_by_id=member_id,
+                    status='active'
+                ))
+            db.session.add(Block(
+                court_id=court_2.id, date=date(2026, 12, 5), start_time=time(8, 0),
+                end_time=time(10, 0), reason_id=reason.id, details='Linien',
+                created_by_id=admin_id
+            ))
+            db.session.commit()
+
+    def test_compact_format_encodes_days(self, app, client, test_member, test_admin):
+        """Test status arrays and shared member and block tables."""
+        self._setup(app, test_member.id, test_admin.id)
+
+        with client:
+            client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+            data = client.get(f'{self.URL}&format=compact').get_json()
+
+        assert data['format'] == 'compact'
+        assert data['first_hour'] == 8
+        assert data['status_codes'][1] == 'reserved'
+        assert [court[1] for court in data['courts']] == [1, 2, 3, 4, 5, 6]
+
+        # The member appears once although booked on two days
+        assert len(data['members']) == 1
+        assert data['members'][0][0] == test_member.id
+
+        day = data['days']['2026-12-05']
+        assert day['status'][0][10 - 8] == 1
+        assert day['status'][1][:3] == [3, 3, 0]
+        reservation = day['reservations'][0]
+        assert reservation[:2] == [0, 10]
+        assert reservation[3] == reservation[4] == 0
+        assert day['block_slots'] == [[1, 8, 0, None], [1, 9, 0, None]]
+        assert data['blocks'][0][1:] == ['Maintenance', 'Linien', False]
+        assert data['days']['2026-12-07']['reservations'] == []
+
+    def test_compact_format_via_accept_header(self, app, client, test_member, test_admin):
+        """Test the format can be negotiated and hides members from anonymous viewers."""
+        self._setup(app, test_member.id, test_admin.id)
+
+        response = client.get(self.URL, headers={'Accept': 'application/vnd.availability.compact+json'})
+        data = response.get_json()
+
+        assert data['format'] == 'compact'
+        assert data['members'] == []
+        assert data['days']['2026-12-05']['reservations'] == []
+        assert data['days']['2026-12-05']['status'][0][2] == 1
+        assert 'Accept' in response.headers['Vary']
+
+    def test_formats_have_different_etags(self, client):
+        """Test a cached sparse body is not revalidated for a compact request."""
+        etag = client.get(self.URL).headers['ETag']
+        response = client.get(f'{self.URL}&format=compact', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+
+    def test_unknown_format_is_rejected(self, client):
+        """Test invalid format values."""
+        response = client.get(f'{self.URL}&format=xml')
+        assert response.status_code == 400
@@ -0,0 +1,92 @@
+"""Tests for the email worker pool against a local SMTP stand-in."""
+import socketserver
+import threading
+
+import pytest
+
+from app.services.email_service import EmailService
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib; records sessions and delivered messages."""
+
+    def handle(self):
+        server = self.server
+        server.sessions += 1
+        self.wfile.write(b'220 localhost ready\r\n')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                self.wfile.write(b'250 localhost\r\n')
+            elif command == 'DATA':
+                self.wfile.write(b'354 go ahead\r\n')
+                data = []
+                while (line := self.rfile.readline()) not in (b'.\r\n', b''):
+                    data.append(line)
+                if server.failures:
+                    server.failures -= 1
+                    self.wfile.write(b'451 try again later\r\n')
+                else:
+                    server.messages.append(b''.join(data))
+                    self.wfile.write(b'250 queued\r\n')
+            elif command == 'QUIT':
+                self.wfile.write(b'221 bye\r\n')
+                return
+            else:
+                self.wfile.write(b'250 ok\r\n')
+
+
+@pytest.fixture
+def smtp_server(app):
+    """A local SMTP server the app's mail backend is pointed at."""
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.sessions, server.messages, server.failures = 0, [], 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    mailman = app.extensions['mailman']
+    mailman.backend, mailman.server, mailman.port = 'smtp', '127.0.0.1', server.server_address[1]
+    mailman.use_tls = mailman.use_ssl = False
+    app.config.update(MAIL_USERNAME='club@example.com', MAIL_WORKERS=1, MAIL_RETRY_SECONDS=0)
+
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestMailWorkerPool:
+    """EmailService._send_email through the worker pool."""
+
+    def test_emails_share_one_session(self, app, smtp_server):
+        """A burst of emails is sent over one SMTP session."""
+        with app.app_context():
+            for index in range(5):
+                assert EmailService._send_email(f'member{index}@example.com', 'Betreff', 'Text')
+            EmailService.flush()
+
+        assert len(smtp_server.messages) == 5
+        assert smtp_server.sessions == 1
+
+    def test_sessions_are_renewed_after_a_number_of_messages(self, app, smtp_server):
+        """No session carries more than MAIL_MESSAGES_PER_CONNECTION messages."""
+        app.config['MAIL_MESSAGES_PER_CONNECTION'] = 2
+        with app.app_context():
+            for index in range(5):
+                EmailService._send_email(f'member{index}@example.com', 'Betreff', 'Text')
+            EmailService.flush()
+
+        assert len(smtp_server.messages) == 5
+        assert smtp_server.sessions == 3
+
+    def test_failed_send_is_retried(self, app, smtp_server):
+        """A temporary rejection is retried on a fresh session."""
+        smtp_server.failures = 1
+        with app.app_context():
+            EmailService._send_email('member@example.com', 'Betreff', 'Text')
+            EmailService.flush()
+
+        assert len(smtp_server.messages) == 1
+        assert smtp_server.sessions == 2
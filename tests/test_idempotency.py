@@ -0,0 +1,125 @@
+"""Tests for Idempotency-Key support on reservation writes."""
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from app import db
+from app.models import IdempotencyKey, Reservation
+from app.services.validation_service import ValidationService
+
+
+FUTURE_DATE = date.today() + timedelta(days=3)
+BOOKING = {'court_id': 1, 'date': FUTURE_DATE.isoformat(), 'start_time': '10:00'}
+
+
+def _login(client, member):
+    client.post('/auth/login', data={'email': member.email, 'password': 'password123'})
+
+
+class TestCreateReplay:
+    """POST /api/reservations/ with an Idempotency-Key."""
+
+    def test_retry_gets_the_original_response(self, app, client, test_member):
+        """The retry is answered from the store without validating again."""
+        _login(client, test_member)
+        headers = {'Idempotency-Key': 'booking-1'}
+
+        first = client.post('/api/reservations/', json=BOOKING, headers=headers)
+        assert first.status_code == 201
+
+        with patch.object(ValidationService, 'validate_all_booking_constraints') as validate:
+            retry = client.post('/api/reservations/', json=BOOKING, headers=headers)
+
+        assert not validate.called
+        assert retry.status_code == 201
+        assert retry.get_json() == first.get_json()
+        assert retry.headers['Idempotent-Replayed'] == 'true'
+        with app.app_context():
+            assert Reservation.query.count() == 1
+
+    def test_key_reused_for_another_booking_is_rejected(self, client, test_member):
+        """A key belongs to one request body."""
+        _login(client, test_member)
+        headers = {'Idempotency-Key': 'booking-2'}
+        client.post('/api/reservations/', json=BOOKING, headers=headers)
+
+        response = client.post('/api/reservations/', json=dict(BOOKING, start_time='11:00'), headers=headers)
+        assert response.status_code == 422
+
+    def test_errors_are_not_replayed(self, client, test_member):
+        """A failed request runs again on retry."""
+        _login(client, test_member)
+        headers = {'Idempotency-Key': 'booking-3'}
+        invalid = dict(BOOKING, start_time='10:30')
+
+        assert client.post('/api/reservations/', json=invalid, headers=headers).status_code == 400
+        retry = client.post('/api/reservations/', json=invalid, headers=headers)
+        assert retry.status_code == 400
+        assert 'Idempotent-Replayed' not in retry.headers
+
+
+class TestCancelReplay:
+    """DELETE /api/reservations/<id> with an Idempotency-Key."""
+
+    def test_retried_cancellation_succeeds(self, client, test_member):
+        """The retry reports the cancellation instead of an error."""
+        _login(client, test_member)
+        reservation_id = client.post('/api/reservations/', json=BOOKING).get_json()['reservation']['id']
+        headers = {'Idempotency-Key': 'cancel-1'}
+
+        assert client.delete(f'/api/reservations/{reservation_id}', headers=headers).status_code == 200
+        retry = client.delete(f'/api/reservations/{reservation_id}', headers=headers)
+
+        assert retry.status_code == 200
+        assert retry.get_json() == {'message': 'Buchung erfolgreich storniert'}
+
+
+class TestStore:
+    """IdempotencyService key lifetime."""
+
+    def test_keys_expire(self, app, test_member):
+        """Expired keys start over and are pruned."""
+        from app.services.idempotency_service import BEGIN_NEW, BEGIN_REPLAY, IdempotencyService
+
+        with app.test_request_context():
+            scope = (test_member.id, 'POST', '/api/reservations/', 'a')
+            assert IdempotencyService.begin(scope, 'body')[0] == BEGIN_NEW
+            IdempotencyService.complete(scope, 201, b'{}', 'application/json')
+            assert IdempotencyService.begin(scope, 'body')[0] == BEGIN_REPLAY
+
+            app.config['IDEMPOTENCY_TTL_SECONDS'] = -1
+            IdempotencyService.complete(scope, 201, b'{}', 'application/json')
+            IdempotencyService.prune()
+            assert IdempotencyKey.query.count() == 0
+            assert IdempotencyService.begin(scope, 'body')[0] == BEGIN_NEW
+
+    def test_running_request_holds_the_key_for_the_lease_only(self, app, test_member):
+        """A key whose request died is free after the lease; a stored response lasts the TTL."""
+        from app.services.idempotency_service import BEGIN_IN_PROGRESS, BEGIN_NEW, BEGIN_REPLAY, IdempotencyService
+
+        with app.test_request_context():
+            scope = (test_member.id, 'POST', '/api/reservations/', 'c')
+            assert IdempotencyService.begin(scope, 'body')[0] == BEGIN_NEW
+            assert IdempotencyService.begin(scope, 'body')[0] == BEGIN_IN_PROGRESS
+            lease_end = IdempotencyKey.query.one().expires_at
+            assert lease_end < datetime.utcnow() + timedelta(minutes=10)
+
+            app.config['IDEMPOTENCY_LEASE_SECONDS'] = -1
+            IdempotencyService.release(scope)
+            assert IdempotencyService.begin(scope, 'body')[0] == BEGIN_NEW
+            assert IdempotencyService.begin(scope, 'body')[0] == BEGIN_NEW
+
+            IdempotencyService.complete(scope, 201, b'{}', 'application/json')
+            assert IdempotencyKey.query.one().expires_at > datetime.utcnow() + timedelta(hours=23)
+            assert IdempotencyService.begin(scope, 'body')[0] == BEGIN_REPLAY
+
+    def test_keys_are_shared_between_processes(self, app, test_member):
+        """A retry is recognised from the database, not from process memory."""
+        from app.services.idempotency_service import BEGIN_IN_PROGRESS, BEGIN_NEW, IdempotencyService
+
+        with app.test_request_context():
+            scope = (test_member.id, 'POST', '/api/reservations/', 'b')
+            assert IdempotencyService.begin(scope, 'body')[0] == BEGIN_NEW
+            db.session.remove()
+
+            assert IdempotencyService.begin(scope, 'body')[0] == BEGIN_IN_PROGRESS
+            assert IdempotencyKey.query.one().status_code is None
@@ -0,0 +1,135 @@
+"""Tests for coalescing block notifications into per-member digests."""
+from datetime import datetime, time
+from unittest.mock import patch
+
+from app import db
+from app.models import BlockReason, DeviceToken, NotificationDigestItem, OutboxEvent
+from app.services.block_service import BlockService
+from app.services.email_service import EmailService
+from app.services.outbox_service import OutboxService
+from app.services.push_notification_service import PushNotificationService
+from tests.factories import FUTURE_DATE, MemberFactory, book, get_court_id
+
+
+def _book(court_number, hour, member):
+    book(court_number, hour, member)
+    # Deliver the booking's own notifications, which the worker would send
+    OutboxService.process_pending()
+
+
+def _temporary_reason():
+    reason = BlockReason.query.filter_by(name='Weather').first()
+    reason.is_temporary = True
+    db.session.commit()
+    return reason
+
+
+def _block(court_numbers, reason, admin, hours=(8, 12)):
+    blocks, error = BlockService.create_multi_court_blocks(
+        [get_court_id(number) for number in court_numbers], FUTURE_DATE, time(hours[0], 0), time(hours[1], 0),
+        reason.id, 'Regen', admin.id, confirm=True
+    )
+    assert error is None
+    return blocks
+
+
+class TestDigest:
+    """Block changes reach each member as one digest."""
+
+    def test_multi_court_block_sends_one_email(self, app):
+        """Suspensions on several courts are listed in one email."""
+        with app.app_context():
+            admin = MemberFactory(admin=True)
+            member = MemberFactory(email_verified=True)
+            _book(1, 9, member)
+            _book(2, 10, member)
+            reason = _temporary_reason()
+
+            with patch.object(EmailService, '_send_email', return_value=True) as send_email:
+                _block((1, 2), reason, admin)
+
+            assert [call.args[0] for call in send_email.call_args_list] == [member.email]
+            body = send_email.call_args.args[2]
+            assert 'Ausgesetzt - Platz 1' in body and 'Ausgesetzt - Platz 2' in body
+            assert NotificationDigestItem.query.count() == 0
+
+    def test_changes_within_the_window_share_a_digest(self, app):
+        """Blocks created in a row are held back and sent together."""
+        app.config['NOTIFICATION_DIGEST_SECONDS'] = 60
+        with app.app_context():
+            admin = MemberFactory(admin=True)
+            member = MemberFactory(email_verified=True)
+            _book(3, 9, member)
+            _book(4, 15, member)
+            reason = _temporary_reason()
+
+            with patch.object(EmailService, '_send_email', return_value=True) as send_email:
+                _block((3,), reason, admin)
+                _block((4,), reason, admin, hours=(14, 16))
+                assert not send_email.called
+
+                events = OutboxEvent.query.filter_by(event_type='notification_digest').all()
+                assert len(events) == 1
+                events[0].available_at = datetime.utcnow()
+                db.session.commit()
+                OutboxService.process_pending()
+
+            assert send_email.call_count == 1
+            assert 'an 2 deiner Buchungen' in send_email.call_args.args[2]
+
+    def test_lifted_suspension_is_not_reported(self, app):
+        """A suspension lifted within the window was never news: nothing is sent."""
+        app.config['NOTIFICATION_DIGEST_SECONDS'] = 60
+        with app.app_context():
+            admin = MemberFactory(admin=True)
+            member = MemberFactory(email_verified=True)
+            _book(5, 9, member)
+            blocks = _block((5,), _temporary_reason(), admin)
+
+            success, error = BlockService.delete_batch(blocks[0].batch_id, admin.id)
+            assert success, error
+            event = OutboxEvent.query.filter_by(event_type='notification_digest').one()
+            event.available_at = datetime.utcnow()
+            db.session.commit()
+
+            with patch.object(EmailService, '_send_email', return_value=True) as send_email, \
+                    patch.object(PushNotificationService, '_send_push_async') as send_push:
+                OutboxService.process_pending()
+
+            assert not send_email.called
+            assert not send_push.called
+            assert NotificationDigestItem.query.count() == 0
+
+    def test_preferences_are_honoured(self, app):
+        """Members who opted out get neither the email nor the push."""
+        with app.app_context():
+            admin = MemberFactory(admin=True)
+            member = MemberFactory(email_verified=True, notify_own_bookings=False, push_notify_court_blocked=False)
+            db.session.add(DeviceToken(member_id=member.id, token='device-1'))
+            db.session.commit()
+            _book(6, 9, member)
+
+            with patch.object(EmailService, '_send_email', return_value=True) as send_email, \
+                    patch.object(PushNotificationService, '_send_push_async') as send_push:
+                _block((6,), _temporary_reason(), admin)
+
+            assert not send_email.called
+            assert not send_push.called
+
+    def test_one_push_for_several_changes(self, app):
+        """The push covers all changes of the digest."""
+        with app.app_context():
+            admin = MemberFactory(admin=True)
+            member = MemberFactory(email_verified=True)
+            db.session.add(DeviceToken(member_id=member.id, token='device-2'))
+            db.session.commit()
+            _book(1, 18, member)
+            _book(2, 19, member)
+
+            with patch.object(PushNotificationService, '_send_push_async') as send_push:
+                _block((1, 2), _temporary_reason(), admin, hours=(17, 21))
+
+            assert send_push.call_count == 1
+            token, payload, _ = send_push.call_args.args
+            assert token == 'device-2'
+            assert payload['type'] == 'bookings_changed'
@@ -0,0 +1,75 @@
+"""Tests for resolving notification recipients in one query."""
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import Court, DeviceToken, Reservation
+from app.services.notification_recipient_service import NotificationRecipientService
+from app.services.push_notification_service import PushNotificationService
+from app.services.reservation_service import ReservationService
+from tests.factories import MemberFactory
+
+
+FUTURE_DATE = date.today() + timedelta(days=3)
+
+
+def _add_token(member, token, is_active=True):
+    db.session.add(DeviceToken(member_id=member.id, token=token, is_active=is_active))
+
+
+class TestResolve:
+    """NotificationRecipientService.resolve."""
+
+    def test_members_and_active_tokens_in_one_query(self, app, count_queries):
+        """Inactive tokens are left out, members without devices get none."""
+        with app.app_context():
+            with_devices, without_devices = MemberFactory(), MemberFactory()
+            _add_token(with_devices, 'phone')
+            _add_token(with_devices, 'tablet')
+            _add_token(with_devices, 'old-phone', is_active=False)
+            db.session.commit()
+            member_ids = [with_devices.id, without_devices.id]
+            db.session.expire_all()
+
+            with count_queries() as statements:
+                recipients = NotificationRecipientService.resolve(member_ids + ['unknown-member', None])
+                push_enabled = [r.member.push_notifications_enabled for r in recipients.values()]
+
+            assert len(statements) == 1
+            assert push_enabled == [True, True]
+            assert sorted(recipients[member_ids[0]].tokens) == ['phone', 'tablet']
+            assert recipients[member_ids[1]].tokens == []
+            assert 'unknown-member' not in recipients
+
+
+class TestPushFanOut:
+    """Push senders use the resolved recipients."""
+
+    def test_booking_for_another_member_notifies_both_devices(self, app, count_queries):
+        """Both parties' devices are reached with one lookup."""
+        with app.app_context():
+            booker = MemberFactory(email_verified=True)
+            player = MemberFactory(email_verified=True)
+            _add_token(booker, 'booker-phone')
+            _add_token(player, 'player-phone')
+            db.session.commit()
+            court_id = Court.query.filter_by(number=1).first().id
+            reservation, error, _ = ReservationService.create_reservation(
+                court_id, FUTURE_DATE, time(10, 0), player.id, booker.id
+            )
+            assert error is None
+            reservation_id = reservation.id
+            db.session.expire_all()
+            reservation = Reservation.query.options(
+                joinedload(Reservation.court)
+            ).filter_by(id=reservation_id).one()
+
+            with count_queries() as statements, \
+                    patch.object(PushNotificationService, '_send_push_async') as send_push:
+                PushNotificationService.send_bookings_created_push([reservation])
+
+            assert len(statements) == 1
+            sent = {call.args[0]: call.args[1]['aps']['alert']['title'] for call in send_push.call_args_list}
+            assert sent == {'player-phone': 'Neue Buchung fuer dich', 'booker-phone': 'Buchungsbestaetigung'}
@@ -0,0 +1,139 @@
+"""Tests for the transactional outbox of booking side effects."""
+from datetime import date, datetime, time, timedelta
+from unittest.mock import patch
+
+from app import db
+from app.models import Court, OutboxEvent, ReservationAuditLog
+from app.services.email_service import EmailService
+from app.services.outbox_service import OutboxService
+from app.services.reservation_service import ReservationService
+from tests.factories import MemberFactory
+
+
+FUTURE_DATE = date.today() + timedelta(days=3)
+
+
+def _book(member, court_number=1, hour=10):
+    court_id = Court.query.filter_by(number=court_number).first().id
+    return ReservationService.create_reservation(court_id, FUTURE_DATE, time(hour, 0), member.id, member.id)
+
+
+class TestBookingEvents:
+    """Bookings record their side effects in the outbox."""
+
+    def test_booking_side_effects_are_delivered(self, app):
+        """Email, push and audit events are committed with the booking and delivered."""
+        with app.app_context():
+            member = MemberFactory()
+            reservation, error, _ = _book(member)
+
+            assert error is None
+            assert {event.status for event in OutboxEvent.query} == {'pending'}
+            with patch.object(EmailService, 'send_bookings_created') as send_emails:
+                assert OutboxService.process_pending() == 3
+
+            events = {event.event_type: event for event in OutboxEvent.query}
+            assert set(events) == {'bookings_created_email', 'bookings_created_push', 'reservation_audit'}
+            assert all(event.status == 'done' and event.attempts == 1 for event in events.values())
+            assert [r.id for r in send_emails.call_args.args[0]] == [reservation.id]
+            audit = ReservationAuditLog.query.filter_by(operation='create').one()
+            assert audit.reservation_id == str(reservation.id)
+
+    def test_rejected_booking_leaves_no_events(self, app):
+        """Nothing is recorded for a booking that wasn't committed."""
+        with app.app_context():
+            member, other = MemberFactory(), MemberFactory()
+            _book(other)
+            OutboxEvent.query.delete()
+            db.session.commit()
+
+            reservation, error, _ = _book(member)
+
+            assert reservation is None
+            assert OutboxEvent.query.count() == 0
+
+
+    def test_commit_wakes_the_worker(self, app):
+        """The booking leaves delivery to the worker, woken by its commit."""
+        with app.app_context():
+            app.config['OUTBOX_WORKER_ENABLED'] = True
+            member = MemberFactory()
+            with patch('app.services.outbox_service._get_worker') as get_worker, \
+                    patch.object(OutboxService, 'process_pending') as process_pending:
+                reservation, error, _ = _book(member)
+
+            assert error is None
+            get_worker.return_value.wake.assert_called_once_with()
+            assert not process_pending.called
+
+
+class TestBookingResponse:
+    """The booking's response is built without reloading it."""
+
+    def test_committed_reservation_needs_no_queries(self, app, count_queries):
+        """Court and members loaded for the booking serve the response."""
+        with app.app_context():
+            booker, player = MemberFactory(), MemberFactory()
+            court_id = Court.query.filter_by(number=2).first().id
+            reservation, error, _ = ReservationService.create_reservation(
+                court_id, FUTURE_DATE, time(11, 0), player.id, booker.id
+            )
+            assert error is None
+
+            with count_queries() as statements:
+                data = reservation.to_dict()
+
+            assert statements == []
+            assert (data['court_number'], data['booked_for'], data['booked_by']) == (2, player.name, booker.name)
+
+    def test_unknown_court_is_rejected(self, app):
+        """A court that doesn't exist is reported as such."""
+        with app.app_context():
+            member = MemberFactory()
+            reservation, error, _ = ReservationService.create_reservation(
+                999, FUTURE_DATE, time(11, 0), member.id, member.id
+            )
+
+            assert reservation is None
+            assert error == 'Platz nicht gefunden'
+
+
+class TestRetries:
+    """Failed events are retried with backoff."""
+
+    def test_failed_event_is_retried(self, app):
+        """A handler error reschedules the event until it is delivered."""
+        with app.app_context():
+            member = MemberFactory()
+            _book(member)
+            with patch.object(EmailService, 'send_bookings_created', side_effect=RuntimeError('SMTP down')):
+                OutboxService.process_pending()
+
+            event = OutboxEvent.query.filter_by(event_type='bookings_created_email').one()
+            assert event.status == 'pending'
+            assert event.last_error == 'SMTP down'
+            assert event.available_at > datetime.utcnow() + timedelta(seconds=20)
+
+            assert OutboxService.process_pending() == 0
+
+            event.available_at = datetime.utcnow()
+            db.session.commit()
+            with patch.object(EmailService, 'send_bookings_created') as send_emails:
+                assert OutboxService.process_pending() == 1
+
+            assert send_emails.called
+            event = db.session.get(OutboxEvent, event.id)
+            assert (event.status, event.attempts, event.last_error) == ('done', 2, None)
+
+    def test_event_fails_after_max_attempts(self, app):
+        """The last failed attempt marks the event failed."""
+        with app.app_context():
+            app.config['OUTBOX_MAX_ATTEMPTS'] = 1
+            OutboxService.enqueue('unknown_event', {})
+            db.session.commit()
+
+            OutboxService.process_pending()
+
+            event = OutboxEvent.query.one()
+            assert event.status == 'failed'
+            assert event.last_error == 'Unknown outbox event type: unknown_event'
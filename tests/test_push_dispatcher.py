@@ -0,0 +1,134 @@
+"""Tests for the process-wide APNs push dispatcher."""
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from app import db
+from app.models import DeviceToken
+from app.services.push_notification_service import PushNotificationService, _get_dispatcher
+from tests.factories import MemberFactory
+
+
+PAYLOAD = {'aps': {'alert': {'title': 'Test', 'body': 'Test'}}}
+
+
+def _response(status_code):
+    return MagicMock(status_code=status_code, text='')
+
+
+class TestPushDispatcher:
+    """Queued pushes over one HTTP/2 connection."""
+
+    def test_pushes_share_one_connection(self, app):
+        """Many pushes open the connection once."""
+        app.config['PUSH_WORKERS'] = 2
+        with app.app_context(), \
+                patch.object(PushNotificationService, '_get_apns_token', return_value='jwt'), \
+                patch('httpx.Client') as client_class:
+            client_class.return_value.post.return_value = _response(200)
+
+            for index in range(5):
+                assert PushNotificationService._send_push_async(f'token-{index}', PAYLOAD, app)
+            _get_dispatcher(app).queue.join()
+
+            assert client_class.call_count == 1
+            assert client_class.call_args.kwargs['http2'] is True
+            assert client_class.return_value.post.call_count == 5
+
+    def test_transport_error_reconnects(self, app):
+        """A broken connection is replaced on the next push."""
+        app.config['PUSH_WORKERS'] = 1
+        with app.app_context(), \
+                patch.object(PushNotificationService, '_get_apns_token', return_value='jwt'), \
+                patch('httpx.Client') as client_class:
+            client_class.return_value.post.side_effect = [httpx.ConnectError('reset'), _response(200)]
+
+            PushNotificationService._send_push_async('token-a', PAYLOAD, app)
+            PushNotificationService._send_push_async('token-b', PAYLOAD, app)
+            _get_dispatcher(app).queue.join()
+
+            assert client_class.call_count == 2
+            assert client_class.return_value.close.called
+
+    def test_full_queue_drops_pushes(self, app):
+        """Callers are not held up indefinitely by a backlog."""
+        app.config.update(PUSH_WORKERS=0, PUSH_QUEUE_SIZE=1, PUSH_ENQUEUE_TIMEOUT_SECONDS=0)
+        with app.app_context():
+            assert PushNotificationService._send_push_async('token-a', PAYLOAD, app)
+            assert not PushNotificationService._send_push_async('token-b', PAYLOAD, app)
+
+    def test_gone_token_is_deactivated(self, app):
+        """APNs answering 410 deactivates the device token."""
+        app.config['PUSH_WORKERS'] = 0
+        with app.app_context(), \
+                patch.object(PushNotificationService, '_get_apns_token', return_value='jwt'), \
+                patch('httpx.Client') as client_class:
+            member = MemberFactory()
+            db.session.add(DeviceToken(member_id=member.id, token='gone-token'))
+            db.session.commit()
+            client_class.return_value.post.return_value = _response(410)
+
+            dispatcher = _get_dispatcher(app)
+            assert dispatcher._send('gone-token', PAYLOAD) is False
+            dispatcher.flush()
+
+            assert DeviceToken.query.filter_by(token='gone-token').one().is_active is False
+
+
+class TestDeliveryResults:
+    """Per-token outcomes are counted and written in batches."""
+
+    def test_results_are_written_in_one_transaction(self, app):
+        """Accepted tokens get last_used_at, gone tokens are deactivated together."""
+        app.config['PUSH_WORKERS'] = 0
+        with app.app_context(), \
+                patch.object(PushNotificationService, '_get_apns_token', return_value='jwt'), \
+                patch('httpx.Client') as client_class:
+            member = MemberFactory()
+            for token in ('live-token', 'gone-a', 'gone-b'):
+                db.session.add(DeviceToken(member_id=member.id, token=token))
+            db.session.commit()
+            client_class.return_value.post.side_effect = [_response(200), _response(410), _response(410)]
+            dispatcher = _get_dispatcher(app)
+            for token in ('live-token', 'gone-a', 'gone-b'):
+                dispatcher._send(token, PAYLOAD)
+
+            with patch.object(db.session, 'commit', wraps=db.session.commit) as commit:
+                dispatcher._write_results()
+                commits = commit.call_count
+
+            tokens = {t.token: t for t in DeviceToken.query.all()}
+            assert commits == 1
+            assert tokens['live-token'].last_used_at is not None and tokens['live-token'].is_active
+            assert not tokens['gone-a'].is_active and not tokens['gone-b'].is_active
+            assert member.has_active_device_tokens()
+
+    def test_delivery_counters(self, app):
+        """Sent, failed and invalid pushes are counted with their response times."""
+        app.config['PUSH_WORKERS'] = 1
+        with app.app_context(), \
+                patch.object(PushNotificationService, '_get_apns_token', return_value='jwt'), \
+                patch('httpx.Client') as client_class:
+            client_class.return_value.post.side_effect = [_response(200), _response(500), _response(410)]
+            for index in range(3):
+                PushNotificationService._send_push_async(f'token-{index}', PAYLOAD, app)
+            PushNotificationService.flush()
+
+            stats = PushNotificationService.get_delivery_stats()
+            assert (stats['sent'], stats['failed'], stats['invalid_tokens'], stats['dropped']) == (1, 1, 1, 0)
+            assert stats['pending_results'] == 0
+            assert stats['avg_latency_ms'] is not None
+
+    def test_admin_stats_endpoint(self, app, client, test_admin):
+        """Admins see the delivery counters and token totals."""
+        with app.app_context():
+            db.session.add(DeviceToken(member_id=test_admin.id, token='admin-phone'))
+            db.session.commit()
+        client.post('/auth/login', data={'email': test_admin.email, 'password': 'admin123'})
+
+        response = client.get('/api/admin/push/stats')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['device_tokens'] == {'active': 1, 'inactive': 0}
+        assert data['delivery']['sent'] == 0
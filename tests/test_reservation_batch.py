@@ -0,0 +1,156 @@
+"""Tests for booking several slots in one transaction."""
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from app.models import Court, Reservation, ReservationAuditLog
+from app.services.email_service import EmailService
+from app.services.reservation_service import ReservationService
+from tests.factories import MemberFactory
+
+
+FUTURE_DATE = date.today() + timedelta(days=4)
+
+
+def _court_ids():
+    return [court.id for court in Court.query.order_by(Court.number)]
+
+
+class TestCreateReservations:
+    """ReservationService.create_reservations."""
+
+    def test_consecutive_hours_are_booked_together(self, app):
+        """Both slots are committed with one audit entry each."""
+        with app.app_context():
+            member = MemberFactory()
+            court_id = _court_ids()[0]
+
+            reservations, failures, error = ReservationService.create_reservations(
+                [(court_id, FUTURE_DATE, time(10, 0)), (court_id, FUTURE_DATE, time(11, 0))],
+                member.id, member.id
+            )
+
+            assert error is None
+            assert failures == []
+            assert [r.start_time for r in reservations] == [time(10, 0), time(11, 0)]
+            assert ReservationAuditLog.query.filter_by(operation='create').count() == 2
+
+    def test_slots_of_the_batch_count_towards_the_limit(self, app):
+        """All or nothing: a batch over the limit books nothing."""
+        with app.app_context():
+            member = MemberFactory()
+            court_id = _court_ids()[0]
+            slots = [(court_id, FUTURE_DATE, time(hour, 0)) for hour in (10, 11, 12)]
+
+            reservations, failures, error = ReservationService.create_reservations(
+                slots, member.id, member.id
+            )
+
+            assert error is None
+            assert reservations == []
+            assert failures == [(2, 'Du hast bereits 2 aktive Buchungen.')]
+            assert Reservation.query.count() == 0
+
+    def test_best_effort_books_the_valid_slots(self, app):
+        """Best effort: conflicting slots are reported, the others booked."""
+        with app.app_context():
+            member, other = MemberFactory(), MemberFactory()
+            court_1, court_2 = _court_ids()[:2]
+            ReservationService.create_reservation(court_1, FUTURE_DATE, time(10, 0), other.id, other.id)
+
+            reservations, failures, error = ReservationService.create_reservations(
+                [(court_1, FUTURE_DATE, time(10, 0)), (court_2, FUTURE_DATE, time(10, 0)),
+                 (court_2, FUTURE_DATE, time(10, 0))],
+                member.id, member.id, atomic=False
+            )
+
+            assert error is None
+            assert [r.court_id for r in reservations] == [court_2]
+            assert failures == [
+                (0, 'Dieser Platz ist bereits für diese Zeit gebucht'),
+                (2, 'Dieser Platz ist bereits für diese Zeit gebucht')
+            ]
+
+    def test_one_email_per_recipient(self, app):
+        """Booking for someone else notifies each party once for the whole batch."""
+        with app.app_context():
+            admin = MemberFactory(admin=True, email_verified=True)
+            member = MemberFactory(email_verified=True)
+            court_1, court_2 = _court_ids()[:2]
+
+            with patch.object(EmailService, '_send_email', return_value=True) as send_email:
+                reservations, _, _ = ReservationService.create_reservations(
+                    [(court_1, FUTURE_DATE, time(10, 0)), (court_2, FUTURE_DATE, time(10, 0))],
+                    member.id, admin.id
+                )
+
+            assert len(reservations) == 2
+            recipients = [call.args[0] for call in send_email.call_args_list]
+            assert sorted(recipients) == sorted([member.email, admin.email])
+            assert 'Platz 1' in send_email.call_args_list[0].args[2]
+            assert 'Platz 2' in send_email.call_args_list[0].args[2]
+
+
+class TestBatchRoute:
+    """POST /api/reservations/batch."""
+
+    def test_members_cannot_book_recurring(self, client, test_member):
+        """Weekly repetition is reserved for teamsters and administrators."""
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+
+        response = client.post('/api/reservations/batch', json={
+            'slots': [{'court_id': 1, 'date': FUTURE_DATE.isoformat(), 'start_time': '10:00'}],
+            'repeat_weeks': 2
+        })
+        assert response.status_code == 403
+
+    def test_admin_books_weekly_slot_for_member(self, app, client, test_admin, test_member):
+        """The slot is repeated weekly for the member."""
+        client.post('/auth/login', data={'email': test_admin.email, 'password': 'admin123'})
+
+        response = client.post('/api/reservations/batch', json={
+            'slots': [{'court_id': 2, 'date': FUTURE_DATE.isoformat(), 'start_time': '18:00'}],
+            'booked_for_id': test_member.id,
+            'repeat_weeks': 2
+        })
+
+        assert response.status_code == 201
+        data = response.get_json()
+        assert [r['date'] for r in data['reservations']] == [
+            FUTURE_DATE.isoformat(), (FUTURE_DATE + timedelta(weeks=1)).isoformat()
+        ]
+        assert data['failed'] == []
+
+    def test_rejected_batch_reports_failed_slots(self, client, test_member):
+        """Nothing is booked and every failed slot is listed."""
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+        slot = {'court_id': 3, 'date': FUTURE_DATE.isoformat(), 'start_time': '10:00'}
+
+        response = client.post('/api/reservations/batch', json={'slots': [slot, slot]})
+
+        assert response.status_code == 400
+        data = response.get_json()
+        assert data['error'] == 'Dieser Platz ist bereits für diese Zeit gebucht'
+        assert data['failed'] == [dict(slot, error=data['error'])]
+
+    def test_unknown_court_is_rejected(self, client, test_member):
+        """Court IDs are checked against the courts that exist."""
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+
+        response = client.post('/api/reservations/batch', json={
+            'slots': [{'court_id': 99, 'date': FUTURE_DATE.isoformat(), 'start_time': '10:00'}]
+        })
+
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Platz nicht gefunden'
+
+    def test_unexpected_error_is_logged(self, client, test_member, caplog):
+        """Failures are logged before the generic error is returned."""
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+
+        with patch.object(ReservationService, 'create_reservations', side_effect=RuntimeError('kaputt')):
+            response = client.post('/api/reservations/batch', json={
+                'slots': [{'court_id': 1, 'date': FUTURE_DATE.isoformat(), 'start_time': '10:00'}]
+            })
+
+        assert response.status_code == 500
+        assert 'create_reservations_batch: kaputt' in caplog.text
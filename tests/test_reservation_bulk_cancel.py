@@ -0,0 +1,135 @@
+"""Tests for administrative bulk cancellation of reservations."""
+from datetime import datetime, time, timedelta
+from unittest.mock import patch
+
+from app.models import Reservation, ReservationAuditLog, MemberBookingCounter
+from app.services.block_service import BlockService
+from app.services.email_service import EmailService
+from app.services.outbox_service import OutboxService
+from app.services.reservation_service import ReservationService
+from tests.factories import FUTURE_DATE, BlockReasonFactory, MemberFactory, book, get_court_id
+
+
+def _book(court_number, hour, member, **kwargs):
+    reservation = book(court_number, hour, member, **kwargs)
+    # Deliver the booking's own notifications, which the worker would send
+    OutboxService.process_pending()
+    return reservation.id
+
+
+class TestCancelMatching:
+    """ReservationService.cancel_reservations_bulk."""
+
+    def test_only_matching_reservations_are_cancelled(self, app):
+        """Courts and hours narrow the range; each cancellation is audited."""
+        with app.app_context():
+            admin = MemberFactory(admin=True)
+            first, second = MemberFactory(), MemberFactory()
+            morning = _book(1, 10, first)
+            afternoon = _book(1, 15, second)
+            other_court = _book(2, 10, second)
+
+            cancelled, error = ReservationService.cancel_reservations_bulk(
+                FUTURE_DATE, FUTURE_DATE, 'Turnier', admin.id,
+                court_ids=[get_court_id(1)], start_time=time(8, 0), end_time=time(14, 0)
+            )
+
+            assert (cancelled, error) == (1, None)
+            statuses = {r.id: r.status for r in Reservation.query}
+            assert statuses == {morning: 'cancelled', afternoon: 'active', other_court: 'active'}
+            assert Reservation.query.get(morning).reason == 'Turnier'
+            audit = ReservationAuditLog.query.filter_by(operation='cancel').one()
+            assert audit.reservation_id == str(morning)
+            assert audit.operation_data['cancelled_by_admin'] is True
+            assert MemberBookingCounter.query.get(first.id) is None
+
+    def test_started_reservations_are_kept(self, app):
+        """A rain-out cancellation today leaves the running slot alone."""
+        with app.app_context():
+            admin, member = MemberFactory(admin=True), MemberFactory()
+            now = datetime.combine(FUTURE_DATE, time(10, 30))
+            earlier = now - timedelta(days=2)
+            running = _book(3, 10, member, current_time=earlier)
+            later = _book(3, 12, member, current_time=earlier)
+
+            cancelled, _ = ReservationService.cancel_reservations_bulk(
+                FUTURE_DATE, FUTURE_DATE, 'Regen', admin.id, current_time=now
+            )
+
+            assert cancelled == 1
+            assert Reservation.query.get(running).status == 'active'
+            assert Reservation.query.get(later).status == 'cancelled'
+
+    def test_suspended_reservations_are_cancelled(self, app):
+        """Reservations under a temporary block don't come back when it is lifted."""
+        with app.app_context():
+            admin, member = MemberFactory(admin=True), MemberFactory()
+            suspended = _book(5, 10, member)
+            blocks, error = BlockService.create_multi_court_blocks(
+                [get_court_id(5)], FUTURE_DATE, time(10, 0), time(11, 0),
+                BlockReasonFactory(is_temporary=True).id, None, admin.id
+            )
+            assert error is None
+            assert Reservation.query.get(suspended).status == 'suspended'
+
+            cancelled, _ = ReservationService.cancel_reservations_bulk(FUTURE_DATE, FUTURE_DATE, 'Turnier', admin.id)
+            BlockService.delete_batch(blocks[0].batch_id, admin.id)
+
+            assert cancelled == 1
+            assert Reservation.query.get(suspended).status == 'cancelled'
+            assert MemberBookingCounter.query.get(member.id) is None
+
+    def test_one_email_per_member(self, app):
+        """A member with several cancelled bookings gets them in one email."""
+        with app.app_context():
+            admin = MemberFactory(admin=True)
+            member = MemberFactory(email_verified=True)
+            _book(4, 10, member)
+            _book(4, 11, member)
+
+            with patch.object(EmailService, '_send_email', return_value=True) as send_email:
+                ReservationService.cancel_reservations_bulk(FUTURE_DATE, FUTURE_DATE, 'Turnier', admin.id)
+
+            assert [call.args[0] for call in send_email.call_args_list] == [member.email]
+            body = send_email.call_args.args[2]
+            assert '10:00 - 11:00' in body and '11:00 - 12:00' in body
+            assert 'Grund: Turnier' in body
+
+
+class TestBulkCancelRoute:
+    """POST /api/admin/reservations/cancel."""
+
+    def test_members_cannot_bulk_cancel(self, client, test_member):
+        """The route is for administrators only."""
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+
+        response = client.post('/api/admin/reservations/cancel', json={
+            'date_from': FUTURE_DATE.isoformat(), 'reason': 'Turnier'
+        })
+        assert response.status_code == 403
+
+    def test_admin_cancels_a_day(self, app, client, test_admin):
+        """The number of cancelled reservations is reported."""
+        with app.app_context():
+            member = MemberFactory()
+            _book(5, 9, member)
+            _book(6, 18, member)
+
+        client.post('/auth/login', data={'email': test_admin.email, 'password': 'admin123'})
+        response = client.post('/api/admin/reservations/cancel', json={
+            'date_from': FUTURE_DATE.isoformat(), 'reason': 'Regen'
+        })
+
+        assert response.status_code == 200
+        assert response.get_json()['cancelled'] == 2
+
+    def test_range_is_limited(self, client, test_admin):
+        """Overlong ranges are rejected."""
+        client.post('/auth/login', data={'email': test_admin.email, 'password': 'admin123'})
+
+        response = client.post('/api/admin/reservations/cancel', json={
+            'date_from': FUTURE_DATE.isoformat(),
+            'date_to': (FUTURE_DATE + timedelta(days=60)).isoformat(),
+            'reason': 'Saisonende'
+        })
+        assert response.status_code == 400
@@ -0,0 +1,117 @@
+"""Tests for the bitset slot-occupancy index."""
+from datetime import date, time
+from types import SimpleNamespace
+
+from app.utils.slot_occupancy import (
+    DayOccupancy,
+    GRID_MASK,
+    hour_range_mask,
+    iter_hours
+)
+
+
+DAY = date(2026, 12, 5)
+
+
+def _reservation(court_id, hour):
+    return SimpleNamespace(court_id=court_id, start_time=time(hour, 0))
+
+
+def _block(court_id, start_hour, end_hour, temporary=False, block_id=None):
+    return SimpleNamespace(
+        id=block_id, court_id=court_id, start_time=time(start_hour, 0),
+        end_time=time(end_hour, 0), is_temporary_block=temporary
+    )
+
+
+class TestMaskHelpers:
+    """Test mask construction helpers."""
+
+    def test_hour_range_mask(self):
+        """Test range masks set exactly the covered hours."""
+        assert list(iter_hours(hour_range_mask(10, 13))) == [10, 11, 12]
+        assert hour_range_mask(10, 10) == 0
+
+    def test_grid_mask_covers_booking_hours(self):
+        """Test the grid mask covers the 14 slots 08:00-21:00."""
+        assert list(iter_hours(GRID_MASK)) == list(range(8, 22))
+
+
+class TestDayOccupancy:
+    """Test building and querying the index."""
+
+    def test_masks_per_state(self):
+        """Test each state is tracked in its own mask."""
+        occupancy = DayOccupancy.build(
+            DAY, [1, 2],
+            reservations=[_reservation(1, 9)],
+            blocks=[_block(1, 14, 16), _block(2, 10, 12, temporary=True)],
+            suspended_reservations=[_reservation(2, 10)]
+        )
+
+        court_1 = occupancy.masks(1)
+        assert list(iter_hours(court_1.reserved)) == [9]
+        assert list(iter_hours(court_1.blocked)) == [14, 15]
+        assert court_1.temp_blocked == 0
+
+        court_2 = occupancy.masks(2)
+        assert list(iter_hours(court_2.temp_blocked)) == [10, 11]
+        assert list(iter_hours(court_2.suspended)) == [10]
+
+    def test_free_slots(self):
+        """Test free slots exclude reserved and blocked hours but not suspended ones."""
+        occupancy = DayOccupancy.build(
+            DAY, [1],
+            reservations=[_reservation(1, 8)],
+            blocks=[_block(1, 9, 20)],
+            suspended_reservations=[_reservation(1, 21)]
+        )
+
+        assert occupancy.free_slots(1) == [20, 21]
+        assert occupancy.free_slots(2) == list(range(8, 22))
+
+    def test_first_free_slot_for_court(self):
+        """Test first free slot honours the starting hour."""
+        occupancy = DayOccupancy.build(DAY, [1], reservations=[_reservation(1, 8), _reservation(1, 12)])
+
+        assert occupancy.first_free_slot(1) == 9
+        assert occupancy.first_free_slot(1, from_hour=12) == 13
+
+    def test_first_free_slot_across_courts(self):
+        """Test the earliest free slot over all courts, lowest court on ties."""
+        occupancy = DayOccupancy.build(
+            DAY, [1, 2, 3],
+            blocks=[_block(1, 8, 22), _block(2, 8, 10), _block(3, 8, 10)]
+        )
+
+        assert occupancy.first_free_slot() == (10, 2)
+
+    def test_first_free_slot_none_when_fully_booked(self):
+        """Test None is returned when nothing is free."""
+        occupancy = DayOccupancy.build(DAY, [1], blocks=[_block(1, 8, 22)])
+
+        assert occupancy.first_free_slot(1) is None
+        assert occupancy.first_free_slot() is None
+
+    def test_blocks_at_prefers_first_of_each_type(self):
+        """Test slot lookup returns the first temporary and first regular block."""
+        occupancy = DayOccupancy.build(DAY, [1], blocks=[
+            _block(1, 10, 12, block_id=1),
+            _block(1, 11, 13, temporary=True, block_id=2),
+            _block(1, 11, 12, block_id=3)
+        ])
+
+        temp_block, regular_block = occupancy.blocks_at(1, 11)
+        assert temp_block.id == 2
+        assert regular_block.id == 1
+        assert occupancy.blocks_at(1, 13) == (None, None)
+        assert occupancy.first_block_at(1, 11).id == 1
+
+    def test_slot_objects(self):
+        """Test reservations are retrievable by slot."""
+        reservation = _reservation(1, 10)
+        occupancy = DayOccupancy.build(DAY, [1], reservations=[reservation])
+
+        assert occupancy.reservation_at(1, 10) is reservation
+        assert occupancy.reservation_at(1, 11) is None
+        assert occupancy.suspended_reservation_at(1, 10) is None
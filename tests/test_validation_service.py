@@ -627,3 +627,71 @@ def test_property_42a_short_notice_booking_limit_enforcement(app, existing_short
         Reservation.query.filter_by(booked_for_id=member.id).delete()
         db.session.delete(member)
         db.session.commit()
+
+
+def test_cancellation_eligibility_batch_matches_single_checks():
+    """Batch eligibility applies ownership and time rules per reservation without DB access."""
+    from datetime import date, datetime
+    from types import SimpleNamespace
+
+    now = datetime(2026, 12, 5, 10, 0)
+
+    def reservation(res_id, hour, owner='a', booker='a', short_notice=False, status='active', minute=0):
+        return SimpleNamespace(
+            id=res_id, date=date(2026, 12, 5), start_time=time(hour, minute), status=status,
+            is_short_notice=short_notice, booked_for_id=owner, booked_by_id=booker
+        )
+
+    reservations = [
+        reservation(1, 12),                                # own, far enough ahead
+        reservation(2, 12, owner='b', booker='b'),         # someone else's
+        reservation(3, 12, owner='b', booker='a'),         # booked by the user for someone else
+        reservation(4, 10, minute=10),                     # starts in 10 minutes
+        reservation(5, 9),                                 # already started
+        reservation(6, 12, short_notice=True),             # short notice
+        reservation(7, 9, status='suspended'),             # suspended can always be cancelled
+    ]
+
+    eligibility = ValidationService.get_cancellation_eligibility_batch(reservations, 'a', now)
+
+    assert eligibility == {1: True, 2: False, 3: True, 4: False, 5: False, 6: False, 7: True}
+    for res in reservations:
+        assert ValidationService.get_cancellation_eligibility(res, 'a', now) == eligibility[res.id]
+
+
+def test_booking_constraints_use_two_statements(app, count_queries):
+    """Member lookup and all booking facts take one statement each once the counters are current."""
+    from datetime import date, datetime
+    from app.models import Court
+    from app.services.booking_counter_service import BookingCounterService
+    from tests.factories import MemberFactory
+
+    with app.app_context():
+        member = MemberFactory()
+        booker = MemberFactory()
+        court = Court.query.filter_by(number=1).first()
+        booking_date = date(2026, 12, 5)
+        now = datetime(2026, 12, 1, 10, 0)
+        for hour in (9, 10):
+            db.session.add(Reservation(
+                court_id=court.id, date=booking_date, start_time=time(hour, 0), end_time=time(hour + 1, 0),
+                booked_for_id=member.id, booked_by_id=member.id, status='active'
+            ))
+        db.session.commit()
+        court_id, member_id, booker_id = court.id, member.id, booker.id
+        for counted_id in (member_id, booker_id):
+            BookingCounterService.store(counted_id, *BookingCounterService.compute(counted_id, now), now)
+        db.session.commit()
+        db.session.expunge_all()
+
+        with count_queries() as statements:
+            facts = ValidationService.get_booking_facts(court_id, booking_date, time(10, 0), member_id, now)
+            assert statements and len(statements) == 1
+            assert facts == {'regular_sessions': 2, 'short_notice_sessions': 0, 'conflict': True, 'blocked': False}
+
+            del statements[:]
+            is_valid, _, _ = ValidationService.validate_all_booking_constraints(
+                court_id, booking_date, time(12, 0), booker_id, current_time=now, booked_by_id=member_id
+            )
+            assert is_valid is True
+            assert len(statements) == 2
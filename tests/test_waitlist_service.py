@@ -0,0 +1,155 @@
+"""Tests for waitlists and their promotion when slots are freed."""
+from datetime import time
+from unittest.mock import patch
+
+from app import db
+from app.models import OutboxEvent, Reservation, WaitlistEntry
+from app.services.block_service import BlockService
+from app.services.outbox_service import OutboxService
+from app.services.reservation_service import ReservationService
+from app.services.waitlist_service import WaitlistService
+from tests.factories import FUTURE_DATE, MemberFactory, BlockReasonFactory, book, get_court_id
+
+
+class TestJoin:
+    """Joining a waitlist."""
+
+    def test_free_slot_cannot_be_waited_for(self, app):
+        """A free slot should be booked directly."""
+        with app.app_context():
+            member = MemberFactory()
+            entry, error = WaitlistService.join(get_court_id(1), FUTURE_DATE, time(10, 0), member.id)
+
+            assert entry is None
+            assert error == 'Dieser Platz ist frei und kann direkt gebucht werden'
+
+    def test_join_taken_slot_once(self, app):
+        """A member can wait for a booked slot, but only once."""
+        with app.app_context():
+            holder, member = MemberFactory(), MemberFactory()
+            court_id = get_court_id(1)
+            book(1, 10, holder)
+
+            entry, error = WaitlistService.join(court_id, FUTURE_DATE, time(10, 0), member.id)
+            assert error is None
+            assert entry.status == 'waiting'
+
+            _, error = WaitlistService.join(court_id, FUTURE_DATE, time(10, 0), member.id)
+            assert error == 'Du stehst bereits auf der Warteliste für diesen Platz'
+
+
+class TestPromotion:
+    """Freed slots go to the first eligible waiting member."""
+
+    def test_cancellation_books_first_eligible_member(self, app):
+        """A member at their limit is skipped and keeps waiting."""
+        with app.app_context():
+            holder, at_limit, next_in_line = MemberFactory(), MemberFactory(), MemberFactory()
+            court_id = get_court_id(2)
+            reservation = book(2, 10, holder)
+            book(3, 12, at_limit)
+            book(3, 13, at_limit)
+            WaitlistService.join(court_id, FUTURE_DATE, time(10, 0), at_limit.id)
+            WaitlistService.join(court_id, FUTURE_DATE, time(10, 0), next_in_line.id)
+
+            success, error = ReservationService.cancel_reservation(reservation.id)
+            assert success, error
+
+            booked = Reservation.query.filter_by(court_id=court_id, status='active').one()
+            assert booked.booked_for_id == next_in_line.id
+            statuses = {e.member_id: e.status for e in WaitlistEntry.query}
+            assert statuses == {at_limit.id: 'waiting', next_in_line.id: 'promoted'}
+            promoted = WaitlistEntry.query.filter_by(member_id=next_in_line.id).one()
+            assert promoted.reservation_id == booked.id
+
+    def test_block_deletion_promotes_every_waited_slot(self, app):
+        """Removing a block hands each freed slot to its own waiting member."""
+        with app.app_context():
+            admin = MemberFactory(admin=True)
+            reason = BlockReasonFactory()
+            court_id = get_court_id(4)
+            blocks, error = BlockService.create_multi_court_blocks(
+                [court_id], FUTURE_DATE, time(14, 0), time(18, 0), reason.id, None, admin.id
+            )
+            assert error is None
+            batch_id = blocks[0].batch_id
+            waiting = {hour: MemberFactory() for hour in (14, 16)}
+            for hour, member in waiting.items():
+                _, error = WaitlistService.join(court_id, FUTURE_DATE, time(hour, 0), member.id)
+                assert error is None
+
+            success, error = BlockService.delete_batch(batch_id, admin.id)
+            assert success, error
+
+            booked = {
+                r.start_time.hour: r.booked_for_id
+                for r in Reservation.query.filter_by(court_id=court_id, status='active')
+            }
+            assert booked == {hour: member.id for hour, member in waiting.items()}
+
+
+    def test_freed_slots_are_an_outbox_event(self, app):
+        """The freeing write commits the promotion as an event; the booking happens when it is handled."""
+        with app.app_context():
+            holder, member = MemberFactory(), MemberFactory()
+            court_id = get_court_id(1)
+            reservation = book(1, 10, holder)
+            WaitlistService.join(court_id, FUTURE_DATE, time(10, 0), member.id)
+
+            with patch.object(OutboxService, 'dispatch'):
+                success, error = ReservationService.cancel_reservation(reservation.id)
+            assert success, error
+
+            event = OutboxEvent.query.filter_by(event_type='waitlist_freed_slots').one()
+            assert event.payload == {'slots': [[FUTURE_DATE.isoformat(), court_id, 10]]}
+            assert Reservation.query.filter_by(court_id=court_id, status='active').count() == 0
+
+            OutboxService.process_pending()
+
+            booked = Reservation.query.filter_by(court_id=court_id, status='active').one()
+            assert booked.booked_for_id == member.id
+            assert WaitlistEntry.query.filter_by(member_id=member.id).one().reservation_id == booked.id
+
+    def test_entry_that_stopped_waiting_books_nothing(self, app):
+        """The booking and the entry's promotion commit together or not at all."""
+        with app.app_context():
+            holder, member = MemberFactory(), MemberFactory()
+            court_id = get_court_id(1)
+            book(1, 10, holder)
+            entry, _ = WaitlistService.join(court_id, FUTURE_DATE, time(10, 0), member.id)
+            entry_id = entry.id
+            WaitlistService.leave(entry_id, member.id)
+
+            reservation, error, _ = ReservationService.create_reservation(
+                court_id, FUTURE_DATE, time(11, 0), member.id, member.id, waitlist_entry_id=entry_id
+            )
+
+            assert reservation is None
+            assert error == 'Wartelisteneintrag nicht gefunden'
+            db.session.expire_all()
+            assert Reservation.query.filter_by(booked_for_id=member.id).count() == 0
+            assert db.session.get(WaitlistEntry, entry_id).status == 'cancelled'
+
+class TestWaitlistRoutes:
+    """GET/POST/DELETE /api/waitlist/."""
+
+    def test_join_list_and_leave(self, app, client, test_member):
+        """The member sees their queue position and can leave."""
+        with app.app_context():
+            holder, earlier = MemberFactory(), MemberFactory()
+            court_id = get_court_id(5)
+            book(5, 9, holder)
+            WaitlistService.join(court_id, FUTURE_DATE, time(9, 0), earlier.id)
+
+        client.post('/auth/login', data={'email': test_member.email, 'password': 'password123'})
+        response = client.post('/api/waitlist/', json={
+            'court_id': court_id, 'date': FUTURE_DATE.isoformat(), 'start_time': '09:00'
+        })
+        assert response.status_code == 201
+        entry_id = response.get_json()['entry']['id']
+
+        entries = client.get('/api/waitlist/').get_json()['entries']
+        assert [(e['id'], e['position']) for e in entries] == [(entry_id, 2)]
+
+        assert client.delete(f'/api/waitlist/{entry_id}').status_code == 200
+        assert client.get('/api/waitlist/').get_json()['entries'] == []